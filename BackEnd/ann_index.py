@@ -0,0 +1,150 @@
+"""
+Indeks tetangga terdekat perkiraan (ANN) berbasis random-projection LSH.
+
+Setiap vektor fitur film (sudah dinormalisasi L2) diproyeksikan ke n_bits
+hyperplane acak per tabel; tanda hasil proyeksi menjadi kode bucket. Film
+dengan sudut kecil (cosine tinggi) kemungkinan besar jatuh ke bucket yang sama
+di salah satu tabel. Kandidat dari bucket yang cocok (plus bucket yang berbeda
+satu bit, multi-probe) lalu di-rerank dengan cosine eksak, sehingga skor yang
+disimpan sama persis dengan model eksak; hanya recall yang bersifat perkiraan.
+
+Dengan ini top-K bisa dihitung tanpa membandingkan setiap pasangan film
+(build sub-kuadratik). Update inkremental (model_update.py) cukup meng-hash
+film yang baru/diubah dengan hyperplane yang sama, tanpa membangun ulang indeks.
+"""
+import numpy as np
+
+from recommender import select_top_n
+
+DEFAULT_TABLES = 12
+ANN_FILENAME = "ann.npz"
+
+
+def default_n_bits(n_movies):
+    """Sekitar 4 film per bucket: log2(N) - 2 bit, dibatasi 6..20."""
+    return int(np.clip(int(np.log2(max(n_movies, 2))) - 2, 6, 20))
+
+
+class LSHIndex:
+    def __init__(self, planes, n_tables, n_bits):
+        # planes: (n_features, n_tables * n_bits), satu kolom per hyperplane
+        self.planes = np.ascontiguousarray(planes, dtype=np.float32)
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.features = None
+        self.codes = None
+        self._bit_weights = np.uint64(1) << np.arange(n_bits, dtype=np.uint64)
+
+    @classmethod
+    def create(cls, n_features, n_movies, n_tables=DEFAULT_TABLES, n_bits=None, seed=0):
+        n_bits = n_bits or default_n_bits(n_movies)
+        rng = np.random.default_rng(seed)
+        planes = rng.standard_normal((n_features, n_tables * n_bits), dtype=np.float32)
+        return cls(planes, n_tables, n_bits)
+
+    def __len__(self):
+        return 0 if self.features is None else self.features.shape[0]
+
+    def _hash(self, features):
+        """Kode bucket uint64 berbentuk (jumlah_film, n_tables)."""
+        projected = np.asarray(features @ self.planes)
+        bits = (projected > 0).reshape(-1, self.n_tables, self.n_bits).astype(np.uint64)
+        return bits @ self._bit_weights
+
+    def _rebuild_tables(self):
+        # Per tabel: urutan baris berdasarkan kode, untuk lookup bucket dengan searchsorted
+        self._order = np.argsort(self.codes, axis=0, kind="stable")
+        self._sorted_codes = np.take_along_axis(self.codes, self._order, axis=0)
+
+    def fit(self, features):
+        """Meng-hash seluruh matriks fitur (CSR, baris = film, dinormalisasi L2)."""
+        self.features = features.tocsr()
+        self.codes = self._hash(self.features)
+        self._rebuild_tables()
+        return self
+
+    def update(self, features, rows):
+        """
+        Mengganti matriks fitur dan hanya meng-hash ulang baris `rows` (film baru
+        di akhir matriks atau film yang diubah); kode film lain dipakai ulang.
+        """
+        self.features = features.tocsr()
+        codes = np.zeros((self.features.shape[0], self.n_tables), dtype=np.uint64)
+        codes[:len(self.codes)] = self.codes
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows):
+            codes[rows] = self._hash(self.features[rows])
+        self.codes = codes
+        self._rebuild_tables()
+        return self
+
+    def _probe_codes(self, code, multiprobe):
+        if not multiprobe:
+            return code[np.newaxis, :]
+        # Bucket persis ditambah semua bucket yang berbeda tepat satu bit
+        flips = np.concatenate([[np.uint64(0)], self._bit_weights])
+        return code[np.newaxis, :] ^ flips[:, np.newaxis]
+
+    def candidates(self, code, multiprobe=True):
+        """Baris-baris film yang berbagi bucket dengan `code` di setidaknya satu tabel."""
+        probes = self._probe_codes(code, multiprobe)
+        found = []
+        for table in range(self.n_tables):
+            sorted_codes = self._sorted_codes[:, table]
+            lo = np.searchsorted(sorted_codes, probes[:, table], side="left")
+            hi = np.searchsorted(sorted_codes, probes[:, table], side="right")
+            for start, stop in zip(lo.tolist(), hi.tolist()):
+                if stop > start:
+                    found.append(self._order[start:stop, table])
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        # Dedup dengan mask boolean (O(N) tanpa sort), lebih cepat dari np.unique
+        seen = np.zeros(len(self), dtype=bool)
+        seen[np.concatenate(found)] = True
+        return np.flatnonzero(seen)
+
+    def _rerank(self, vector, code, n, exclude, multiprobe):
+        rows = self.candidates(code, multiprobe)
+        if exclude is not None:
+            rows = rows[rows != exclude]
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        scores = self.features[rows] @ vector.toarray().ravel()
+        top, top_scores = select_top_n(scores, n)
+        return rows[top].astype(np.int32), top_scores
+
+    def query_row(self, row, n, multiprobe=True):
+        """Top-n tetangga untuk film yang sudah ada di indeks (dirinya dikecualikan)."""
+        return self._rerank(self.features[row], self.codes[row], n, row, multiprobe)
+
+    def build_neighbor_index(self, top_k, multiprobe=True):
+        """
+        Daftar top-K untuk semua film, format sama dengan build_neighbor_index
+        di recommender.py. Slot yang tidak terisi (kandidat < K) diberi baris -1
+        dan skor -inf.
+        """
+        n_movies = len(self)
+        k = min(top_k, n_movies - 1)
+        neighbors = np.full((n_movies, k), -1, dtype=np.int32)
+        scores = np.full((n_movies, k), -np.inf, dtype=np.float32)
+        for row in range(n_movies):
+            rows, row_scores = self.query_row(row, k, multiprobe)
+            neighbors[row, :len(rows)] = rows
+            scores[row, :len(rows)] = row_scores
+        return neighbors, scores
+
+    def save(self, path):
+        """Menyimpan hyperplane dan kode bucket (fitur disimpan terpisah di features.npz)."""
+        with open(path, "wb") as f:
+            np.savez(f, planes=self.planes, codes=self.codes, shape=np.array([self.n_tables, self.n_bits]))
+
+    @classmethod
+    def load(cls, path, features):
+        with np.load(path) as data:
+            n_tables, n_bits = (int(v) for v in data["shape"])
+            index = cls(data["planes"], n_tables, n_bits)
+            codes = data["codes"]
+        index.features = features.tocsr()
+        index.codes = codes
+        index._rebuild_tables()
+        return index
@@ -1,13 +1,24 @@
 import os
 import json
-import pickle
-import pandas as pd
-from flask import Flask, jsonify
+import threading
+import time
+import numpy as np
+from flask import Flask, g, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
-import requests # Pastikan import ini ada di bagian atas file
+from recommender import MODEL_DIRNAME, load_model_artifacts
+from build_model import build_from_pickles
+from model_download import download_artifacts, load_manifest
+from model_registry import build_lock, current_model_dir, current_version, list_versions, set_current
+from model_update import load_catalog_rows, update_model
+from db import PoolExhausted, create_db_connection, pool_stats, release_db_connection
+import json_codec
+import metadata_store
+import metrics
+from metrics import phase
+from response_cache import ResponseCache
 
 # ========================================================================
 # SETUP APLIKASI
@@ -37,38 +48,13 @@ else:
 
 
 
-# Konfigurasi koneksi ke database MySQL dari file .env
-db_config = {
-    "host": os.getenv("DB_HOST"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "database": os.getenv("DB_NAME"),
-    # "port": os.getenv("DB_PORT")
-}
-
-# Fungsi untuk membuat koneksi ke database, digunakan oleh setiap endpoint
-def create_db_connection():
-    """
-    Membuat koneksi ke database dan mencetak log untuk debugging.
-    """
-    try:
-        # Cetak konfigurasi yang digunakan untuk debugging (password disembunyikan)
-        # Ini sangat penting untuk memastikan variabel env sudah benar.
-        debug_config = db_config.copy()
-        debug_config["password"] = "********" # Sembunyikan password di log
-        print(f"Mencoba terhubung ke database dengan konfigurasi: {debug_config}")
-        
-        conn = mysql.connector.connect(**db_config)
-        
-        # Jika baris ini tercetak, artinya koneksi BERHASIL dibuat.
-        if conn.is_connected():
-            print("✅ Koneksi ke database berhasil dibuat.")
-        
-        return conn
-    except Error as e:
-        # Jika ada error, cetak pesan error spesifik dari konektor.
-        print(f"❌ Error connecting to MySQL Database: {e}")
-        return None
+# Koneksi database diambil dari pool per worker (lihat db.py)
+@app.errorhandler(PoolExhausted)
+def handle_pool_exhausted(e):
+    # Tidak dicetak per kejadian; jumlahnya ada di db_pool_exhausted_total (/metrics)
+    response = jsonify({"error": "Server sedang sibuk, silakan coba lagi sebentar lagi"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
 
 
 # ========================================================================
@@ -85,39 +71,92 @@ MODEL_URLS = {
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-def download_file(url, destination):
-    print(f"Mengunduh model dari {url}...")
-    try:
-        with requests.get(url, stream=True) as r:
-            r.raise_for_status()
-            with open(destination, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-        print(f"✅ Berhasil mengunduh ke {destination}")
-        return True
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Gagal mengunduh model: {e}")
-        return False
+# Registry model hasil build_model.py (lihat model_registry.py): setiap versi berisi
+# artefak .npy + meta.json, dan file CURRENT menunjuk versi aktif. Jika registry
+# masih kosong, versi pertama dibangun sekali dari pickle lama. Array dibuka
+# memory-mapped sehingga semua worker gunicorn berbagi memori yang sama.
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(BASE_DIR, MODEL_DIRNAME))
 
-try:
-    for filename, url in MODEL_URLS.items():
-        filepath = os.path.join(BASE_DIR, filename)
-        if not os.path.exists(filepath):
-            print(f"File {filename} tidak ditemukan. Memulai proses unduh.")
-            if not download_file(url, filepath):
-                exit(1) # Hentikan aplikasi jika download gagal
-        else:
-            print(f"File {filename} sudah ada. Melanjutkan.")
+# Manifest SHA-256 artefak (path lokal atau URL JSON {"nama_file": "sha256"}).
+# Jika kosong, checksum diambil dari header X-Linked-Etag Hugging Face.
+MODEL_MANIFEST = os.getenv("MODEL_MANIFEST")
 
-    movies_df = pickle.load(open(os.path.join(BASE_DIR, "movies_df.pkl"), 'rb'))
-    similarity_matrix = pickle.load(open(os.path.join(BASE_DIR, "similarity.pkl"), 'rb'))
-    print("✅ Model machine learning berhasil dimuat.")
+try:
+    if not current_model_dir(MODEL_DIR):
+        # Hanya satu worker yang mengunduh dan membangun; worker lain menunggu
+        # lock lalu memuat versi yang sudah dipublikasikan (CURRENT)
+        with build_lock(MODEL_DIR):
+            # File pickle hanya dibutuhkan untuk membangun versi model pertama
+            if not current_model_dir(MODEL_DIR):
+                if not download_artifacts(MODEL_URLS, BASE_DIR, manifest=load_manifest(MODEL_MANIFEST)):
+                    exit(1) # Hentikan aplikasi jika download gagal
+
+            if not current_model_dir(MODEL_DIR):
+                print(f"Artefak model di {MODEL_DIR} belum ada. Membangun dari similarity.pkl...")
+                build_from_pickles(
+                    os.path.join(BASE_DIR, "movies_df.pkl"),
+                    os.path.join(BASE_DIR, "similarity.pkl"),
+                    MODEL_DIR,
+                )
+
+    neighbor_index = load_model_artifacts(current_model_dir(MODEL_DIR))
+    print(f"✅ Model machine learning versi {neighbor_index.version} berhasil dimuat ({len(neighbor_index)} film, top-{neighbor_index.top_k}).")
 
 except Exception as e:
     print(f"❌ FATAL ERROR: Terjadi kesalahan saat memuat model: {e}")
     exit(1)
 
 
+# ========================================================================
+# MEMUAT METADATA FILM KE MEMORI
+# ========================================================================
+# Metadata film (judul, poster, provider, dll.) hanya berubah saat scraping,
+# jadi disimpan di RAM agar endpoint rekomendasi & detail tidak perlu ke MySQL.
+# Jika METADATA_SNAPSHOT diisi (CSV dari scrape/Export.py) data dibaca dari file
+# tersebut, jika tidak langsung dari database.
+METADATA_SNAPSHOT = os.getenv("METADATA_SNAPSHOT")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def load_metadata_store():
+    """Membangun store metadata baru. Mengembalikan store kosong jika sumber data tidak tersedia."""
+    if METADATA_SNAPSHOT:
+        return metadata_store.load_from_snapshot(METADATA_SNAPSHOT)
+    conn = create_db_connection()
+    if not conn:
+        return metadata_store.empty_store()
+    try:
+        return metadata_store.load_from_db(conn)
+    finally:
+        release_db_connection(conn)
+
+try:
+    movie_store = load_metadata_store().align_to_model(neighbor_index.movie_ids)
+    print(f"✅ Metadata {len(movie_store)} film dimuat ke memori (sumber: {movie_store.source}).")
+except Exception as e:
+    # Tetap jalan: film yang tidak ada di store akan diambil langsung dari MySQL
+    print(f"⚠️ Gagal memuat metadata ke memori, memakai MySQL langsung: {e}")
+    movie_store = metadata_store.empty_store().align_to_model(neighbor_index.movie_ids)
+
+
+class ServingState:
+    """
+    Model rekomendasi beserta metadata yang sudah diselaraskan dengannya.
+    Selalu diganti utuh lewat satu assignment global, jadi setiap request yang
+    membaca `serving` sekali di awal memakai pasangan versi yang konsisten.
+    """
+
+    def __init__(self, neighbor_index, movie_store):
+        self.neighbor_index = neighbor_index
+        self.movie_store = movie_store
+
+    def cache_key(self, movie_id):
+        # Respons adalah fungsi murni dari (film, versi model, versi metadata)
+        return (movie_id, self.neighbor_index.version, self.movie_store.version)
+
+
+serving = ServingState(neighbor_index, movie_store)
+
+
 
 
 # BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -150,18 +189,225 @@ except Exception as e:
 
 
 
+# ========================================================================
+# CACHE RESPONS REKOMENDASI
+# ========================================================================
+# Batas memori cache per worker (MB) dan max-age untuk header Cache-Control.
+# PRECOMPUTE_RECOMMENDATIONS=1 mengisi cache untuk semua film di background saat
+# startup; pastikan RECOMMENDATION_CACHE_MB cukup besar untuk seluruh katalog.
+RECOMMENDATION_CACHE_MB = float(os.getenv("RECOMMENDATION_CACHE_MB", "64"))
+RECOMMENDATION_MAX_AGE = int(os.getenv("RECOMMENDATION_MAX_AGE", "300"))
+recommendation_cache = ResponseCache(int(RECOMMENDATION_CACHE_MB * 1024 * 1024))
+
+# Jumlah hasil pencarian judul per request
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+
+
+# ========================================================================
+# HOT-RELOAD MODEL
+# ========================================================================
+# Setiap worker memeriksa file CURRENT di registry setiap MODEL_WATCH_INTERVAL
+# detik (0 = nonaktif) dan memuat versi baru di background, sehingga model baru
+# dari build_model.py/model_update.py dipakai semua worker tanpa restart.
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "10"))
+reload_lock = threading.Lock()
+
+
+def reload_serving_state(reload_model=True, reload_metadata=None):
+    """
+    Menyiapkan ServingState baru (versi model aktif dan/atau metadata baru) di
+    thread pemanggil, lalu menggantinya dengan satu assignment. Request yang
+    sedang berjalan tetap memakai state lama sampai selesai.
+    reload_metadata=None berarti otomatis: metadata ikut dimuat ulang jika
+    model baru adalah hasil update inkremental (ada film baru).
+    """
+    global serving
+    with reload_lock:
+        current = serving
+        new_index = load_model_artifacts(current_model_dir(MODEL_DIR)) if reload_model else current.neighbor_index
+        if reload_metadata is None:
+            reload_metadata = "parent_version" in new_index.meta
+        store = load_metadata_store() if reload_metadata else current.movie_store
+        serving = ServingState(new_index, store.align_to_model(new_index.movie_ids))
+        recommendation_cache.clear() # Entri lama tidak akan pernah cocok dengan versi baru
+    print(
+        f"✅ Model versi {serving.neighbor_index.version} ({len(serving.neighbor_index)} film) dan "
+        f"metadata {serving.movie_store.version} ({len(serving.movie_store)} film) aktif."
+    )
+    return serving
+
+
+def reload_in_background(**kwargs):
+    def run():
+        try:
+            reload_serving_state(**kwargs)
+        except Exception as e:
+            print(f"❌ Gagal memuat ulang model: {e}")
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def watch_model_registry():
+    """Memuat versi baru saat CURRENT berubah (misalnya oleh build_model.py atau worker lain)."""
+    while True:
+        time.sleep(MODEL_WATCH_INTERVAL)
+        version = current_version(MODEL_DIR)
+        if version and version != serving.neighbor_index.version:
+            try:
+                reload_serving_state()
+            except Exception as e:
+                print(f"❌ Gagal memuat model versi {version}: {e}")
+
+
+if MODEL_WATCH_INTERVAL > 0:
+    threading.Thread(target=watch_model_registry, daemon=True).start()
+
+
+# ========================================================================
+# METRIK & INSTRUMENTASI REQUEST
+# ========================================================================
+# Durasi setiap request (per route) dan fase di dalamnya dicatat di metrics.py
+# dan diekspos di /metrics dalam format Prometheus.
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """
+    Serializer JSON Flask lewat json_codec.py (orjson jika tersedia, mendukung
+    Fragment dari metadata_store), dicatat sebagai fase json_encode. Pemanggilan
+    dengan argumen tambahan (misalnya indent di mode debug) diformat oleh
+    serializer bawaan Flask setelah Fragment diuraikan kembali menjadi objek.
+    """
+
+    def dumps(self, obj, **kwargs):
+        with phase("json_encode"):
+            data = json_codec.dumps(obj)
+        if kwargs:
+            # Encoder bawaan Flask tidak mengenal Fragment
+            return super().dumps(json_codec.loads(data), **kwargs)
+        return data.decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return json_codec.loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        with phase("json_encode"):
+            body = json_codec.dumps(obj) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+app.json = CodecJSONProvider(app)
+
+
+@app.before_request
+def start_request_timing():
+    # Label route memakai pola URL (/api/movies/<int:movie_id>), bukan path asli
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    g.request_timing = metrics.start_request(route, request.method)
+
+
+@app.after_request
+def finish_request_timing(response):
+    token = g.pop("request_timing", None)
+    if token is not None:
+        metrics.finish_request(token, response.status_code)
+    return response
+
+
+def collect_serving_metrics():
+    """Collector /metrics: statistik cache rekomendasi dan versi model yang dilayani."""
+    state = serving
+    cache_stats = recommendation_cache.stats()
+    metrics.registry.set("recommendation_cache_hits_total", cache_stats["hits"])
+    metrics.registry.set("recommendation_cache_misses_total", cache_stats["misses"])
+    metrics.registry.set("recommendation_cache_evictions_total", cache_stats["evictions"])
+    metrics.registry.set("recommendation_cache_entries", cache_stats["entries"])
+    metrics.registry.set("recommendation_cache_bytes", cache_stats["bytes"])
+    # Hanya versi yang sedang aktif yang ditampilkan
+    metrics.registry.clear("model_info")
+    metrics.registry.set(
+        "model_info", 1,
+        version=state.neighbor_index.version, metadata_version=state.movie_store.version,
+    )
+    metrics.registry.set("model_movies", len(state.neighbor_index))
+    metrics.registry.set("metadata_movies", len(state.movie_store))
+
+
+metrics.registry.register_collector("serving", collect_serving_metrics)
+# asgi_app.py mengganti collector "db_pool" dengan statistik pool async
+metrics.registry.register_collector("db_pool", lambda: metrics.set_pool_metrics(pool_stats()))
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Metrik dalam format teks Prometheus (lihat metrics.py)."""
+    return app.response_class(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+# ========================================================================
+# QUERY & VALIDASI BERSAMA (dipakai juga oleh asgi_app.py)
+# ========================================================================
+ALL_MOVIES_QUERY = "SELECT movie_id, original_title FROM movies_all_data ORDER BY original_title ASC"
+SEARCH_TITLE_QUERY = (
+    "SELECT movie_id, original_title FROM movies_all_data "
+    "WHERE original_title LIKE %s ORDER BY original_title ASC LIMIT %s"
+)
+MOVIE_DETAILS_QUERY = "SELECT * FROM movies_all_data WHERE movie_id = %s"
+RECOMMENDATION_ITEMS_QUERY = (
+    "SELECT movie_id, original_title, poster_path, watch_providers FROM movies_all_data WHERE movie_id IN ({})"
+)
+
+
+def in_placeholders(values):
+    return ','.join(['%s'] * len(values))
+
+
+def parse_search_limit(raw):
+    """Nilai ?limit= yang valid dibatasi 1..SEARCH_MAX_LIMIT; selain itu default."""
+    try:
+        limit = int(raw) if raw is not None else SEARCH_DEFAULT_LIMIT
+    except ValueError:
+        limit = SEARCH_DEFAULT_LIMIT
+    return min(max(limit, 1), SEARCH_MAX_LIMIT)
+
+
+def title_prefix_pattern(query):
+    """Pola LIKE untuk pencarian prefix, dengan karakter wildcard di-escape."""
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{escaped}%"
+
+
+def parse_movie_row(movie):
+    """Kolom 'watch_providers' disimpan sebagai string JSON, jadi perlu di-parse."""
+    if movie.get('watch_providers'):
+        try:
+            movie['watch_providers'] = json.loads(movie['watch_providers'])
+        except (json.JSONDecodeError, TypeError):
+            movie['watch_providers'] = [] # Jika data JSON tidak valid, kembalikan list kosong
+    return movie
+
+
+def is_int_list(values):
+    return isinstance(values, list) and all(isinstance(v, int) and not isinstance(v, bool) for v in values)
+
+
 # ========================================================================
 # ENDPOINT API
 # ========================================================================
 
 @app.route('/api/test-db')
 def test_db_connection():
-    print("Mencoba endpoint /api/test-db...")
     conn = create_db_connection()
-    if conn and conn.is_connected():
-        print("✅ Tes koneksi DB berhasil dari endpoint.")
-        conn.close()
-        return jsonify({"status": "success", "message": "Berhasil terhubung ke database MySQL di Railway!"})
+    if conn:
+        release_db_connection(conn)
+        return jsonify({
+            "status": "success",
+            "message": "Berhasil terhubung ke database MySQL di Railway!",
+            "pool": pool_stats(),
+            "recommendation_cache": recommendation_cache.stats(),
+        })
     else:
         print("❌ Tes koneksi DB GAGAL dari endpoint.")
         # Kita tambahkan detail error di sini untuk debugging
@@ -176,141 +422,552 @@ def get_all_movies():
     if not conn:
         return jsonify({"error": "Koneksi database gagal"}), 500
     
+    cursor = None
     try:
         cursor = conn.cursor(dictionary=True)
         # Ambil hanya kolom yang dibutuhkan untuk efisiensi
-        query = "SELECT movie_id, original_title FROM movies_all_data ORDER BY original_title ASC"
-        cursor.execute(query)
-        movies = cursor.fetchall()
+        with phase("db_query"):
+            cursor.execute(ALL_MOVIES_QUERY)
+            movies = cursor.fetchall()
         return jsonify(movies)
     except Error as e:
         return jsonify({"error": str(e)}), 500
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        release_db_connection(conn, cursor)
+
+
+# Update model dijalankan satu per satu di worker ini; antarproses (worker gunicorn
+# lain, model_update.py) diserialkan oleh build_lock di dalam update_model
+model_update_lock = threading.Lock()
+
+
+def is_admin_request():
+    return bool(ADMIN_TOKEN) and request.headers.get("X-Admin-Token") == ADMIN_TOKEN
+
+
+@app.route('/api/admin/reload-metadata', methods=['POST'])
+def reload_metadata():
+    """Memuat ulang metadata film (misalnya setelah scraping) tanpa restart server."""
+    if not is_admin_request():
+        return jsonify({"error": "Tidak diizinkan"}), 403
+    data, status = reload_metadata_now()
+    return jsonify(data), status
+
+
+def reload_metadata_now():
+    try:
+        state = reload_serving_state(reload_model=False, reload_metadata=True)
+    except Exception as e:
+        return {"error": f"Gagal memuat metadata: {e}"}, 500
+    return {"status": "success", "metadata": state.movie_store.stats()}, 200
+
+
+@app.route('/api/admin/models', methods=['GET'])
+def list_model_versions():
+    """Daftar versi di registry, versi aktif (CURRENT) dan versi yang dilayani worker ini."""
+    if not is_admin_request():
+        return jsonify({"error": "Tidak diizinkan"}), 403
+    return jsonify(model_versions_info())
+
+
+def model_versions_info():
+    return {
+        "versions": list_versions(MODEL_DIR),
+        "current": current_version(MODEL_DIR),
+        "serving": serving.neighbor_index.meta,
+    }
+
+
+@app.route('/api/admin/reload-model', methods=['POST'])
+def reload_model_endpoint():
+    """
+    Memuat versi model aktif di background (202 Accepted). Body JSON opsional
+    {"version": "..."} untuk mengaktifkan versi lain (misalnya rollback);
+    worker lain mengikuti lewat pemantauan file CURRENT.
+    """
+    if not is_admin_request():
+        return jsonify({"error": "Tidak diizinkan"}), 403
+    data, status = activate_model_version((request.get_json(silent=True) or {}).get("version"))
+    return jsonify(data), status
+
+
+def activate_model_version(version=None):
+    if version:
+        try:
+            set_current(MODEL_DIR, version)
+        except ValueError as e:
+            return {"error": str(e)}, 404
+    reload_in_background()
+    return {"status": "accepted", "current": current_version(MODEL_DIR)}, 202
+
+
+@app.route('/api/admin/models/add', methods=['POST'])
+def add_movies_to_model():
+    """
+    Menambahkan/memperbarui film yang sudah ada di movies_all_data ke model
+    secara inkremental (lihat model_update.py), lalu memuatnya tanpa restart.
+    Body JSON: {"movie_ids": [27205, ...]}.
+    """
+    if not is_admin_request():
+        return jsonify({"error": "Tidak diizinkan"}), 403
+    data, status = apply_model_update((request.get_json(silent=True) or {}).get("movie_ids"))
+    return jsonify(data), status
+
+
+def apply_model_update(movie_ids):
+    """Logika /api/admin/models/add (blocking). Mengembalikan (data_respons, status_http)."""
+    if not is_int_list(movie_ids) or not movie_ids:
+        return {"error": "movie_ids harus berupa list integer"}, 400
+
+    conn = create_db_connection()
+    if not conn:
+        return {"error": "Koneksi database gagal"}, 500
+    try:
+        catalog_rows = load_catalog_rows(conn, movie_ids)
+    except Error as e:
+        return {"error": str(e)}, 500
+    finally:
+        release_db_connection(conn)
+
+    try:
+        with model_update_lock:
+            meta = update_model(MODEL_DIR, catalog_rows)
+            # Film baru juga perlu metadata-nya di store agar bisa ditampilkan
+            state = reload_serving_state(reload_metadata=True)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except Exception as e:
+        print(f"❌ Gagal memperbarui model: {e}")
+        return {"error": f"Gagal memperbarui model: {e}"}, 500
+    return {"status": "success", "model": meta, "metadata": state.movie_store.stats()}, 200
+
+
+@app.route('/api/movies/search', methods=['GET'])
+def search_movies():
+    """Pencarian judul film untuk dropdown (menggantikan unduhan daftar film lengkap)."""
+    query = request.args.get('q', '').strip()
+    limit = parse_search_limit(request.args.get('limit'))
+    if not query:
+        return jsonify([])
+
+    movie_store = serving.movie_store
+    if len(movie_store):
+        with phase("metadata_lookup"):
+            titles = movie_store.search_titles(query, limit)
+        return jsonify(titles)
+
+    # Store kosong (database tidak tersedia saat startup): pencarian prefix langsung di MySQL
+    conn = create_db_connection()
+    if not conn:
+        return jsonify({"error": "Koneksi database gagal"}), 500
+    cursor = None
+    try:
+        cursor = conn.cursor(dictionary=True)
+        with phase("db_query"):
+            cursor.execute(SEARCH_TITLE_QUERY, (title_prefix_pattern(query), limit))
+            titles = cursor.fetchall()
+        return jsonify(titles)
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        release_db_connection(conn, cursor)
 
 
 @app.route('/api/movies/<int:movie_id>', methods=['GET'])
 def get_movie_details(movie_id):
     """Endpoint untuk mendapatkan detail lengkap satu film untuk halaman detail."""
+    # Layani dari memori jika film dikenal, selain itu fallback ke MySQL
+    with phase("metadata_lookup"):
+        movie = serving.movie_store.movie_details(movie_id)
+    if movie:
+        return jsonify(movie)
+
     conn = create_db_connection()
     if not conn:
         return jsonify({"error": "Koneksi database gagal"}), 500
 
+    cursor = None
     try:
         cursor = conn.cursor(dictionary=True)
-        query = "SELECT * FROM movies_all_data WHERE movie_id = %s"
-        cursor.execute(query, (movie_id,))
-        movie = cursor.fetchone()
+        with phase("db_query"):
+            cursor.execute(MOVIE_DETAILS_QUERY, (movie_id,))
+            movie = cursor.fetchone()
         
         if movie:
-            # Kolom 'watch_providers' disimpan sebagai string JSON, jadi perlu di-parse
-            if movie.get('watch_providers'):
-                try:
-                    movie['watch_providers'] = json.loads(movie['watch_providers'])
-                except (json.JSONDecodeError, TypeError):
-                    movie['watch_providers'] = [] # Jika data JSON tidak valid, kembalikan list kosong
-            return jsonify(movie)
+            return jsonify(parse_movie_row(movie))
         else:
             return jsonify({"error": "Film tidak ditemukan"}), 404
             
     except Error as e:
         return jsonify({"error": str(e)}), 500
     finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        release_db_connection(conn, cursor)
 
 
-@app.route('/api/recommendations/<int:movie_id>', methods=['GET'])
-def get_recommendations_for_movie(movie_id):
-    """Endpoint utama untuk mendapatkan rekomendasi film."""
-    try:
-        # 1. Temukan index dari film yang dipilih dari dataframe yang kita muat
-        if movie_id not in movies_df['movie_id'].values:
-            return jsonify({"error": "Film tidak ditemukan dalam model rekomendasi"}), 404
-            
-        movie_index = movies_df[movies_df['movie_id'] == movie_id].index[0]
+# Jumlah rekomendasi per film (cukup banyak untuk dibagi per platform)
+RECOMMENDATION_COUNT = 15
+# Batas jumlah film per request /api/recommendations/batch
+RECOMMENDATION_BATCH_MAX = 50
+# Batas jumlah film seed (riwayat tonton) per request /api/recommendations/because-you-watched
+RECOMMENDATION_SEEDS_MAX = 200
+
+
+def lookup_recommendation_items(state, neighbor_rows):
+    """
+    Tahap pertama gather: detail + bitmask provider untuk matriks baris tetangga
+    (jumlah_film x n) dengan satu gather dari store di memori (tanpa json.loads
+    per request). Mengembalikan (items, missing_ids); missing_ids adalah film
+    yang belum ada di store (misalnya baru di-scrape) dan perlu diambil dari database.
+    """
+    flat_rows = np.asarray(neighbor_rows).ravel()
+    with phase("metadata_lookup"):
+        recommended_movie_ids = state.neighbor_index.movie_ids_at(flat_rows)
+        recommended_details, provider_masks = state.movie_store.recommendation_items(flat_rows)
+    missing_ids = sorted({mid for mid, movie in zip(recommended_movie_ids, recommended_details) if movie is None})
+    return (recommended_movie_ids, recommended_details, provider_masks), missing_ids
 
-        # 2. Ambil skor similarity dan urutkan
-        distances = similarity_matrix[movie_index]
-        # Ambil 15 rekomendasi teratas untuk memastikan cukup data setelah filtering
-        movies_list = sorted(list(enumerate(distances)), reverse=True, key=lambda x: x[1])[1:16]
-        
-        # 3. Dapatkan ID dari film-film yang direkomendasikan
-        recommended_movie_ids = [int(movies_df.iloc[i[0]].movie_id) for i in movies_list]
-        
-        if not recommended_movie_ids:
-            return jsonify({"error": "Tidak ada rekomendasi yang dapat dibuat"}), 404
 
-        # 4. Ambil detail film rekomendasi dari database (terutama untuk provider)
+def group_recommendation_items(state, neighbor_rows, items, fetched):
+    """
+    Tahap kedua gather: mengisi film yang tidak ada di store dari `fetched`
+    (movie_id -> baris database), lalu memecah hasil per baris input.
+    Mengembalikan list (detail, bitmask_provider, nama_provider_tambahan), tanpa
+    film yang tidak ditemukan. Provider film dari database yang belum dikenal
+    store mendapat bit milik request ini (nama_provider_tambahan).
+    """
+    recommended_movie_ids, recommended_details, provider_masks = items
+    extra_names = []
+    for position, movie_id in enumerate(recommended_movie_ids):
+        if recommended_details[position] is None and movie_id in fetched:
+            recommended_details[position] = fetched[movie_id]
+            provider_masks[position] = state.movie_store.encode_providers(
+                fetched[movie_id].get('watch_providers'), extra_names
+            )
+
+    found = np.fromiter((movie is not None for movie in recommended_details), dtype=bool, count=len(recommended_details))
+    n = neighbor_rows.shape[1] if neighbor_rows.ndim == 2 else len(recommended_details)
+    results = []
+    for start in range(0, len(recommended_details), n):
+        stop = start + n
+        details = [movie for movie in recommended_details[start:stop] if movie is not None]
+        results.append((details, provider_masks[start:stop][found[start:stop]], extra_names))
+    return results
+
+
+def gather_recommendation_items(state, neighbor_rows):
+    """
+    Detail film untuk matriks baris tetangga. Film yang tidak ada di store
+    diambil dengan satu query IN untuk gabungan semua ID. Mengembalikan list
+    (detail, bitmask_provider, nama_provider_tambahan) per baris input, atau None jika koneksi database gagal.
+    """
+    items, missing_ids = lookup_recommendation_items(state, neighbor_rows)
+    fetched = {}
+    if missing_ids:
         conn = create_db_connection()
         if not conn:
-            return jsonify({"error": "Koneksi database gagal"}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        # Gunakan 'IN' untuk query yang efisien
-        format_strings = ','.join(['%s'] * len(recommended_movie_ids))
-        query = f"SELECT movie_id, original_title, poster_path, watch_providers FROM movies_all_data WHERE movie_id IN ({format_strings})"
-        cursor.execute(query, tuple(recommended_movie_ids))
-        recommended_details = cursor.fetchall()
-        
-        # 5. Proses untuk menemukan platform dominan
-        platform_counts = {}
-        for movie in recommended_details:
-            try:
-                providers = json.loads(movie.get('watch_providers', '[]'))
-                for provider in providers:
-                    platform_name = provider.get('name')
-                    if platform_name:
-                        platform_counts[platform_name] = platform_counts.get(platform_name, 0) + 1
-            except (json.JSONDecodeError, TypeError):
-                continue
-        
-        dominant_platform = max(platform_counts, key=platform_counts.get) if platform_counts else None
-        
-        # 6. Bagi film menjadi dua kategori
+            return None
+        cursor = None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            # Gunakan 'IN' untuk query yang efisien
+            with phase("db_query"):
+                cursor.execute(RECOMMENDATION_ITEMS_QUERY.format(in_placeholders(missing_ids)), tuple(missing_ids))
+                fetched = {movie['movie_id']: movie for movie in cursor.fetchall()}
+        finally:
+            # Pastikan koneksi dikembalikan ke pool
+            release_db_connection(conn, cursor)
+    return group_recommendation_items(state, neighbor_rows, items, fetched)
+
+
+def recommendation_payload(movie_store, data):
+    """
+    Menandai respons rekomendasi yang memuat Fragment dari metadata_store, agar
+    json_codec langsung merakitnya tanpa mencoba encode biasa lebih dulu.
+    """
+    if movie_store.recommendation_fragments is None:
+        return data
+    return json_codec.WithFragments(data)
+
+
+def split_by_dominant_platform(movie_store, recommended_details, provider_masks, extra_names=()):
+    """Membagi film rekomendasi berdasarkan platform dominan (format respons API)."""
+    # Cari platform dominan dari bitmask provider (dihitung secara vektor)
+    dominant_platform, on_dominant = movie_store.dominant_provider(provider_masks, extra_names)
+
+    # Bagi film menjadi dua kategori
+    if dominant_platform:
+        dominant_movies = [movie for movie, hit in zip(recommended_details, on_dominant) if hit]
+        other_movies = [movie for movie, hit in zip(recommended_details, on_dominant) if not hit]
+    else:
+        # Jika tidak ada platform dominan, semua masuk ke 'lainnya'
         dominant_movies = []
-        other_movies = []
-        
-        if dominant_platform:
-            for movie in recommended_details:
-                try:
-                    providers = json.loads(movie.get('watch_providers', '[]'))
-                    provider_names = [p.get('name') for p in providers]
-                    if dominant_platform in provider_names:
-                        dominant_movies.append(movie)
-                    else:
-                        other_movies.append(movie)
-                except (json.JSONDecodeError, TypeError):
-                    other_movies.append(movie) # Jika ada error, anggap sebagai platform lain
-        else:
-            # Jika tidak ada platform dominan, semua masuk ke 'lainnya'
-            other_movies = recommended_details
-            dominant_platform = "Tidak Terdeteksi"
-            
-        # 7. Format respons sesuai kontrak API
-        response_data = {
-            "dominant_platform": {
-                "name": dominant_platform,
-                "movies": dominant_movies
-            },
-            "other_platforms": {
-                "movies": other_movies
-            }
+        other_movies = recommended_details
+        dominant_platform = "Tidak Terdeteksi"
+
+    # Format respons sesuai kontrak API
+    return {
+        "dominant_platform": {
+            "name": dominant_platform,
+            "movies": dominant_movies
+        },
+        "other_platforms": {
+            "movies": other_movies
         }
-        
-        return jsonify(response_data)
+    }
+
+
+def recommendation_neighbor_rows(state, movie_id):
+    """
+    Baris tetangga (1 x n) untuk satu film, atau (None, (data_error, status))
+    jika film tidak ada di model / tidak punya tetangga.
+    """
+    neighbor_index = state.neighbor_index
+    # 1. Temukan baris film yang dipilih melalui peta movie_id -> baris (O(1))
+    with phase("model_lookup"):
+        movie_index = neighbor_index.row_of(movie_id)
+    if movie_index is None:
+        return None, ({"error": "Film tidak ditemukan dalam model rekomendasi"}, 404)
+
+    # 2. Ambil tetangga terdekat dari indeks top-K (sudah terurut, tanpa film itu sendiri)
+    # Ambil 15 rekomendasi teratas untuk memastikan cukup data setelah filtering
+    with phase("top_n"):
+        neighbor_rows, _ = neighbor_index.top_n_batch([movie_index], RECOMMENDATION_COUNT)
+    if neighbor_rows.size == 0:
+        return None, ({"error": "Tidak ada rekomendasi yang dapat dibuat"}, 404)
+    return neighbor_rows, None
+
+
+def build_recommendations(movie_id, state=None):
+    """
+    Logika utama rekomendasi. Mengembalikan (data_respons, status_http) tanpa
+    membuat objek Response, sehingga hasilnya bisa diserialisasi sekali lalu di-cache.
+    """
+    state = state or serving
+    try:
+        neighbor_rows, error = recommendation_neighbor_rows(state, movie_id)
+        if error:
+            return error
+
+        # 3. Ambil detail film rekomendasi (store di memori, fallback ke database)
+        gathered = gather_recommendation_items(state, neighbor_rows)
+        if gathered is None:
+            return {"error": "Koneksi database gagal"}, 500
+        recommended_details, provider_masks, extra_names = gathered[0]
 
+        # 4. Bagi berdasarkan platform dominan
+        return split_by_dominant_platform(state.movie_store, recommended_details, provider_masks, extra_names), 200
+
+    except PoolExhausted:
+        raise # Ditangani handle_pool_exhausted (503)
     except Exception as e:
         print(f"Error dalam logika rekomendasi: {e}")
-        return jsonify({"error": "Terjadi kesalahan internal saat membuat rekomendasi"}), 500
-    finally:
-        # Pastikan koneksi ditutup jika dibuka
-        if 'conn' in locals() and conn.is_connected():
-            cursor.close()
-            conn.close()
+        return {"error": "Terjadi kesalahan internal saat membuat rekomendasi"}, 500
+
+
+def parse_batch_request(payload):
+    """
+    Validasi body /api/recommendations/batch. Mengembalikan (movie_ids, None)
+    tanpa duplikat (urutan dipertahankan), atau (None, pesan_error).
+    """
+    movie_ids = payload.get("movie_ids")
+    if not is_int_list(movie_ids):
+        return None, "movie_ids harus berupa list integer"
+    if len(movie_ids) > RECOMMENDATION_BATCH_MAX:
+        return None, f"Maksimal {RECOMMENDATION_BATCH_MAX} film per request"
+    return list(dict.fromkeys(movie_ids)), None
+
+
+def resolve_model_rows(neighbor_index, movie_ids):
+    """Memisahkan movie_ids menjadi [(movie_id, baris)] yang ada di model dan {movie_id: pesan_error}."""
+    known = []
+    errors = {}
+    with phase("model_lookup"):
+        for movie_id in movie_ids:
+            row = neighbor_index.row_of(movie_id)
+            if row is None:
+                errors[movie_id] = "Film tidak ditemukan dalam model rekomendasi"
+            else:
+                known.append((movie_id, row))
+    return known, errors
+
+
+@app.route('/api/recommendations/batch', methods=['POST'])
+def get_recommendations_batch():
+    """
+    Rekomendasi untuk banyak film sekaligus, misalnya beberapa baris di beranda.
+    Body JSON: {"movie_ids": [27205, 634649, ...]}. Tetangga semua film diambil
+    dengan satu gather dari array model dan metadatanya dengan satu lookup
+    (plus satu query untuk film yang tidak ada di memori).
+    Respons: {"results": {movie_id: <respons seperti /api/recommendations/<id>>},
+              "errors": {movie_id: pesan}}.
+    """
+    movie_ids, error = parse_batch_request(request.get_json(silent=True) or {})
+    if error:
+        return jsonify({"error": error}), 400
+
+    state = serving
+    known, errors = resolve_model_rows(state.neighbor_index, movie_ids)
+    results = {}
+    if known:
+        with phase("top_n"):
+            neighbor_rows, _ = state.neighbor_index.top_n_batch([row for _, row in known], RECOMMENDATION_COUNT)
+        try:
+            gathered = gather_recommendation_items(state, neighbor_rows)
+        except Error as e:
+            return jsonify({"error": str(e)}), 500
+        if gathered is None:
+            return jsonify({"error": "Koneksi database gagal"}), 500
+        for (movie_id, _), (recommended_details, provider_masks, extra_names) in zip(known, gathered):
+            results[movie_id] = split_by_dominant_platform(
+                state.movie_store, recommended_details, provider_masks, extra_names
+            )
+
+    return jsonify(recommendation_payload(state.movie_store, {"results": results, "errors": errors}))
+
+
+def parse_history_seeds(seeds):
+    """
+    Menerima list movie_id atau list {"movie_id": ..., "weight": ...}.
+    Mengembalikan list (movie_id, bobot), atau None jika formatnya salah.
+    Seed yang muncul lebih dari sekali bobotnya dijumlahkan.
+    """
+    if not isinstance(seeds, list):
+        return None
+    weights = {}
+    for seed in seeds:
+        if isinstance(seed, dict):
+            movie_id, weight = seed.get("movie_id"), seed.get("weight", 1.0)
+        else:
+            movie_id, weight = seed, 1.0
+        if not isinstance(movie_id, int) or isinstance(movie_id, bool):
+            return None
+        if not isinstance(weight, (int, float)) or isinstance(weight, bool) or not 0 < weight < float("inf"):
+            return None
+        weights[movie_id] = weights.get(movie_id, 0.0) + float(weight)
+    return list(weights.items())
+
+
+def parse_history_request(payload):
+    """
+    Validasi body /api/recommendations/because-you-watched.
+    Mengembalikan ((seeds, exclude_movie_ids, n), None) atau (None, pesan_error).
+    """
+    seeds = parse_history_seeds(payload.get("seeds"))
+    if not seeds:
+        return None, "seeds harus berupa list movie_id atau {movie_id, weight} dengan bobot positif"
+    if len(seeds) > RECOMMENDATION_SEEDS_MAX:
+        return None, f"Maksimal {RECOMMENDATION_SEEDS_MAX} film seed per request"
+    exclude_movie_ids = payload.get("exclude_movie_ids", [])
+    if not is_int_list(exclude_movie_ids):
+        return None, "exclude_movie_ids harus berupa list integer"
+    n = payload.get("n", RECOMMENDATION_COUNT)
+    if not isinstance(n, int) or isinstance(n, bool) or not 0 < n <= RECOMMENDATION_BATCH_MAX:
+        return None, f"n harus berupa integer 1..{RECOMMENDATION_BATCH_MAX}"
+    return (seeds, exclude_movie_ids, n), None
+
+
+def history_candidate_rows(neighbor_index, seeds, exclude_movie_ids, n):
+    """
+    Agregasi top-K seed menjadi baris kandidat (1 x n). Mengembalikan
+    (baris, seed_diabaikan, None) atau (None, seed_diabaikan, (data_error, status)).
+    """
+    seed_rows, weights, ignored = [], [], []
+    with phase("model_lookup"):
+        for movie_id, weight in seeds:
+            row = neighbor_index.row_of(movie_id)
+            if row is None:
+                ignored.append(movie_id)
+            else:
+                seed_rows.append(row)
+                weights.append(weight)
+        exclude_rows = [row for row in map(neighbor_index.row_of, exclude_movie_ids) if row is not None]
+    if not seed_rows:
+        return None, ignored, ({"error": "Tidak ada film seed yang ditemukan dalam model rekomendasi"}, 404)
+
+    with phase("top_n"):
+        candidate_rows, _ = neighbor_index.aggregate_neighbors(seed_rows, weights, n, exclude_rows)
+    if len(candidate_rows) == 0:
+        return None, ignored, ({"error": "Tidak ada rekomendasi yang dapat dibuat"}, 404)
+    return candidate_rows[np.newaxis, :], ignored, None
+
+
+@app.route('/api/recommendations/because-you-watched', methods=['POST'])
+def get_recommendations_for_history():
+    """
+    Rekomendasi dari beberapa film sekaligus (misalnya riwayat tonton pengguna).
+    Body JSON:
+        {"seeds": [27205, {"movie_id": 634649, "weight": 2}],
+         "exclude_movie_ids": [...],   # opsional, film yang sudah dilihat
+         "n": 15}                      # opsional
+    Skor kandidat adalah jumlah berbobot skor kemiripan dari daftar top-K
+    setiap seed, jadi biayanya bergantung pada jumlah seed x K, bukan ukuran katalog.
+    Respons sama dengan /api/recommendations/<id>, ditambah "ignored_seeds"
+    untuk film yang tidak ada di model.
+    """
+    parsed, error = parse_history_request(request.get_json(silent=True) or {})
+    if error:
+        return jsonify({"error": error}), 400
+
+    state = serving
+    candidate_rows, ignored, error = history_candidate_rows(state.neighbor_index, *parsed)
+    if error:
+        return jsonify(error[0]), error[1]
+
+    try:
+        gathered = gather_recommendation_items(state, candidate_rows)
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    if gathered is None:
+        return jsonify({"error": "Koneksi database gagal"}), 500
+    recommended_details, provider_masks, extra_names = gathered[0]
+
+    response_data = split_by_dominant_platform(state.movie_store, recommended_details, provider_masks, extra_names)
+    response_data["ignored_seeds"] = ignored
+    return jsonify(recommendation_payload(state.movie_store, response_data))
+
+
+@app.route('/api/recommendations/<int:movie_id>', methods=['GET'])
+def get_recommendations_for_movie(movie_id):
+    """Endpoint utama untuk mendapatkan rekomendasi film."""
+    state = serving
+    cache_key = state.cache_key(movie_id)
+    cached = recommendation_cache.get(cache_key)
+    if cached is None:
+        response_data, status = build_recommendations(movie_id, state)
+        if status != 200:
+            return jsonify(response_data), status
+        body = jsonify(recommendation_payload(state.movie_store, response_data)).get_data()
+        cached = recommendation_cache.put(cache_key, body)
+    return cached_json_response(*cached)
+
+
+def cached_json_response(body, etag):
+    """Respons JSON dari byte yang sudah diserialisasi, dengan ETag dan Cache-Control."""
+    response = app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={RECOMMENDATION_MAX_AGE}"
+    # Mengembalikan 304 Not Modified jika If-None-Match dari klien/CDN cocok
+    return response.make_conditional(request)
+
+
+def precompute_recommendations():
+    """Mengisi cache dengan respons untuk semua film di model (opsional, saat deploy)."""
+    with app.app_context():
+        started = time.perf_counter()
+        state = serving
+        for movie_id in state.neighbor_index.movie_ids.tolist():
+            response_data, status = build_recommendations(movie_id, state)
+            if status == 200:
+                body = jsonify(recommendation_payload(state.movie_store, response_data)).get_data()
+                recommendation_cache.put(state.cache_key(movie_id), body)
+        print(
+            f"✅ Prakomputasi {len(recommendation_cache)} respons rekomendasi selesai "
+            f"dalam {time.perf_counter() - started:.1f} detik."
+        )
+
+
+if os.getenv("PRECOMPUTE_RECOMMENDATIONS") == "1":
+    threading.Thread(target=precompute_recommendations, daemon=True).start()
 
 
 # ========================================================================
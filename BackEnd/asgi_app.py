@@ -0,0 +1,336 @@
+"""
+Mode serving async (ASGI) untuk API rekomendasi.
+
+Alternatif untuk `gunicorn app:app` (worker sync): route dan kontrak JSON sama
+persis, tetapi query MySQL dijalankan dengan aiomysql (lihat db_async.py),
+sehingga request yang sedang menunggu database tidak memblokir worker dan satu
+proses bisa menahan ratusan request sekaligus.
+
+Model, metadata di memori, cache respons, hot-reload dan logika rekomendasi
+dipakai ulang dari app.py (modul tersebut di-import apa adanya); di sini hanya
+lapisan HTTP dan akses database yang berbeda. Endpoint admin yang berat
+(update model, reload) tetap sinkron dan dijalankan di threadpool. Metrik
+per request dicatat oleh RequestTimingMiddleware dan diekspos di /metrics.
+
+Menjalankan:
+    uvicorn asgi_app:app --host 0.0.0.0 --port 8000
+    gunicorn asgi_app:app -k uvicorn.workers.UvicornWorker -w 2
+"""
+import re
+from contextlib import asynccontextmanager
+
+from pymysql.err import MySQLError
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Match, Route
+from werkzeug.http import parse_etags, quote_etag
+
+import app as core
+import db_async
+import json_codec
+import metrics
+from db import PoolExhausted
+from db_async import DatabaseUnavailable
+from metrics import phase
+
+
+def render_json(data):
+    # Serializer yang sama dengan app.py (json_codec), jadi byte respons identik
+    with phase("json_encode"):
+        return json_codec.dumps(data) + b"\n"
+
+
+def json_response(data, status=200, headers=None):
+    return Response(render_json(data), status_code=status, headers=headers, media_type="application/json")
+
+
+async def json_body(request):
+    """Padanan request.get_json(silent=True) or {} di Flask."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if not (content_type == "application/json" or (content_type.startswith("application/") and content_type.endswith("+json"))):
+        return {}
+    try:
+        payload = json_codec.loads(await request.body())
+    except ValueError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def is_admin_request(request):
+    return bool(core.ADMIN_TOKEN) and request.headers.get("x-admin-token") == core.ADMIN_TOKEN
+
+
+# ========================================================================
+# ENDPOINT API
+# ========================================================================
+
+async def test_db_connection(request):
+    try:
+        await db_async.ping()
+    except DatabaseUnavailable:
+        print("❌ Tes koneksi DB GAGAL dari endpoint.")
+        return json_response({"status": "error", "message": "Gagal terhubung ke database."}, 500)
+    return json_response({
+        "status": "success",
+        "message": "Berhasil terhubung ke database MySQL di Railway!",
+        "pool": db_async.pool_stats(),
+        "recommendation_cache": core.recommendation_cache.stats(),
+    })
+
+
+async def get_all_movies(request):
+    return json_response(await db_async.fetch_all(core.ALL_MOVIES_QUERY))
+
+
+async def search_movies(request):
+    query = request.query_params.get("q", "").strip()
+    limit = core.parse_search_limit(request.query_params.get("limit"))
+    if not query:
+        return json_response([])
+
+    movie_store = core.serving.movie_store
+    if len(movie_store):
+        with phase("metadata_lookup"):
+            titles = movie_store.search_titles(query, limit)
+        return json_response(titles)
+    # Store kosong (database tidak tersedia saat startup): pencarian prefix langsung di MySQL
+    return json_response(await db_async.fetch_all(core.SEARCH_TITLE_QUERY, (core.title_prefix_pattern(query), limit)))
+
+
+async def get_movie_details(request):
+    movie_id = request.path_params["movie_id"]
+    # Layani dari memori jika film dikenal, selain itu fallback ke MySQL
+    with phase("metadata_lookup"):
+        movie = core.serving.movie_store.movie_details(movie_id)
+    if movie:
+        return json_response(movie)
+    movie = await db_async.fetch_one(core.MOVIE_DETAILS_QUERY, (movie_id,))
+    if movie:
+        return json_response(core.parse_movie_row(movie))
+    return json_response({"error": "Film tidak ditemukan"}, 404)
+
+
+async def gather_recommendation_items(state, neighbor_rows):
+    """Padanan async gather_recommendation_items di app.py."""
+    items, missing_ids = core.lookup_recommendation_items(state, neighbor_rows)
+    fetched = {}
+    if missing_ids:
+        rows = await db_async.fetch_all(
+            core.RECOMMENDATION_ITEMS_QUERY.format(core.in_placeholders(missing_ids)),
+            tuple(missing_ids),
+        )
+        fetched = {movie["movie_id"]: movie for movie in rows}
+    return core.group_recommendation_items(state, neighbor_rows, items, fetched)
+
+
+async def build_recommendations(movie_id, state):
+    try:
+        neighbor_rows, error = core.recommendation_neighbor_rows(state, movie_id)
+        if error:
+            return error
+        recommended_details, provider_masks, extra_names = (await gather_recommendation_items(state, neighbor_rows))[0]
+        return core.split_by_dominant_platform(state.movie_store, recommended_details, provider_masks, extra_names), 200
+    except PoolExhausted:
+        raise
+    except DatabaseUnavailable:
+        return {"error": "Koneksi database gagal"}, 500
+    except Exception as e:
+        print(f"Error dalam logika rekomendasi: {e}")
+        return {"error": "Terjadi kesalahan internal saat membuat rekomendasi"}, 500
+
+
+def cached_json_response(request, body, etag):
+    """Padanan cached_json_response di app.py (ETag, Cache-Control, 304)."""
+    headers = {"ETag": quote_etag(etag), "Cache-Control": f"public, max-age={core.RECOMMENDATION_MAX_AGE}"}
+    if parse_etags(request.headers.get("if-none-match")).contains(etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, headers=headers, media_type="application/json")
+
+
+async def get_recommendations_for_movie(request):
+    movie_id = request.path_params["movie_id"]
+    state = core.serving
+    cache_key = state.cache_key(movie_id)
+    cached = core.recommendation_cache.get(cache_key)
+    if cached is None:
+        response_data, status = await build_recommendations(movie_id, state)
+        if status != 200:
+            return json_response(response_data, status)
+        body = render_json(core.recommendation_payload(state.movie_store, response_data))
+        cached = core.recommendation_cache.put(cache_key, body)
+    return cached_json_response(request, *cached)
+
+
+async def get_recommendations_batch(request):
+    movie_ids, error = core.parse_batch_request(await json_body(request))
+    if error:
+        return json_response({"error": error}, 400)
+
+    state = core.serving
+    known, errors = core.resolve_model_rows(state.neighbor_index, movie_ids)
+    results = {}
+    if known:
+        with phase("top_n"):
+            neighbor_rows, _ = state.neighbor_index.top_n_batch([row for _, row in known], core.RECOMMENDATION_COUNT)
+        gathered = await gather_recommendation_items(state, neighbor_rows)
+        for (movie_id, _), (recommended_details, provider_masks, extra_names) in zip(known, gathered):
+            results[movie_id] = core.split_by_dominant_platform(
+                state.movie_store, recommended_details, provider_masks, extra_names
+            )
+    return json_response(core.recommendation_payload(state.movie_store, {"results": results, "errors": errors}))
+
+
+async def get_recommendations_for_history(request):
+    parsed, error = core.parse_history_request(await json_body(request))
+    if error:
+        return json_response({"error": error}, 400)
+
+    state = core.serving
+    candidate_rows, ignored, error = core.history_candidate_rows(state.neighbor_index, *parsed)
+    if error:
+        return json_response(*error)
+    recommended_details, provider_masks, extra_names = (await gather_recommendation_items(state, candidate_rows))[0]
+    response_data = core.split_by_dominant_platform(state.movie_store, recommended_details, provider_masks, extra_names)
+    response_data["ignored_seeds"] = ignored
+    return json_response(core.recommendation_payload(state.movie_store, response_data))
+
+
+# --- Admin: logika sinkron dari app.py, dijalankan di threadpool ---
+
+async def reload_metadata(request):
+    if not is_admin_request(request):
+        return json_response({"error": "Tidak diizinkan"}, 403)
+    return json_response(*await run_in_threadpool(core.reload_metadata_now))
+
+
+async def list_model_versions(request):
+    if not is_admin_request(request):
+        return json_response({"error": "Tidak diizinkan"}, 403)
+    return json_response(core.model_versions_info())
+
+
+async def reload_model_endpoint(request):
+    if not is_admin_request(request):
+        return json_response({"error": "Tidak diizinkan"}, 403)
+    version = (await json_body(request)).get("version")
+    return json_response(*await run_in_threadpool(core.activate_model_version, version))
+
+
+async def add_movies_to_model(request):
+    if not is_admin_request(request):
+        return json_response({"error": "Tidak diizinkan"}, 403)
+    movie_ids = (await json_body(request)).get("movie_ids")
+    return json_response(*await run_in_threadpool(core.apply_model_update, movie_ids))
+
+
+async def prometheus_metrics(request):
+    return Response(metrics.render(), headers={"Content-Type": metrics.CONTENT_TYPE})
+
+
+# Statistik pool yang relevan di mode ini adalah pool aiomysql
+metrics.registry.register_collector("db_pool", lambda: metrics.set_pool_metrics(db_async.pool_stats()))
+
+
+# ========================================================================
+# PENANGANAN ERROR & APLIKASI
+# ========================================================================
+
+async def handle_pool_exhausted(request, exc):
+    # Jumlahnya ada di db_pool_exhausted_total (/metrics)
+    return json_response({"error": "Server sedang sibuk, silakan coba lagi sebentar lagi"}, 503, {"Retry-After": "1"})
+
+
+async def handle_database_unavailable(request, exc):
+    return json_response({"error": "Koneksi database gagal"}, 500)
+
+
+async def handle_mysql_error(request, exc):
+    return json_response({"error": str(exc)}, 500)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await db_async.open_pool()
+    yield
+    await db_async.close_pool()
+
+
+routes = [
+    Route("/api/test-db", test_db_connection),
+    Route("/api/movies", get_all_movies, methods=["GET"]),
+    Route("/api/movies/search", search_movies, methods=["GET"]),
+    Route("/api/movies/{movie_id:int}", get_movie_details, methods=["GET"]),
+    Route("/api/recommendations/batch", get_recommendations_batch, methods=["POST"]),
+    Route("/api/recommendations/because-you-watched", get_recommendations_for_history, methods=["POST"]),
+    Route("/api/recommendations/{movie_id:int}", get_recommendations_for_movie, methods=["GET"]),
+    Route("/api/admin/reload-metadata", reload_metadata, methods=["POST"]),
+    Route("/api/admin/models", list_model_versions, methods=["GET"]),
+    Route("/api/admin/reload-model", reload_model_endpoint, methods=["POST"]),
+    Route("/api/admin/models/add", add_movies_to_model, methods=["POST"]),
+    Route("/metrics", prometheus_metrics, methods=["GET"]),
+]
+
+
+def flask_route_label(path):
+    """/api/movies/{movie_id:int} -> /api/movies/<int:movie_id>, agar label route sama dengan app.py."""
+    return re.sub(r"\{(\w+):(\w+)\}", r"<\2:\1>", path)
+
+
+ROUTE_LABELS = [(route, flask_route_label(route.path)) for route in routes]
+
+
+def route_label(scope):
+    for route, label in ROUTE_LABELS:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return label
+    return "unmatched"
+
+
+class RequestTimingMiddleware:
+    """Middleware ASGI murni: mencatat durasi dan fase setiap request HTTP (lihat metrics.py)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = metrics.start_request(route_label(scope), scope["method"])
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.finish_request(token, status)
+
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(RequestTimingMiddleware),
+        Middleware(
+            CORSMiddleware,
+            allow_origins=getattr(core, "allowed_origins", ["*"]),
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+    ],
+    exception_handlers={
+        PoolExhausted: handle_pool_exhausted,
+        DatabaseUnavailable: handle_database_unavailable,
+        MySQLError: handle_mysql_error,
+    },
+    lifespan=lifespan,
+)
@@ -0,0 +1,99 @@
+"""
+Benchmark recall indeks LSH (ann_index.py) terhadap cosine eksak.
+
+Acuan "eksak" adalah perilaku get_recommendations_for_movie: 15 film dengan
+cosine similarity tertinggi, tanpa film itu sendiri. Recall@15 = irisan
+daftar LSH dan daftar eksak dibagi 15, dirata-rata atas semua film sampel.
+
+Penggunaan (dari direktori BackEnd):
+    python benchmarks/ann_recall.py --catalog movies_all_data.csv
+    python benchmarks/ann_recall.py --synthetic 20000 --tables 8 12 16
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ann_index import DEFAULT_TABLES, LSHIndex  # noqa: E402
+from build_model import (  # noqa: E402
+    _cosine_top_k_rows,
+    build_tags,
+    load_catalog_from_file,
+    vectorize_tags,
+)
+
+RECOMMENDATION_COUNT = 15  # Sama dengan jumlah rekomendasi di app.py
+
+
+def synthetic_catalog(n_movies, seed=0):
+    """Katalog acak dengan struktur mirip movies_all_data (genre, kata kunci, kru, sinopsis)."""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    genres = np.array(["Action", "Drama", "Comedy", "Horror", "Science Fiction", "Romance", "Thriller", "Animation"])
+    words = np.array([f"word{i}" for i in range(3000)])
+    people = np.array([f"Person {i}" for i in range(max(n_movies // 4, 50))])
+    # Kata-kata dengan distribusi Zipf agar ada tema yang sering muncul bersama
+    zipf = 1.0 / np.arange(1, len(words) + 1)
+    zipf /= zipf.sum()
+    return pd.DataFrame(
+        {
+            "movie_id": np.arange(1, n_movies + 1),
+            "genres": [", ".join(rng.choice(genres, 2, replace=False)) for _ in range(n_movies)],
+            "keywords": [", ".join(rng.choice(words, 5, p=zipf)) for _ in range(n_movies)],
+            "directors": rng.choice(people, n_movies),
+            "main_actors": [", ".join(rng.choice(people, 5, replace=False)) for _ in range(n_movies)],
+            "overview": [" ".join(rng.choice(words, 30, p=zipf)) for _ in range(n_movies)],
+        }
+    )
+
+
+def run(features, sample_rows, n_tables, n_bits):
+    n = RECOMMENDATION_COUNT
+    exact, _ = _cosine_top_k_rows(features, sample_rows, n)
+
+    started = time.perf_counter()
+    index = LSHIndex.create(features.shape[1], features.shape[0], n_tables=n_tables, n_bits=n_bits).fit(features)
+    build_seconds = time.perf_counter() - started
+
+    hits = 0
+    latencies = []
+    for row, expected in zip(sample_rows.tolist(), exact):
+        started = time.perf_counter()
+        rows, _ = index.query_row(row, n)
+        latencies.append(time.perf_counter() - started)
+        hits += len(np.intersect1d(rows, expected))
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "tables": index.n_tables,
+        "bits": index.n_bits,
+        "recall_at_15": round(hits / (len(sample_rows) * n), 4),
+        "index_build_seconds": round(build_seconds, 3),
+        "query_ms_p50": round(float(np.percentile(latencies_ms, 50)), 3),
+        "query_ms_p95": round(float(np.percentile(latencies_ms, 95)), 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall@15 LSH vs cosine eksak.")
+    parser.add_argument("--catalog", help="CSV/CSV.gz/Parquet hasil scrape/Export.py")
+    parser.add_argument("--synthetic", type=int, default=20000, help="Jumlah film sintetis jika --catalog kosong")
+    parser.add_argument("--vectorizer", choices=("count", "tfidf"), default="count")
+    parser.add_argument("--tables", type=int, nargs="+", default=[DEFAULT_TABLES])
+    parser.add_argument("--bits", type=int, default=None)
+    parser.add_argument("--sample", type=int, default=500, help="Jumlah film yang diuji")
+    args = parser.parse_args()
+
+    catalog = load_catalog_from_file(args.catalog) if args.catalog else synthetic_catalog(args.synthetic)
+    _, features = vectorize_tags(build_tags(catalog), kind=args.vectorizer)
+    rng = np.random.default_rng(1)
+    sample_rows = rng.choice(features.shape[0], min(args.sample, features.shape[0]), replace=False)
+
+    results = [run(features, sample_rows, n_tables, args.bits) for n_tables in args.tables]
+    print(json.dumps({"n_movies": features.shape[0], "n_features": features.shape[1], "results": results}, indent=2))
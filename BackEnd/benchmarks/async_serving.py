@@ -0,0 +1,91 @@
+"""
+Benchmark mode serving: `gunicorn app:app` (worker sync) vs asgi_app.py
+(uvicorn worker + aiomysql) dengan jumlah worker yang sama.
+
+Langkah:
+1. Membangun model dari katalog sintetis ke direktori sementara.
+2. Menjalankan benchmarks/mysql_standin.py dengan data yang sama dan jeda
+   --latency-ms per query. Tabel penuh tidak dikirim saat startup, jadi store
+   metadata di app kosong dan setiap request detail/rekomendasi melakukan
+   round-trip MySQL (skenario yang dibandingkan).
+3. Untuk setiap server dan setiap tingkat konkurensi, menjalankan
+   benchmarks/http_load.py terhadap /api/movies/<id> dan
+   /api/recommendations/<id> (cache respons dimatikan).
+
+Hasil dicetak sebagai JSON. Penggunaan (dari direktori BackEnd, butuh
+gunicorn, uvicorn, starlette dan aiomysql):
+    python benchmarks/async_serving.py --movies 5000 --latency-ms 5 --workers 2 -c 16 64 256
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from harness import (
+    SERVERS,
+    build_synthetic_model,
+    environment_info,
+    server_env,
+    start_server,
+    start_standin,
+    stop,
+)
+from http_load import run_load
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark gunicorn app:app vs asgi_app:app.")
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Jeda per query di MySQL stand-in")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("-c", "--concurrency", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("--servers", nargs="+", choices=sorted(SERVERS), default=["sync", "async"])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-serving-")
+    standin = None
+    try:
+        model_dir = os.path.join(workdir, "model")
+        movie_ids = build_synthetic_model(model_dir, args.movies)[:1000]
+        standin, db_port = start_standin(args.movies, args.latency_ms, full_table=False)
+        env = server_env(model_dir, db_port, RECOMMENDATION_CACHE_MB=0)
+        scenarios = {
+            "movie_details": [f"/api/movies/{movie_id}" for movie_id in movie_ids],
+            "recommendations": [f"/api/recommendations/{movie_id}" for movie_id in movie_ids],
+        }
+
+        results = []
+        for kind in args.servers:
+            server, base_url = start_server(kind, args.workers, env, f"/api/movies/{movie_ids[0]}")
+            try:
+                for scenario, paths in scenarios.items():
+                    for concurrency in args.concurrency:
+                        result = asyncio.run(run_load(base_url, paths, concurrency, args.duration))
+                        results.append({"server": kind, "scenario": scenario, **result})
+                        print(
+                            f"{kind:5} {scenario:15} c={concurrency:<4} {result['rps']:>8} rps  "
+                            f"p50 {result['latency_ms']['p50']} ms  p99 {result['latency_ms']['p99']} ms  "
+                            f"error {result['errors'] + result['non_2xx']}",
+                            file=sys.stderr,
+                        )
+            finally:
+                stop(server)
+
+        print(json.dumps({
+            "suite": "async_serving",
+            "environment": environment_info(),
+            "config": {
+                "movies": args.movies,
+                "db_latency_ms": args.latency_ms,
+                "workers": args.workers,
+                "duration_seconds": args.duration,
+            },
+            "results": results,
+        }, indent=2))
+    finally:
+        if standin is not None:
+            stop(standin)
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,89 @@
+"""
+Membandingkan dua file JSON hasil benchmark (core_micro.py, endpoints.py atau
+async_serving.py), misalnya dari dua commit berbeda.
+
+Untuk core_micro, yang dibandingkan mean_us (lebih kecil lebih baik); untuk
+benchmark HTTP, rps (lebih besar lebih baik) dan p99 (lebih kecil lebih baik).
+Exit code 1 jika ada regresi melebihi --threshold persen, sehingga bisa
+dipakai di CI.
+
+Penggunaan:
+    python benchmarks/compare.py baseline.json hasil_baru.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+
+def result_key(result):
+    if "benchmark" in result:
+        return (result["n_movies"], result["benchmark"])
+    return (result.get("server"), result["scenario"], result["concurrency"])
+
+
+def metrics(result):
+    """{nama_metrik: (nilai, lebih_besar_lebih_baik)}"""
+    if "benchmark" in result:
+        return {"mean_us": (result["mean_us"], False)}
+    return {"rps": (result["rps"], True), "p99_ms": (result["latency_ms"]["p99"], False)}
+
+
+def compare(baseline, current, threshold):
+    """Mengembalikan list baris perbandingan dan jumlah regresi."""
+    baseline_results = {result_key(result): result for result in baseline["results"]}
+    rows = []
+    regressions = 0
+    for result in current["results"]:
+        key = result_key(result)
+        previous = baseline_results.get(key)
+        if previous is None:
+            continue
+        previous_metrics = metrics(previous)
+        for name, (value, higher_is_better) in metrics(result).items():
+            before = previous_metrics[name][0]
+            change = (value - before) / before * 100 if before else 0.0
+            worse = -change if higher_is_better else change
+            regressed = worse > threshold
+            regressions += regressed
+            rows.append({
+                "key": "/".join(str(part) for part in key if part is not None),
+                "metric": name,
+                "before": before,
+                "after": value,
+                "change_percent": round(change, 1),
+                "regression": regressed,
+            })
+    return rows, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan dua hasil benchmark JSON.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Batas regresi dalam persen")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    rows, regressions = compare(baseline, current, args.threshold)
+
+    if args.json:
+        print(json.dumps({
+            "baseline_revision": baseline.get("environment", {}).get("revision"),
+            "current_revision": current.get("environment", {}).get("revision"),
+            "threshold_percent": args.threshold,
+            "regressions": regressions,
+            "rows": rows,
+        }, indent=2))
+    else:
+        for row in rows:
+            flag = "❌" if row["regression"] else "  "
+            print(
+                f"{flag} {row['key']:40} {row['metric']:8} {row['before']:>12} -> {row['after']:>12} "
+                f"({row['change_percent']:+.1f}%)"
+            )
+        print(f"{regressions} regresi di atas {args.threshold}%.")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,134 @@
+"""
+Micro-benchmark inti rekomendasi tanpa HTTP dan tanpa database.
+
+Model sintetis (movie_id, top-K tetangga acak dengan skor terurut) dan store
+metadata sintetis dibuat langsung di memori untuk setiap ukuran katalog, lalu
+setiap operasi diukur berulang kali:
+- row_of               lookup movie_id -> baris model
+- top_n                top-15 satu film dari indeks top-K
+- top_n_batch_50       gather top-15 untuk 50 film sekaligus
+- select_top_n_dense   top-15 dari satu baris skor penuh (N kolom)
+- aggregate_200_seeds  agregasi "because you watched" dari 200 seed
+- recommendation_items detail + bitmask provider untuk 15 film
+- dominant_provider    platform dominan dari 15 bitmask
+- recommendation_core  gabungan lookup -> top_n -> items -> platform dominan
+
+Hasil dicetak sebagai JSON (waktu per operasi dalam mikrodetik).
+Penggunaan (dari direktori BackEnd):
+    python benchmarks/core_micro.py > core.json
+    python benchmarks/core_micro.py --sizes 1000 20000 --repeat 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness import environment_info  # noqa: E402
+from metadata_store import MovieMetadataStore  # noqa: E402
+from mysql_standin import PROVIDERS  # noqa: E402
+from recommender import DEFAULT_TOP_K, NeighborIndex, select_top_n  # noqa: E402
+
+RECOMMENDATION_COUNT = 15  # Sama dengan jumlah rekomendasi di app.py
+DEFAULT_SIZES = (1000, 20000, 100000)
+
+
+def synthetic_model(n_movies, top_k=DEFAULT_TOP_K, seed=0):
+    rng = np.random.default_rng(seed)
+    movie_ids = np.arange(1, n_movies + 1, dtype=np.int64) * 7
+    neighbors = rng.integers(0, n_movies, (n_movies, top_k), dtype=np.int32)
+    scores = -np.sort(-rng.random((n_movies, top_k), dtype=np.float32), axis=1)
+    return NeighborIndex(movie_ids, neighbors, scores, meta={"version": "synthetic"})
+
+
+def synthetic_store(movie_ids, seed=0):
+    rng = np.random.default_rng(seed + 1)
+    providers = [
+        json.dumps([PROVIDERS[i] for i in rng.choice(len(PROVIDERS), rng.integers(0, 3), replace=False)])
+        for _ in range(len(movie_ids))
+    ]
+    columns = {
+        "movie_id": movie_ids.tolist(),
+        "original_title": [f"Movie {movie_id}" for movie_id in movie_ids.tolist()],
+        "poster_path": [f"/poster{movie_id}.jpg" for movie_id in movie_ids.tolist()],
+        "watch_providers": providers,
+        "vote_average": rng.uniform(3, 9, len(movie_ids)).round(1).tolist(),
+    }
+    return MovieMetadataStore(columns, source="synthetic").align_to_model(movie_ids)
+
+
+def measure(operation, inputs, repeat):
+    """Menjalankan operation(input) untuk setiap input, `repeat` putaran; statistik per panggilan."""
+    operation(inputs[0]) # Pemanasan
+    per_call = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for value in inputs:
+            operation(value)
+        per_call.append((time.perf_counter() - started) / len(inputs))
+    per_call_us = np.array(per_call) * 1e6
+    return {
+        "mean_us": round(float(per_call_us.mean()), 3),
+        "p50_us": round(float(np.percentile(per_call_us, 50)), 3),
+        "p95_us": round(float(np.percentile(per_call_us, 95)), 3),
+        "ops_per_second": round(1e6 / float(per_call_us.mean()), 1),
+    }
+
+
+def run_size(n_movies, repeat, calls):
+    rng = np.random.default_rng(2)
+    index = synthetic_model(n_movies)
+    store = synthetic_store(index.movie_ids)
+    n = RECOMMENDATION_COUNT
+
+    rows = rng.integers(0, n_movies, calls)
+    movie_ids = index.movie_ids[rows].tolist()
+    row_batches = [rng.integers(0, n_movies, 50) for _ in range(max(calls // 50, 4))]
+    seed_batches = [(rng.integers(0, n_movies, 200), rng.uniform(0.5, 2, 200)) for _ in range(max(calls // 50, 4))]
+    dense_rows = [rng.random(n_movies, dtype=np.float32) for _ in range(4)]
+    neighbor_lists = [index.top_n(row, n)[0] for row in rows[:64]]
+    mask_lists = [store.recommendation_items(neighbors)[1] for neighbors in neighbor_lists]
+
+    def recommendation_core(movie_id):
+        neighbors, _ = index.top_n(index.row_of(movie_id), n)
+        _, masks = store.recommendation_items(neighbors)
+        return store.dominant_provider(masks)
+
+    benchmarks = {
+        "row_of": (index.row_of, movie_ids),
+        "top_n": (lambda row: index.top_n(row, n), rows.tolist()),
+        "top_n_batch_50": (lambda batch: index.top_n_batch(batch, n), row_batches),
+        "select_top_n_dense": (lambda scores: select_top_n(scores, n, exclude=0), dense_rows),
+        "aggregate_200_seeds": (lambda seeds: index.aggregate_neighbors(seeds[0], seeds[1], n), seed_batches),
+        "recommendation_items": (store.recommendation_items, neighbor_lists),
+        "dominant_provider": (store.dominant_provider, mask_lists),
+        "recommendation_core": (recommendation_core, movie_ids),
+    }
+    results = []
+    for name, (operation, inputs) in benchmarks.items():
+        stats = measure(operation, inputs, repeat)
+        results.append({"n_movies": n_movies, "benchmark": name, **stats})
+        print(f"{n_movies:>7} {name:22} {stats['mean_us']:>10.2f} µs", file=sys.stderr)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark inti rekomendasi pada model sintetis.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=20, help="Jumlah putaran per benchmark")
+    parser.add_argument("--calls", type=int, default=1000, help="Jumlah input berbeda per putaran")
+    args = parser.parse_args()
+
+    results = []
+    for n_movies in args.sizes:
+        results.extend(run_size(n_movies, args.repeat, args.calls))
+    print(json.dumps({
+        "suite": "core_micro",
+        "environment": environment_info(),
+        "config": {"sizes": args.sizes, "repeat": args.repeat, "calls": args.calls},
+        "results": results,
+    }, indent=2))
@@ -0,0 +1,113 @@
+"""
+Load test per endpoint terhadap server backend dengan MySQL stand-in.
+
+Membangun model sintetis, menjalankan benchmarks/mysql_standin.py dengan data
+yang sama, lalu menjalankan server (gunicorn app:app secara default, atau
+asgi_app:app dengan --server async) dan mengukur setiap endpoint dengan
+benchmarks/http_load.py. Tidak butuh Docker maupun MySQL sungguhan.
+
+Secara default metadata dimuat ke memori saat startup seperti di produksi;
+--no-full-table membuat setiap request detail/rekomendasi ke database.
+Cache respons rekomendasi dimatikan (--cache-mb 0) agar yang diukur adalah
+jalur komputasi, bukan cache.
+
+Hasil dicetak sebagai JSON; bandingkan antar commit dengan benchmarks/compare.py.
+Penggunaan (dari direktori BackEnd):
+    python benchmarks/endpoints.py --movies 20000 -c 32 -d 10 > endpoints.json
+    python benchmarks/endpoints.py --server async --no-full-table --latency-ms 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from harness import (
+    SERVERS,
+    build_synthetic_model,
+    environment_info,
+    server_env,
+    start_server,
+    start_standin,
+    stop,
+)
+from http_load import run_load
+
+
+def endpoint_scenarios(movie_ids):
+    """{nama: (method, paths, body)} untuk setiap endpoint publik."""
+    sample = movie_ids[:1000]
+    return {
+        "movie_details": ("GET", [f"/api/movies/{movie_id}" for movie_id in sample], None),
+        "recommendations": ("GET", [f"/api/recommendations/{movie_id}" for movie_id in sample], None),
+        "search": ("GET", [f"/api/movies/search?q=movie%20{movie_id}" for movie_id in sample[:100]], None),
+        "recommendations_batch": (
+            "POST", ["/api/recommendations/batch"], json.dumps({"movie_ids": sample[:10]}),
+        ),
+        "because_you_watched": (
+            "POST",
+            ["/api/recommendations/because-you-watched"],
+            json.dumps({"seeds": sample[:20], "exclude_movie_ids": sample[20:40]}),
+        ),
+        "all_movies": ("GET", ["/api/movies"], None),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test per endpoint (p50/p95/p99, RPS) dengan MySQL stand-in.")
+    parser.add_argument("--server", choices=sorted(SERVERS), default="sync")
+    parser.add_argument("--movies", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("-c", "--concurrency", type=int, default=32)
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Jeda per query di MySQL stand-in")
+    parser.add_argument("--no-full-table", action="store_true", help="Tanpa metadata di memori (semua lewat MySQL)")
+    parser.add_argument("--cache-mb", type=float, default=0, help="RECOMMENDATION_CACHE_MB untuk server")
+    parser.add_argument("--only", nargs="+", help="Hanya jalankan skenario ini")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-endpoints-")
+    standin = server = None
+    try:
+        model_dir = os.path.join(workdir, "model")
+        movie_ids = build_synthetic_model(model_dir, args.movies)
+        standin, db_port = start_standin(args.movies, args.latency_ms, full_table=not args.no_full_table)
+        env = server_env(model_dir, db_port, RECOMMENDATION_CACHE_MB=args.cache_mb)
+        server, base_url = start_server(args.server, args.workers, env, f"/api/movies/{movie_ids[0]}")
+
+        results = []
+        for scenario, (method, paths, body) in endpoint_scenarios(movie_ids).items():
+            if args.only and scenario not in args.only:
+                continue
+            result = asyncio.run(run_load(base_url, paths, args.concurrency, args.duration, method, body))
+            results.append({"server": args.server, "scenario": scenario, **result})
+            print(
+                f"{scenario:22} {result['rps']:>8} rps  p50 {result['latency_ms']['p50']} ms  "
+                f"p95 {result['latency_ms']['p95']} ms  p99 {result['latency_ms']['p99']} ms  "
+                f"error {result['errors'] + result['non_2xx']}",
+                file=sys.stderr,
+            )
+
+        print(json.dumps({
+            "suite": "endpoints",
+            "environment": environment_info(),
+            "config": {
+                "server": args.server,
+                "movies": args.movies,
+                "workers": args.workers,
+                "concurrency": args.concurrency,
+                "duration_seconds": args.duration,
+                "db_latency_ms": args.latency_ms,
+                "metadata_in_memory": not args.no_full_table,
+                "cache_mb": args.cache_mb,
+            },
+            "results": results,
+        }, indent=2))
+    finally:
+        if server is not None:
+            stop(server)
+        if standin is not None:
+            stop(standin)
+        shutil.rmtree(workdir, ignore_errors=True)
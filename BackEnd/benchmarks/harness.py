@@ -0,0 +1,136 @@
+"""
+Utilitas bersama untuk benchmark HTTP: model sintetis, MySQL stand-in dan
+proses server (gunicorn app:app atau asgi_app:app) di port bebas.
+"""
+import contextlib
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+SERVERS = {
+    "sync": ["app:app"],
+    "async": ["asgi_app:app", "-k", "uvicorn.workers.UvicornWorker"],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def port_open(port):
+    with socket.socket() as sock:
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+
+def http_ok(url):
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return response.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def wait_until(check, timeout, what):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if check():
+            return
+        time.sleep(0.2)
+    raise RuntimeError(f"{what} tidak siap dalam {timeout} detik")
+
+
+def stop(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def build_synthetic_model(model_dir, n_movies):
+    """Membangun model dari katalog sintetis; mengembalikan list movie_id-nya."""
+    from ann_recall import synthetic_catalog
+    from build_model import build_from_catalog
+
+    catalog = synthetic_catalog(n_movies)
+    # Log build ke stderr agar stdout hanya berisi JSON hasil benchmark
+    with contextlib.redirect_stdout(sys.stderr):
+        build_from_catalog(catalog, model_dir, n_jobs=1)
+    return catalog["movie_id"].tolist()
+
+
+def start_standin(n_movies, latency_ms=0.0, full_table=True):
+    """Menjalankan mysql_standin.py di port bebas; mengembalikan (proses, port)."""
+    port = free_port()
+    command = [
+        sys.executable, os.path.join(BENCH_DIR, "mysql_standin.py"),
+        "--port", str(port), "--synthetic", str(n_movies), "--latency-ms", str(latency_ms),
+    ]
+    if not full_table:
+        command.append("--no-full-table")
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    wait_until(lambda: port_open(port), 120, "MySQL stand-in")
+    return process, port
+
+
+def server_env(model_dir, db_port, **overrides):
+    env = dict(
+        os.environ,
+        MODEL_DIR=model_dir,
+        MODEL_WATCH_INTERVAL="0",
+        DB_HOST="127.0.0.1",
+        DB_PORT=str(db_port),
+        DB_USER="bench",
+        DB_PASSWORD="bench",
+        DB_NAME="bench",
+    )
+    env.update({name: str(value) for name, value in overrides.items()})
+    return env
+
+
+def start_server(kind, workers, env, ready_path):
+    """Menjalankan server `kind` (lihat SERVERS) dan menunggu ready_path; mengembalikan (proses, base_url)."""
+    port = free_port()
+    command = [sys.executable, "-m", "gunicorn", *SERVERS[kind], "-w", str(workers), "-b", f"127.0.0.1:{port}"]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until(lambda: http_ok(base_url + ready_path), 120, f"Server {kind}")
+    except RuntimeError:
+        stop(process)
+        raise
+    return process, base_url
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info():
+    """Informasi lingkungan yang ikut disimpan di JSON hasil agar hasil antar commit bisa dibandingkan."""
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
@@ -0,0 +1,167 @@
+"""
+Load generator HTTP/1.1 sederhana (asyncio, tanpa dependensi tambahan).
+
+Sejumlah --concurrency klien berjalan bersamaan selama --duration detik; setiap
+klien mengirim request berikutnya segera setelah respons sebelumnya diterima
+(closed loop) dan memakai koneksi keep-alive jika server mengizinkannya
+(worker sync gunicorn menutup koneksi setelah setiap respons, jadi klien
+menyambung ulang). Hasilnya JSON berisi RPS, latensi p50/p95/p99 dan jumlah
+status per kode.
+
+Penggunaan:
+    python benchmarks/http_load.py --url http://127.0.0.1:8000 \
+        --path /api/recommendations/27205 --path /api/movies/27205 -c 64 -d 10
+    python benchmarks/http_load.py --url http://127.0.0.1:8000 --method POST \
+        --path /api/recommendations/batch --body '{"movie_ids": [27205, 634649]}'
+"""
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+async def _read_response(reader):
+    """Mengembalikan (status, keep_alive) setelah membaca seluruh body."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif status not in (204, 304):
+        await reader.read() # Body sampai koneksi ditutup
+        return status, False
+    return status, headers.get("connection", "").lower() != "close"
+
+
+class _Client:
+    def __init__(self, host, port, requests):
+        self.host = host
+        self.port = port
+        self.requests = requests
+        self.reader = None
+        self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.reader = self.writer = None
+
+    async def send(self, index):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(self.requests[index % len(self.requests)])
+        await self.writer.drain()
+        status, keep_alive = await _read_response(self.reader)
+        if not keep_alive:
+            await self.close()
+        return status
+
+
+def build_requests(host, port, paths, method="GET", body=None, headers=None):
+    """Request mentah (bytes) untuk setiap path, siap dikirim berulang."""
+    payload = body.encode("utf-8") if isinstance(body, str) else (body or b"")
+    extra = "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+    if payload:
+        extra += f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+    return [
+        f"{method} {path} HTTP/1.1\r\nHost: {host}:{port}\r\n{extra}\r\n".encode("latin-1") + payload
+        for path in paths
+    ]
+
+
+async def run_load(url, paths, concurrency=32, duration=10.0, method="GET", body=None, headers=None, warmup=1.0):
+    """
+    Menjalankan beban closed-loop ke url + paths dan mengembalikan ringkasan
+    (dict siap JSON). Request selama `warmup` detik pertama tidak dihitung.
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    requests = build_requests(host, port, paths, method, body, headers)
+    latencies = []
+    statuses = {}
+    errors = 0
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def worker(worker_id):
+        nonlocal errors
+        client = _Client(host, port, requests)
+        index = worker_id
+        while True:
+            sent = time.perf_counter()
+            if sent >= stop_at:
+                break
+            try:
+                status = await client.send(index)
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                await client.close()
+                status = None
+            done = time.perf_counter()
+            index += concurrency
+            if sent < measure_from:
+                continue
+            if status is None:
+                errors += 1
+            else:
+                statuses[status] = statuses.get(status, 0) + 1
+                latencies.append(done - sent)
+        await client.close()
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    completed = len(latencies)
+    return {
+        "url": url,
+        "paths": len(paths),
+        "method": method,
+        "concurrency": concurrency,
+        "duration_seconds": duration,
+        "requests": completed,
+        "errors": errors,
+        "non_2xx": sum(count for status, count in statuses.items() if not 200 <= status < 400),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "rps": round(completed / duration, 1),
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies_ms, 50)), 2),
+            "p95": round(float(np.percentile(latencies_ms, 95)), 2),
+            "p99": round(float(np.percentile(latencies_ms, 99)), 2),
+            "max": round(float(latencies_ms.max()), 2),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator HTTP closed-loop dengan ringkasan JSON.")
+    parser.add_argument("--url", required=True, help="Basis URL, misalnya http://127.0.0.1:8000")
+    parser.add_argument("--path", action="append", required=True, help="Boleh diulang; dipakai bergiliran")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--body", help="Body JSON untuk POST")
+    parser.add_argument("-c", "--concurrency", type=int, default=32)
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load(
+        args.url, args.path, args.concurrency, args.duration, args.method, args.body, warmup=args.warmup
+    ))
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,272 @@
+"""
+Server MySQL tiruan untuk benchmark (bukan untuk produksi).
+
+Berbicara protokol wire MySQL secukupnya (handshake mysql_native_password tanpa
+verifikasi password, COM_QUERY dengan resultset teks, COM_PING,
+COM_RESET_CONNECTION), sehingga mysql-connector (app.py) dan aiomysql
+(asgi_app.py) bisa terhubung tanpa perubahan kode. Isi tabel movies_all_data
+berasal dari katalog sintetis (sama dengan benchmarks/ann_recall.py) atau file
+hasil scrape/Export.py, dan setiap query diberi jeda --latency-ms untuk meniru
+round-trip ke database sungguhan.
+
+Query yang dikenali hanya bentuk yang dipakai backend:
+    SELECT <kolom|*> FROM movies_all_data
+        [WHERE movie_id = N | WHERE movie_id IN (...) | WHERE original_title LIKE '...']
+        [ORDER BY original_title ASC] [LIMIT n]
+Perintah lain (SET, dll.) dijawab OK.
+
+Penggunaan (dari direktori BackEnd):
+    python benchmarks/mysql_standin.py --port 3307 --synthetic 20000 --latency-ms 5
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import re
+import struct
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TABLE_COLUMNS = (
+    "movie_id", "original_title", "poster_path", "overview", "release_date", "vote_average",
+    "genres", "directors", "main_actors", "watch_providers", "keywords", "scraped_at", "original_language",
+)
+PROVIDERS = (
+    {"id": 8, "name": "Netflix", "logo": "/netflix.jpg", "subscribe_url": "https://www.netflix.com"},
+    {"id": 337, "name": "Disney Plus", "logo": "/disney.jpg", "subscribe_url": "https://www.disneyplus.com"},
+    {"id": 9, "name": "Amazon Prime Video", "logo": "/prime.jpg", "subscribe_url": "https://www.primevideo.com"},
+    {"id": 350, "name": "Apple TV Plus", "logo": "/appletv.jpg", "subscribe_url": "https://tv.apple.com"},
+)
+
+# Tipe kolom protokol MySQL
+TYPE_LONG = 3
+TYPE_FLOAT = 4
+TYPE_TIMESTAMP = 7
+TYPE_DATE = 10
+TYPE_VAR_STRING = 253
+COLUMN_TYPES = {"movie_id": TYPE_LONG, "vote_average": TYPE_FLOAT, "release_date": TYPE_DATE, "scraped_at": TYPE_TIMESTAMP}
+
+SERVER_CAPABILITIES = (
+    0x00000001 | 0x00000004 | 0x00000008 | 0x00000200 | 0x00002000 | 0x00008000 | 0x00020000 | 0x00080000 | 0x00200000
+)
+COM_QUIT, COM_QUERY = 0x01, 0x03
+CHARSET_UTF8MB4 = 45
+
+SELECT_PATTERN = re.compile(
+    r"^\s*SELECT\s+(?P<columns>.+?)\s+FROM\s+movies_all_data"
+    r"(?:\s+WHERE\s+(?P<where>.+?))?"
+    r"(?:\s+ORDER\s+BY\s+original_title(?:\s+ASC)?)?"
+    r"(?:\s+LIMIT\s+(?P<limit>\d+))?\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def synthetic_table(n_movies, seed=0):
+    """Baris movies_all_data untuk katalog sintetis ann_recall.synthetic_catalog (movie_id sama)."""
+    from ann_recall import synthetic_catalog
+
+    catalog = synthetic_catalog(n_movies, seed)
+    rng = np.random.default_rng(seed + 1)
+    rows = {}
+    base_date = datetime.date(1990, 1, 1)
+    for record in catalog.to_dict("records"):
+        movie_id = int(record["movie_id"])
+        providers = [PROVIDERS[i] for i in rng.choice(len(PROVIDERS), rng.integers(0, 3), replace=False)]
+        rows[movie_id] = {
+            **record,
+            "movie_id": movie_id,
+            "original_title": f"Movie {movie_id}",
+            "poster_path": f"/poster{movie_id}.jpg",
+            "release_date": base_date + datetime.timedelta(days=int(rng.integers(0, 12000))),
+            "vote_average": round(float(rng.uniform(3, 9)), 1),
+            "watch_providers": json.dumps(providers),
+            "scraped_at": datetime.datetime(2025, 1, 1, 12, 0, 0),
+            "original_language": "en",
+        }
+    return rows
+
+
+def file_table(path):
+    import pandas as pd
+
+    frame = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+    frame = frame.astype(object).where(frame.notna(), None)
+    return {int(record["movie_id"]): record for record in frame.to_dict("records")}
+
+
+def lenenc_int(value):
+    if value < 251:
+        return bytes([value])
+    if value < 1 << 16:
+        return b"\xfc" + struct.pack("<H", value)
+    if value < 1 << 24:
+        return b"\xfd" + struct.pack("<I", value)[:3]
+    return b"\xfe" + struct.pack("<Q", value)
+
+
+def lenenc_str(data):
+    return lenenc_int(len(data)) + data
+
+
+def encode_value(value):
+    if value is None:
+        return b"\xfb"
+    if isinstance(value, datetime.datetime):
+        text = value.strftime("%Y-%m-%d %H:%M:%S")
+    elif isinstance(value, datetime.date):
+        text = value.isoformat()
+    else:
+        text = str(value)
+    return lenenc_str(text.encode("utf-8"))
+
+
+def column_definition(name):
+    column_type = COLUMN_TYPES.get(name, TYPE_VAR_STRING)
+    encoded = name.encode()
+    return (
+        lenenc_str(b"def") + lenenc_str(b"bench") + lenenc_str(b"movies_all_data") + lenenc_str(b"movies_all_data")
+        + lenenc_str(encoded) + lenenc_str(encoded)
+        + b"\x0c" + struct.pack("<HIBHB", CHARSET_UTF8MB4, 1024, column_type, 0, 0) + b"\x00\x00"
+    )
+
+
+OK_PACKET = b"\x00\x00\x00\x02\x00\x00\x00"
+EOF_PACKET = b"\xfe\x00\x00\x02\x00"
+
+
+class MovieTable:
+    def __init__(self, rows):
+        self.rows = rows
+        self.by_title = sorted(rows.values(), key=lambda row: str(row.get("original_title") or ""))
+
+    def select(self, sql):
+        """Mengembalikan (nama_kolom, baris) untuk SELECT yang dikenali, atau None."""
+        match = SELECT_PATTERN.match(sql)
+        if not match:
+            return None
+        columns = match.group("columns").strip()
+        names = list(TABLE_COLUMNS) if columns == "*" else [c.strip().strip("`") for c in columns.split(",")]
+        where = (match.group("where") or "").strip()
+
+        if not where:
+            rows = self.by_title if re.search(r"ORDER\s+BY", sql, re.IGNORECASE) else list(self.rows.values())
+        elif (found := re.match(r"movie_id\s*=\s*(\d+)$", where, re.IGNORECASE)):
+            row = self.rows.get(int(found.group(1)))
+            rows = [row] if row else []
+        elif (found := re.match(r"movie_id\s+IN\s*\(([^)]*)\)$", where, re.IGNORECASE)):
+            ids = [int(value) for value in re.findall(r"\d+", found.group(1))]
+            rows = [self.rows[movie_id] for movie_id in ids if movie_id in self.rows]
+        elif (found := re.match(r"original_title\s+LIKE\s+'((?:[^'\\]|\\.)*)'$", where, re.IGNORECASE | re.DOTALL)):
+            prefix = re.sub(r"\\(.)", r"\1", found.group(1)).rstrip("%").lower()
+            rows = [row for row in self.by_title if str(row.get("original_title") or "").lower().startswith(prefix)]
+        else:
+            return None
+
+        if match.group("limit"):
+            rows = rows[:int(match.group("limit"))]
+        return names, [[row.get(name) for name in names] for row in rows]
+
+
+class StandinServer:
+    def __init__(self, table, latency_ms=0.0, serve_full_table=True):
+        self.table = table
+        self.latency = latency_ms / 1000
+        # False: "SELECT * FROM movies_all_data" dijawab kosong, jadi store metadata di app
+        # kosong dan setiap request detail/rekomendasi benar-benar ke database
+        self.serve_full_table = serve_full_table
+        self.next_connection_id = 1
+        self.queries = 0
+
+    async def handle(self, reader, writer):
+        connection_id = self.next_connection_id
+        self.next_connection_id += 1
+        try:
+            salt = os.urandom(20)
+            handshake = (
+                b"\x0a" + b"8.0.36-standin\x00" + struct.pack("<I", connection_id) + salt[:8] + b"\x00"
+                + struct.pack("<H", SERVER_CAPABILITIES & 0xFFFF) + bytes([CHARSET_UTF8MB4]) + struct.pack("<H", 2)
+                + struct.pack("<H", SERVER_CAPABILITIES >> 16) + bytes([21]) + b"\x00" * 10
+                + salt[8:] + b"\x00" + b"mysql_native_password\x00"
+            )
+            await self.send(writer, 0, handshake)
+            sequence, _ = await self.read_packet(reader) # Handshake response: password tidak diperiksa
+            await self.send(writer, sequence + 1, OK_PACKET)
+
+            while True:
+                sequence, payload = await self.read_packet(reader)
+                command = payload[0]
+                if command == COM_QUIT:
+                    break
+                if command == COM_QUERY:
+                    await self.query(writer, payload[1:].decode("utf-8", "replace"))
+                else:
+                    # COM_PING, COM_INIT_DB, COM_RESET_CONNECTION, dll.
+                    await self.send(writer, 1, OK_PACKET)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_packet(self, reader):
+        header = await reader.readexactly(4)
+        length = header[0] | header[1] << 8 | header[2] << 16
+        return header[3], await reader.readexactly(length)
+
+    async def send(self, writer, sequence, payload):
+        writer.write(struct.pack("<I", len(payload))[:3] + bytes([sequence & 0xFF]) + payload)
+        await writer.drain()
+
+    async def query(self, writer, sql):
+        self.queries += 1
+        if not re.match(r"\s*SELECT", sql, re.IGNORECASE):
+            await self.send(writer, 1, OK_PACKET)
+            return
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if not self.serve_full_table and re.fullmatch(r"\s*SELECT\s+\*\s+FROM\s+movies_all_data\s*", sql, re.IGNORECASE):
+            result = (list(TABLE_COLUMNS), [])
+        else:
+            result = self.table.select(sql)
+        if result is None:
+            # SELECT lain (misalnya SELECT 1 / @@variabel): satu kolom, satu baris
+            result = (["value"], [["1"]])
+
+        names, rows = result
+        packets = [lenenc_int(len(names))] + [column_definition(name) for name in names] + [EOF_PACKET]
+        packets += [b"".join(encode_value(value) for value in row) for row in rows]
+        packets.append(EOF_PACKET)
+        writer.write(b"".join(
+            struct.pack("<I", len(packet))[:3] + bytes([(sequence + 1) & 0xFF]) + packet
+            for sequence, packet in enumerate(packets)
+        ))
+        await writer.drain()
+
+
+async def serve(server, host, port):
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"✅ MySQL stand-in mendengarkan di {host}:{port} ({len(server.table.rows)} film).", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Server MySQL tiruan untuk benchmark.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3307)
+    parser.add_argument("--catalog", help="CSV/Parquet hasil scrape/Export.py")
+    parser.add_argument("--synthetic", type=int, default=20000, help="Jumlah film sintetis jika --catalog kosong")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Jeda per query SELECT")
+    parser.add_argument("--no-full-table", action="store_true", help="Jawab SELECT * tanpa filter dengan tabel kosong")
+    args = parser.parse_args()
+
+    rows = file_table(args.catalog) if args.catalog else synthetic_table(args.synthetic)
+    server = StandinServer(MovieTable(rows), args.latency_ms, serve_full_table=not args.no_full_table)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,272 @@
+"""
+Langkah build offline untuk model rekomendasi.
+
+Dua sumber yang didukung:
+- pickle lama (movies_df.pkl + similarity.pkl berisi matriks N x N), diubah
+  menjadi indeks top-K yang ringkas;
+- katalog film dari tabel movies_all_data atau file hasil scrape/Export.py
+  (CSV, CSV.gz, atau Parquet).
+  Kolom genres, keywords, directors, main_actors dan overview digabung menjadi
+  "tags", divektorisasi (CountVectorizer/TF-IDF), lalu tetangga cosine
+  dihitung per blok baris secara paralel. Matriks N x N tidak pernah dibuat,
+  sehingga memori puncak hanya O(block_size * N) per proses.
+
+Hasilnya berupa versi baru di registry model (lihat model_registry.py) berisi
+artefak .npy + meta.json yang dibuka app.py secara memory-mapped. Untuk sumber katalog, vectorizer dan matriks fitur ikut disimpan.
+Dengan --ann, top-K dihitung lewat indeks LSH (ann_index.py) alih-alih eksak.
+
+Penggunaan:
+    python build_model.py --movies movies_df.pkl --similarity similarity.pkl --output model --top-k 50
+    python build_model.py --source db --output model
+    python build_model.py --source csv --catalog movies_all_data.csv --vectorizer tfidf
+    python build_model.py --source csv --catalog movies_data_fix.parquet
+"""
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+
+from ann_index import ANN_FILENAME, DEFAULT_TABLES, LSHIndex
+from recommender import (
+    DEFAULT_TOP_K,
+    MODEL_DIRNAME,
+    build_neighbor_index,
+    select_top_n_batch,
+)
+from model_registry import publish_model
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Kolom berisi daftar nama dipisah koma; setiap nama dijadikan satu token
+# ("Christopher Nolan" -> "christophernolan") agar tidak tercampur dengan kata lain
+NAME_LIST_COLUMNS = ("genres", "keywords", "directors", "main_actors")
+CATALOG_COLUMNS = ("movie_id",) + NAME_LIST_COLUMNS + ("overview",)
+DEFAULT_MAX_FEATURES = 5000
+# 512 baris x 50k film x float32 = ~100 MB matriks skor sementara per proses
+DEFAULT_BLOCK_SIZE = 512
+VECTORIZER_FILENAME = "vectorizer.pkl"
+FEATURES_FILENAME = "features.npz"
+
+
+def build_from_pickles(movies_path, similarity_path, output_dir, top_k=DEFAULT_TOP_K):
+    """Membaca pickle lama, membangun indeks top-K, lalu menyimpannya ke output_dir."""
+    with open(movies_path, "rb") as f:
+        movies_df = pickle.load(f)
+    with open(similarity_path, "rb") as f:
+        similarity = pickle.load(f)
+
+    if len(movies_df) != similarity.shape[0]:
+        raise ValueError(
+            f"Jumlah film ({len(movies_df)}) tidak sama dengan ukuran matriks similarity ({similarity.shape[0]})"
+        )
+
+    # Urutan baris movies_df sama dengan urutan baris matriks similarity
+    movie_ids = movies_df["movie_id"].to_numpy(dtype=np.int64)
+    neighbors, scores = build_neighbor_index(similarity, top_k=top_k)
+    meta = publish_model(output_dir, movie_ids, neighbors, scores, {"source": "pickle"})
+    print(f"✅ Model versi {meta['version']} (top-{meta['top_k']}, {meta['n_movies']} film) disimpan ke {output_dir}")
+
+
+def load_catalog_from_db():
+    """Membaca kolom-kolom yang dibutuhkan model dari tabel movies_all_data."""
+    import mysql.connector
+    import pandas as pd
+
+    from db import db_config
+
+    conn = mysql.connector.connect(**db_config)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(CATALOG_COLUMNS)} FROM movies_all_data ORDER BY movie_id")
+        rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+    return pd.DataFrame(rows, columns=list(CATALOG_COLUMNS))
+
+
+def load_catalog_from_file(path):
+    """
+    Membaca hasil scrape/Export.py: CSV (boleh .csv.gz) atau Parquet.
+    Parquet hanya membaca kolom yang dibutuhkan dan sudah bertipe, jadi jauh
+    lebih cepat daripada parsing CSV.
+    """
+    import pandas as pd
+
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=list(CATALOG_COLUMNS))
+    return pd.read_csv(path, usecols=list(CATALOG_COLUMNS), dtype={"keywords": str})
+
+
+def build_tags(catalog):
+    """Menggabungkan kolom metadata menjadi satu string tags (huruf kecil) per film."""
+    parts = []
+    for column in NAME_LIST_COLUMNS:
+        names = catalog[column].fillna("").astype(str)
+        parts.append(names.str.replace(" ", "", regex=False).str.replace(",", " ", regex=False))
+    parts.append(catalog["overview"].fillna("").astype(str))
+
+    tags = parts[0]
+    for part in parts[1:]:
+        tags = tags + " " + part
+    return tags.str.lower().tolist()
+
+
+def vectorize_tags(tags, kind="count", max_features=DEFAULT_MAX_FEATURES):
+    """
+    Mengubah tags menjadi matriks fitur sparse (CSR, float32) yang sudah
+    dinormalisasi L2, sehingga cosine similarity cukup dihitung dengan dot product.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+    from sklearn.preprocessing import normalize
+
+    if kind == "tfidf":
+        vectorizer = TfidfVectorizer(max_features=max_features, stop_words="english", dtype=np.float32)
+    else:
+        vectorizer = CountVectorizer(max_features=max_features, stop_words="english", dtype=np.float32)
+    features = normalize(vectorizer.fit_transform(tags).astype(np.float32), norm="l2", copy=False)
+    return vectorizer, features.tocsr()
+
+
+def _cosine_top_k_rows(features, rows, top_k):
+    """Top-K tetangga eksak untuk baris-baris `rows`; skor blok (block x N) hanya ada sementara."""
+    block_scores = (features[rows] @ features.T).toarray()
+    return select_top_n_batch(block_scores, top_k, exclude=rows)
+
+
+def _cosine_top_k_block(features, start, stop, top_k):
+    neighbors, scores = _cosine_top_k_rows(features, np.arange(start, stop), top_k)
+    return start, neighbors, scores
+
+
+def build_cosine_neighbor_index(features, top_k=DEFAULT_TOP_K, block_size=DEFAULT_BLOCK_SIZE, n_jobs=-1):
+    """
+    Versi sparse dari build_neighbor_index: menghitung cosine similarity per
+    blok baris langsung dari matriks fitur, dibagi ke semua core dengan joblib.
+    """
+    from joblib import Parallel, delayed
+
+    n_movies = features.shape[0]
+    k = min(top_k, n_movies - 1)
+    neighbors = np.empty((n_movies, k), dtype=np.int32)
+    scores = np.empty((n_movies, k), dtype=np.float32)
+
+    blocks = Parallel(n_jobs=n_jobs)(
+        delayed(_cosine_top_k_block)(features, start, min(start + block_size, n_movies), k)
+        for start in range(0, n_movies, block_size)
+    )
+    for start, block_neighbors, block_scores in blocks:
+        neighbors[start:start + len(block_neighbors)] = block_neighbors
+        scores[start:start + len(block_scores)] = block_scores
+    return neighbors, scores
+
+
+def build_lsh_neighbor_index(features, top_k=DEFAULT_TOP_K, n_tables=DEFAULT_TABLES, n_bits=None, seed=0):
+    """
+    Top-K perkiraan dengan LSH (lihat ann_index.py). Film yang kandidatnya
+    kurang dari K dilengkapi dengan perhitungan eksak agar tidak ada slot kosong.
+    """
+    index = LSHIndex.create(features.shape[1], features.shape[0], n_tables=n_tables, n_bits=n_bits, seed=seed)
+    index.fit(features)
+    neighbors, scores = index.build_neighbor_index(top_k)
+
+    incomplete = np.flatnonzero((neighbors < 0).any(axis=1))
+    for start in range(0, len(incomplete), DEFAULT_BLOCK_SIZE):
+        rows = incomplete[start:start + DEFAULT_BLOCK_SIZE]
+        neighbors[rows], scores[rows] = _cosine_top_k_rows(features, rows, neighbors.shape[1])
+    if len(incomplete):
+        print(f"ℹ️ {len(incomplete)} film dilengkapi dengan pencarian eksak (kandidat LSH < {neighbors.shape[1]}).")
+    return index, neighbors, scores
+
+
+def build_from_catalog(
+    catalog,
+    output_dir,
+    top_k=DEFAULT_TOP_K,
+    source="catalog",
+    vectorizer_kind="count",
+    max_features=DEFAULT_MAX_FEATURES,
+    block_size=DEFAULT_BLOCK_SIZE,
+    n_jobs=-1,
+    ann=False,
+):
+    """
+    Membangun model dari DataFrame katalog film lalu menyimpannya ke output_dir.
+    ann=True memakai indeks LSH (lebih cepat untuk katalog besar, recall
+    perkiraan); indeksnya ikut disimpan sebagai ann.npz.
+    """
+    from scipy import sparse
+
+    started = time.perf_counter()
+    catalog = catalog.drop_duplicates("movie_id").reset_index(drop=True)
+    movie_ids = catalog["movie_id"].to_numpy(dtype=np.int64)
+
+    vectorizer, features = vectorize_tags(build_tags(catalog), kind=vectorizer_kind, max_features=max_features)
+    print(f"Vektorisasi {features.shape[0]} film x {features.shape[1]} fitur selesai.")
+
+    extra_meta = {"source": source, "vectorizer": vectorizer_kind, "n_features": int(features.shape[1])}
+    extra_files = {}
+    if ann:
+        ann_index, neighbors, scores = build_lsh_neighbor_index(features, top_k=top_k)
+        extra_meta.update(index="lsh", lsh_tables=ann_index.n_tables, lsh_bits=ann_index.n_bits)
+        extra_files[ANN_FILENAME] = ann_index.save
+    else:
+        neighbors, scores = build_cosine_neighbor_index(features, top_k=top_k, block_size=block_size, n_jobs=n_jobs)
+        extra_meta["index"] = "exact"
+
+    def write_vectorizer(path):
+        with open(path, "wb") as f:
+            pickle.dump(vectorizer, f)
+
+    extra_meta["build_seconds"] = round(time.perf_counter() - started, 1)
+    extra_files[VECTORIZER_FILENAME] = write_vectorizer
+    extra_files[FEATURES_FILENAME] = lambda path: sparse.save_npz(path, features)
+    meta = publish_model(
+        output_dir,
+        movie_ids,
+        neighbors,
+        scores,
+        extra_meta,
+        extra_files=extra_files,
+    )
+    print(
+        f"✅ Model versi {meta['version']} (top-{meta['top_k']}, {meta['n_movies']} film) "
+        f"disimpan ke {output_dir} dalam {meta['build_seconds']} detik"
+    )
+    return meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bangun indeks tetangga top-K untuk model rekomendasi.")
+    parser.add_argument("--source", choices=("pickle", "db", "csv"), default="pickle")
+    parser.add_argument("--movies", default=os.path.join(BASE_DIR, "movies_df.pkl"))
+    parser.add_argument("--similarity", default=os.path.join(BASE_DIR, "similarity.pkl"))
+    parser.add_argument("--catalog", help="CSV/CSV.gz/Parquet hasil scrape/Export.py (untuk --source csv)")
+    parser.add_argument("--output", default=os.path.join(BASE_DIR, MODEL_DIRNAME))
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument("--vectorizer", choices=("count", "tfidf"), default="count")
+    parser.add_argument("--max-features", type=int, default=DEFAULT_MAX_FEATURES)
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE)
+    parser.add_argument("--jobs", type=int, default=-1, help="Jumlah proses paralel (-1 = semua core)")
+    parser.add_argument("--ann", action="store_true", help="Gunakan indeks LSH perkiraan (katalog besar)")
+    args = parser.parse_args()
+
+    if args.source == "pickle":
+        build_from_pickles(args.movies, args.similarity, args.output, top_k=args.top_k)
+    else:
+        if args.source == "csv" and not args.catalog:
+            parser.error("--catalog wajib diisi untuk --source csv")
+        catalog = load_catalog_from_db() if args.source == "db" else load_catalog_from_file(args.catalog)
+        build_from_catalog(
+            catalog,
+            args.output,
+            top_k=args.top_k,
+            source=args.source,
+            vectorizer_kind=args.vectorizer,
+            max_features=args.max_features,
+            block_size=args.block_size,
+            n_jobs=args.jobs,
+            ann=args.ann,
+        )
@@ -0,0 +1,154 @@
+"""
+Pool koneksi MySQL untuk backend Flask.
+
+Setiap worker gunicorn memiliki pool sendiri yang dibuat saat pertama kali
+dipakai (setelah fork), sehingga request tidak lagi membayar handshake TCP +
+autentikasi MySQL setiap kali. Ukuran pool dan batas waktu tunggu diatur lewat
+variabel lingkungan DB_POOL_SIZE dan DB_POOL_TIMEOUT.
+"""
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
+
+from metrics import phase
+
+# Muat variabel lingkungan dari file .env (modul ini bisa di-import sebelum app.py memanggilnya)
+load_dotenv()
+
+# Konfigurasi koneksi ke database MySQL dari file .env
+db_config = {
+    "host": os.getenv("DB_HOST"),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+    "database": os.getenv("DB_NAME"),
+    "port": int(os.getenv("DB_PORT", "3306")),
+}
+
+POOL_NAME = os.getenv("DB_POOL_NAME", "rekomendasi_film")
+# mysql-connector membatasi ukuran pool maksimal 32 koneksi
+POOL_SIZE = min(int(os.getenv("DB_POOL_SIZE", "5")), pooling.CNX_POOL_MAXSIZE)
+# Berapa lama request menunggu koneksi bebas sebelum menyerah (detik)
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "3"))
+POOL_RETRY_INTERVAL = 0.02
+
+_pool = None
+_pool_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_checked_out_at = {}
+_stats = {
+    "checkouts": 0,
+    "waits": 0,
+    "exhausted": 0,
+    "connect_errors": 0,
+    "in_use": 0,
+    "checkout_seconds_total": 0.0,
+    "checkout_seconds_max": 0.0,
+    "hold_seconds_total": 0.0,
+    "hold_seconds_max": 0.0,
+}
+
+
+class PoolExhausted(Exception):
+    """Semua koneksi di pool sedang dipakai sampai batas DB_POOL_TIMEOUT habis."""
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # pool_reset_session mengembalikan state sesi saat koneksi dikembalikan
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=POOL_NAME,
+                    pool_size=POOL_SIZE,
+                    pool_reset_session=True,
+                    **db_config,
+                )
+                print(
+                    f"✅ Pool koneksi database ({POOL_SIZE} koneksi ke "
+                    f"{db_config['host']}:{db_config['port']}/{db_config['database']}) berhasil dibuat."
+                )
+    return _pool
+
+
+def _record(**updates):
+    with _stats_lock:
+        for key, value in updates.items():
+            if key.endswith("_max"):
+                _stats[key] = max(_stats[key], value)
+            else:
+                _stats[key] += value
+
+
+def create_db_connection():
+    """
+    Mengambil koneksi dari pool. Mengembalikan None jika database tidak bisa
+    dihubungi, dan melempar PoolExhausted jika pool penuh sampai batas waktu.
+    Koneksi wajib dikembalikan dengan release_db_connection().
+    """
+    started = time.perf_counter()
+    deadline = started + POOL_TIMEOUT
+    waited = False
+    try:
+        with phase("db_acquire"):
+            pool = _get_pool()
+            while True:
+                try:
+                    # get_connection() sudah melakukan health check (ping) dan
+                    # reconnect otomatis untuk koneksi yang terputus saat idle
+                    conn = pool.get_connection()
+                    break
+                except PoolError:
+                    if time.perf_counter() >= deadline:
+                        _record(exhausted=1)
+                        raise PoolExhausted(f"Pool koneksi penuh setelah menunggu {POOL_TIMEOUT} detik")
+                    waited = True
+                    time.sleep(POOL_RETRY_INTERVAL)
+    except Error as e:
+        _record(connect_errors=1)
+        print(f"❌ Error connecting to MySQL Database: {e}")
+        return None
+
+    elapsed = time.perf_counter() - started
+    _record(
+        checkouts=1,
+        waits=int(waited),
+        in_use=1,
+        checkout_seconds_total=elapsed,
+        checkout_seconds_max=elapsed,
+    )
+    with _stats_lock:
+        _checked_out_at[id(conn)] = time.perf_counter()
+    return conn
+
+
+def release_db_connection(conn, cursor=None):
+    """Menutup cursor (jika ada) dan mengembalikan koneksi ke pool."""
+    if conn is None:
+        return
+    try:
+        if cursor is not None:
+            cursor.close()
+    except Error:
+        pass
+    finally:
+        with _stats_lock:
+            checked_out_at = _checked_out_at.pop(id(conn), None)
+        # Pada koneksi pool, close() mengembalikan koneksi ke pool, bukan memutusnya
+        conn.close()
+        if checked_out_at is not None:
+            held = time.perf_counter() - checked_out_at
+            _record(in_use=-1, hold_seconds_total=held, hold_seconds_max=held)
+
+
+def pool_stats():
+    """Snapshot metrik pool (jumlah checkout, waktu tunggu dan lama pemakaian koneksi)."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["pool_size"] = POOL_SIZE
+    stats["pool_timeout"] = POOL_TIMEOUT
+    return stats
@@ -0,0 +1,154 @@
+"""
+Pool koneksi MySQL async (aiomysql) untuk asgi_app.py.
+
+Padanan db.py untuk mode ASGI: menunggu koneksi bebas atau hasil query tidak
+memblokir worker, jadi satu proses bisa melayani ratusan request sekaligus.
+Pool dibuat saat startup aplikasi (di event loop yang sama dengan request) dan
+memakai konfigurasi yang sama dengan db.py. Ukurannya diatur lewat
+DB_ASYNC_POOL_SIZE; batas waktu tunggu memakai DB_POOL_TIMEOUT.
+"""
+import asyncio
+import os
+import time
+
+import aiomysql
+from pymysql.err import MySQLError
+
+from db import POOL_TIMEOUT, PoolExhausted, db_config
+from metrics import phase
+
+# Tidak ada batas 32 koneksi seperti mysql-connector
+ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "20"))
+
+_pool = None
+_checked_out_at = {}
+_stats = {
+    "checkouts": 0,
+    "waits": 0,
+    "exhausted": 0,
+    "connect_errors": 0,
+    "in_use": 0,
+    "checkout_seconds_total": 0.0,
+    "checkout_seconds_max": 0.0,
+    "hold_seconds_total": 0.0,
+    "hold_seconds_max": 0.0,
+}
+
+
+class DatabaseUnavailable(Exception):
+    """Database tidak bisa dihubungi (padanan create_db_connection() == None di db.py)."""
+
+
+def _record(**updates):
+    # Hanya dipanggil dari event loop, jadi tidak perlu lock
+    for key, value in updates.items():
+        if key.endswith("_max"):
+            _stats[key] = max(_stats[key], value)
+        else:
+            _stats[key] += value
+
+
+async def open_pool():
+    """Membuat pool (dipanggil saat startup). Kegagalan koneksi tidak menghentikan aplikasi."""
+    global _pool
+    try:
+        _pool = await aiomysql.create_pool(
+            minsize=0,
+            maxsize=ASYNC_POOL_SIZE,
+            host=db_config["host"] or "localhost",
+            port=db_config["port"],
+            user=db_config["user"],
+            password=db_config["password"] or "",
+            db=db_config["database"],
+            autocommit=True,
+            pool_recycle=3600,
+        )
+        print(f"✅ Pool koneksi async ({ASYNC_POOL_SIZE} koneksi) berhasil dibuat.")
+    except MySQLError as e:
+        print(f"❌ Gagal membuat pool koneksi async: {e}")
+
+
+async def close_pool():
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+
+
+async def acquire():
+    """
+    Mengambil koneksi dari pool. Melempar DatabaseUnavailable jika database tidak
+    bisa dihubungi dan PoolExhausted jika pool penuh sampai batas waktu.
+    """
+    if _pool is None:
+        _record(connect_errors=1)
+        raise DatabaseUnavailable("Pool koneksi async belum tersedia")
+    started = time.perf_counter()
+    waited = _pool.freesize == 0 and _pool.size >= _pool.maxsize
+    try:
+        with phase("db_acquire"):
+            conn = await asyncio.wait_for(_pool.acquire(), POOL_TIMEOUT)
+    except asyncio.TimeoutError:
+        _record(exhausted=1)
+        raise PoolExhausted(f"Pool koneksi penuh setelah menunggu {POOL_TIMEOUT} detik")
+    except MySQLError as e:
+        _record(connect_errors=1)
+        print(f"❌ Error connecting to MySQL Database: {e}")
+        raise DatabaseUnavailable(str(e))
+
+    elapsed = time.perf_counter() - started
+    _record(
+        checkouts=1,
+        waits=int(waited),
+        in_use=1,
+        checkout_seconds_total=elapsed,
+        checkout_seconds_max=elapsed,
+    )
+    _checked_out_at[id(conn)] = time.perf_counter()
+    return conn
+
+
+def release(conn):
+    checked_out_at = _checked_out_at.pop(id(conn), None)
+    _pool.release(conn)
+    if checked_out_at is not None:
+        held = time.perf_counter() - checked_out_at
+        _record(in_use=-1, hold_seconds_total=held, hold_seconds_max=held)
+
+
+async def fetch_all(query, params=()):
+    """Menjalankan satu SELECT dan mengembalikan list dict."""
+    conn = await acquire()
+    try:
+        with phase("db_query"):
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params)
+                return list(await cursor.fetchall())
+    finally:
+        release(conn)
+
+
+async def fetch_one(query, params=()):
+    rows = await fetch_all(query, params)
+    return rows[0] if rows else None
+
+
+async def ping():
+    """Menjalankan SELECT 1; melempar DatabaseUnavailable jika database tidak menjawab."""
+    conn = await acquire()
+    try:
+        with phase("db_query"):
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT 1")
+                await cursor.fetchone()
+    except MySQLError as e:
+        print(f"❌ Ping database gagal: {e}")
+        raise DatabaseUnavailable(str(e))
+    finally:
+        release(conn)
+
+
+def pool_stats():
+    stats = dict(_stats)
+    stats["pool_size"] = ASYNC_POOL_SIZE
+    stats["pool_timeout"] = POOL_TIMEOUT
+    return stats
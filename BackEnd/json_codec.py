@@ -0,0 +1,111 @@
+"""
+Serializer JSON untuk respons API.
+
+Memakai orjson jika terpasang (jauh lebih cepat untuk list besar seperti
+/api/movies) dan modul json standar jika tidak. Keduanya menghasilkan byte
+yang sama: kunci objek diurutkan, tanpa spasi, dan karakter non-ASCII ditulis
+apa adanya (UTF-8). Tipe dari MySQL diperlakukan sama seperti serializer
+bawaan Flask, jadi kontrak API tidak berubah: date/datetime menjadi tanggal
+HTTP ("Wed, 01 Jan 2020 00:00:00 GMT"), Decimal dan UUID menjadi string.
+
+fragment() menyerialisasi objek sekali (misalnya item rekomendasi per film di
+metadata_store.py). Objek yang memuat Fragment dibungkus WithFragments, lalu
+dumps() menyisipkan fragmen apa adanya, sehingga respons dirakit dengan
+menggabungkan byte dan tidak perlu menyerialisasi ulang setiap film. orjson
+>= 3.9 melakukannya sendiri (orjson.Fragment); selain itu strukturnya dirakit
+di Python.
+
+JSON_ENCODER=orjson|stdlib memaksa salah satu implementasi (default: otomatis).
+"""
+import decimal
+import json
+import os
+import uuid
+from datetime import date
+from operator import itemgetter
+
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_ENCODER = os.getenv("JSON_ENCODER", "auto")
+
+
+class Fragment(bytes):
+    """JSON (UTF-8) yang sudah diserialisasi; disisipkan apa adanya oleh dumps()."""
+
+
+class WithFragments:
+    """Penanda objek yang memuat Fragment, agar dumps() langsung merakitnya."""
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+
+def _default(value):
+    # Sama dengan flask.json.provider._default untuk tipe yang dikembalikan mysql-connector
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if JSON_ENCODER != "stdlib" and orjson is not None:
+    BACKEND = "orjson"
+    # PASSTHROUGH_DATETIME: date/datetime lewat _default (format HTTP), bukan ISO 8601 bawaan orjson
+    _OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def _encode(obj):
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    loads = orjson.loads
+    _native_fragment = getattr(orjson, "Fragment", None)
+else:
+    if JSON_ENCODER == "orjson":
+        print("⚠️ JSON_ENCODER=orjson tetapi orjson tidak terpasang. Memakai modul json standar.")
+    BACKEND = "stdlib"
+    _encoder = json.JSONEncoder(default=_default, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+    def _encode(obj):
+        return _encoder.encode(obj).encode("utf-8")
+
+    loads = json.loads
+    _native_fragment = None
+
+
+# Perakitan di Python lebih lambat daripada orjson < 3.9 yang menyerialisasi dict
+# langsung, tetapi lebih cepat daripada modul json standar
+PREFER_FRAGMENTS = BACKEND == "stdlib" or _native_fragment is not None
+
+
+def _assemble(obj):
+    """Serialisasi rekursif untuk struktur yang berisi Fragment (kunci diurutkan sebagai string)."""
+    if isinstance(obj, Fragment):
+        return obj
+    if isinstance(obj, dict):
+        members = sorted(((str(key), value) for key, value in obj.items()), key=itemgetter(0))
+        return b"{" + b",".join(_encode(key) + b":" + _assemble(value) for key, value in members) + b"}"
+    if isinstance(obj, (list, tuple)):
+        return b"[" + b",".join(map(_assemble, obj)) + b"]"
+    return _encode(obj)
+
+
+def dumps(obj):
+    """obj -> bytes JSON ringkas (UTF-8). Objek yang memuat Fragment harus dibungkus WithFragments."""
+    if isinstance(obj, WithFragments):
+        if _native_fragment is not None:
+            return _encode(obj.obj) # orjson menyisipkan orjson.Fragment sendiri
+        return _assemble(obj.obj)
+    return _encode(obj)
+
+
+def fragment(obj):
+    """Menyerialisasi obj sekali untuk disisipkan berulang kali ke respons lain."""
+    data = dumps(obj)
+    return _native_fragment(data) if _native_fragment is not None else Fragment(data)
@@ -0,0 +1,265 @@
+"""
+Penyimpanan metadata film di memori (kolumnar).
+
+Data di tabel movies_all_data hanya berubah saat scraping, jadi metadata film
+(judul, poster, provider, dst.) dimuat sekali saat startup, baik dari MySQL
+maupun dari snapshot CSV hasil scrape/Export.py. Endpoint rekomendasi dan
+detail film kemudian dilayani sepenuhnya dari RAM tanpa round-trip ke database.
+
+Item rekomendasi setiap film juga diserialisasi ke JSON sekali saat load
+(json_codec.Fragment), sehingga respons rekomendasi cukup dirakit dengan
+menggabungkan byte. METADATA_JSON_FRAGMENTS=0 mematikannya untuk menghemat memori.
+"""
+import copy
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+import json_codec
+from search_index import TitleSearchIndex
+
+# Kolom yang dikirim untuk setiap film di respons rekomendasi
+RECOMMENDATION_COLUMNS = ("movie_id", "original_title", "poster_path", "watch_providers")
+DB_FETCH_CHUNK = 5000
+# Satu bit per nama provider; scraper hanya menyimpan 8 TARGET_PROVIDERS
+MAX_PROVIDER_BITS = 64
+JSON_FRAGMENTS = os.getenv("METADATA_JSON_FRAGMENTS", "1") == "1" and json_codec.PREFER_FRAGMENTS
+
+
+def _provider_names(providers):
+    if not isinstance(providers, list):
+        return []
+    return [p.get("name") for p in providers if isinstance(p, dict) and p.get("name")]
+
+
+def _parse_providers(raw):
+    """Parsing kolom watch_providers sama seperti get_movie_details di app.py."""
+    if not raw:
+        return raw
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return [] # Jika data JSON tidak valid, kembalikan list kosong
+
+
+class MovieMetadataStore:
+    """
+    Menyimpan setiap kolom movies_all_data sebagai list terpisah (satu elemen
+    per film) ditambah peta movie_id -> baris untuk lookup O(1).
+    Objek ini tidak pernah diubah setelah dibuat; refresh dilakukan dengan
+    membangun objek baru lalu mengganti referensinya.
+    """
+
+    def __init__(self, columns, source):
+        self.columns = columns
+        self.column_names = list(columns)
+        self.movie_ids = np.asarray(columns["movie_id"], dtype=np.int64)
+        self.row_by_movie_id = {movie_id: row for row, movie_id in enumerate(self.movie_ids.tolist())}
+        # watch_providers di-parse sekali saat load, bukan di setiap request detail
+        self.parsed_providers = [_parse_providers(raw) for raw in columns.get("watch_providers", [])]
+        self._encode_provider_masks()
+        self.recommendation_fragments = self._serialize_recommendation_items() if JSON_FRAGMENTS else None
+        self.title_index = TitleSearchIndex(
+            columns.get("original_title", []),
+            popularity=columns.get("vote_average"),
+        )
+        self.source = source
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
+        self.version = f"{source}-{int(time.time())}"
+
+    def _encode_provider_masks(self):
+        """
+        Mengubah daftar provider setiap film menjadi bitmask uint64 (bit ke-i =
+        provider_names[i]). Bit diberikan per nama karena platform dominan
+        dihitung berdasarkan nama provider.
+        """
+        self.provider_names = []
+        self.provider_bit = {}
+        ignored = set()
+        masks = np.zeros(len(self.parsed_providers), dtype=np.uint64)
+        for row, providers in enumerate(self.parsed_providers):
+            mask = 0
+            for name in _provider_names(providers):
+                bit = self.provider_bit.get(name)
+                if bit is None:
+                    if len(self.provider_names) >= MAX_PROVIDER_BITS:
+                        ignored.add(name)
+                        continue
+                    bit = len(self.provider_names)
+                    self.provider_bit[name] = bit
+                    self.provider_names.append(name)
+                mask |= 1 << bit
+            masks[row] = mask
+        if ignored:
+            print(
+                f"⚠️ Lebih dari {MAX_PROVIDER_BITS} provider berbeda; {len(ignored)} provider "
+                f"diabaikan saat menentukan platform dominan: {', '.join(sorted(ignored)[:10])}"
+            )
+        self.provider_masks = masks
+        self.model_rows = np.empty(0, dtype=np.int64)
+        self.model_provider_masks = np.empty(0, dtype=np.uint64)
+
+    def _serialize_recommendation_items(self):
+        """JSON item rekomendasi (RECOMMENDATION_COLUMNS) untuk setiap baris store."""
+        columns = [self.columns[name] for name in RECOMMENDATION_COLUMNS]
+        return [json_codec.fragment(dict(zip(RECOMMENDATION_COLUMNS, values))) for values in zip(*columns)]
+
+    def encode_providers(self, raw, extra_names):
+        """
+        Bitmask untuk string JSON watch_providers yang tidak ada di store
+        (fallback MySQL). Provider yang tidak dikenal store mendapat bit setelah
+        provider_names dan namanya ditambahkan ke extra_names milik request,
+        sehingga store yang dipakai bersama tidak diubah.
+        """
+        mask = 0
+        for name in _provider_names(_parse_providers(raw)):
+            bit = self.provider_bit.get(name)
+            if bit is None:
+                if name not in extra_names:
+                    if len(self.provider_names) + len(extra_names) >= MAX_PROVIDER_BITS:
+                        print(f"⚠️ Provider '{name}' diabaikan: lebih dari {MAX_PROVIDER_BITS} provider berbeda.")
+                        continue
+                    extra_names.append(name)
+                bit = len(self.provider_names) + extra_names.index(name)
+            mask |= 1 << bit
+        return mask
+
+    def align_to_model(self, model_movie_ids):
+        """
+        Mengembalikan salinan store yang diselaraskan dengan baris model
+        rekomendasi: model_rows[i] adalah baris store untuk baris model i (-1 jika
+        tidak ada), dan model_provider_masks[i] bitmask provider-nya. Kolom data
+        dipakai bersama; store asli tidak diubah sehingga aman dipakai request
+        lain selama versi model baru disiapkan.
+        """
+        lookup = self.row_by_movie_id.get
+        aligned = copy.copy(self)
+        aligned.model_rows = np.fromiter(
+            (lookup(movie_id, -1) for movie_id in np.asarray(model_movie_ids).tolist()),
+            dtype=np.int64,
+            count=len(model_movie_ids),
+        )
+        known = aligned.model_rows >= 0
+        aligned.model_provider_masks = np.zeros(len(aligned.model_rows), dtype=np.uint64)
+        aligned.model_provider_masks[known] = self.provider_masks[aligned.model_rows[known]]
+        return aligned
+
+    def __len__(self):
+        return len(self.movie_ids)
+
+    def __contains__(self, movie_id):
+        return movie_id in self.row_by_movie_id
+
+    def movie_details(self, movie_id):
+        """Semua kolom satu film (seperti SELECT *), atau None jika tidak dikenal."""
+        row = self.row_by_movie_id.get(movie_id)
+        if row is None:
+            return None
+        movie = {name: self.columns[name][row] for name in self.column_names}
+        if "watch_providers" in movie:
+            movie["watch_providers"] = self.parsed_providers[row]
+        return movie
+
+    def search_titles(self, query, limit):
+        """Pencarian judul; mengembalikan list {movie_id, original_title} terurut berdasarkan relevansi."""
+        titles = self.columns["original_title"]
+        return [
+            {"movie_id": int(self.movie_ids[row]), "original_title": titles[row]}
+            for row in self.title_index.search(query, limit)
+        ]
+
+    def recommendation_items(self, model_rows):
+        """
+        Mengambil kolom RECOMMENDATION_COLUMNS untuk baris-baris model dengan urutan
+        yang sama, beserta bitmask provider-nya. Elemen bernilai None untuk film yang
+        tidak dikenal store. watch_providers dikirim sebagai string JSON mentah,
+        sama seperti dari MySQL. Jika fragment aktif, elemen berupa
+        json_codec.Fragment (JSON dict yang sama) alih-alih dict.
+        """
+        store_rows = self.model_rows[model_rows].tolist()
+        if self.recommendation_fragments is not None:
+            fragments = self.recommendation_fragments
+            items = [None if row < 0 else fragments[row] for row in store_rows]
+            return items, self.model_provider_masks[model_rows].copy()
+        columns = [self.columns[name] for name in RECOMMENDATION_COLUMNS]
+        items = [
+            None if row < 0 else dict(zip(RECOMMENDATION_COLUMNS, [column[row] for column in columns]))
+            for row in store_rows
+        ]
+        return items, self.model_provider_masks[model_rows].copy()
+
+    def dominant_provider(self, masks, extra_names=()):
+        """
+        Menentukan platform dominan dari bitmask provider sekumpulan film.
+        Jumlah film per provider dihitung secara vektor (popcount per kolom bit).
+        Jika seri, menang provider yang muncul paling awal di daftar rekomendasi.
+        extra_names adalah nama bit tambahan dari encode_providers.
+        Mengembalikan (nama_provider, array bool film yang tersedia di provider
+        tersebut), atau (None, None) jika tidak ada provider sama sekali.
+        """
+        provider_names = self.provider_names + list(extra_names)
+        n_bits = len(provider_names)
+        if n_bits == 0 or len(masks) == 0:
+            return None, None
+        bits = (masks[:, np.newaxis] >> np.arange(n_bits, dtype=np.uint64)) & np.uint64(1)
+        counts = bits.sum(axis=0)
+        if counts.max() == 0:
+            return None, None
+        candidates = np.flatnonzero(counts == counts.max())
+        first_seen = bits[:, candidates].argmax(axis=0)
+        winner = candidates[np.argmin(first_seen)]
+        return provider_names[winner], bits[:, winner].astype(bool)
+
+    def stats(self):
+        return {
+            "movies": len(self),
+            "source": self.source,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+        }
+
+
+def load_from_db(conn):
+    """Membaca seluruh movies_all_data dari koneksi MySQL ke dalam store kolumnar."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT * FROM movies_all_data")
+        names = list(cursor.column_names)
+        columns = {name: [] for name in names}
+        while True:
+            rows = cursor.fetchmany(DB_FETCH_CHUNK)
+            if not rows:
+                break
+            for row in rows:
+                for name, value in zip(names, row):
+                    columns[name].append(value)
+    finally:
+        cursor.close()
+    return MovieMetadataStore(columns, source="mysql")
+
+
+def load_from_snapshot(path):
+    """
+    Membaca snapshot CSV (output scrape/Export.py, boleh .csv.gz) ke dalam store.
+    Tipe kolom disamakan dengan hasil mysql-connector agar respons JSON identik.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(path, dtype={"watch_providers": str, "keywords": str})
+    if "release_date" in df:
+        df["release_date"] = pd.to_datetime(df["release_date"], errors="coerce").dt.date
+    if "scraped_at" in df:
+        df["scraped_at"] = pd.to_datetime(df["scraped_at"], errors="coerce")
+    # NaN/NaT dari pandas dikembalikan menjadi None (NULL di MySQL)
+    df = df.astype(object).where(df.notna(), None)
+
+    columns = {name: df[name].tolist() for name in df.columns}
+    columns["movie_id"] = [int(movie_id) for movie_id in columns["movie_id"]]
+    return MovieMetadataStore(columns, source="snapshot")
+
+
+def empty_store():
+    return MovieMetadataStore({name: [] for name in RECOMMENDATION_COLUMNS}, source="empty")
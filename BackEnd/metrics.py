@@ -0,0 +1,343 @@
+"""
+Metrik Prometheus untuk backend (format teks exposition, tanpa dependensi tambahan).
+
+Setiap request dicatat di histogram per route, termasuk rincian waktu per fase
+(model_lookup, top_n, metadata_lookup, db_acquire, db_query, json_encode).
+Fase dicatat dengan `with metrics.phase("nama"):` di mana pun dalam jalur
+request. Pencatatan ini memakai contextvars, sehingga berlaku untuk thread
+Flask maupun task asyncio, dan di luar request (misalnya saat startup)
+tidak melakukan apa-apa.
+
+Nilai yang sudah dihitung di modul lain (statistik pool, hit cache, versi
+model) dibaca lewat collector saat /metrics di-scrape.
+
+Gunicorn menjalankan beberapa proses worker, dan scrape hanya mengenai salah
+satunya. Jika METRICS_DIR diisi, setiap worker menulis snapshot metriknya ke
+direktori tersebut setiap METRICS_FLUSH_INTERVAL detik. /metrics lalu
+menggabungkan snapshot semua worker: counter dan histogram dijumlahkan,
+gauge hanya dari worker yang masih hidup. Direktori sebaiknya dikosongkan
+saat deploy.
+
+SLOW_REQUEST_MS > 0 mencetak satu baris JSON berisi rincian fase untuk setiap
+request yang lebih lambat dari batas tersebut.
+"""
+import bisect
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "0"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Batas bucket (detik) dari 0.1 ms sampai 10 detik
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Registry:
+    """
+    Kumpulan metrik satu proses. Setiap metrik adalah family
+    {"type", "help", "buckets", "merge", "samples"} dengan samples
+    {tuple(sorted(label.items())): nilai}. Nilai histogram berupa
+    [jumlah_per_bucket..., jumlah_+Inf, sum, count] (tidak kumulatif).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families = {}
+        self._collectors = {}
+
+    def declare(self, name, kind, help_text, buckets=None, merge="sum"):
+        """merge: cara menggabungkan nilai gauge antar worker ("sum" atau "max")."""
+        self._families[name] = {"type": kind, "help": help_text, "buckets": buckets, "merge": merge, "samples": {}}
+
+    def inc(self, name, amount=1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            samples = self._families[name]["samples"]
+            samples[key] = samples.get(key, 0.0) + amount
+
+    def set(self, name, value, **labels):
+        """Mengisi nilai absolut (gauge, atau counter yang dihitung di modul lain)."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._families[name]["samples"][key] = float(value)
+
+    def clear(self, name):
+        with self._lock:
+            self._families[name]["samples"].clear()
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        family = self._families[name]
+        buckets = family["buckets"]
+        # Bucket pertama dengan batas >= value (semantik "le"); len(buckets) berarti +Inf
+        position = bisect.bisect_left(buckets, value)
+        with self._lock:
+            sample = family["samples"].get(key)
+            if sample is None:
+                sample = family["samples"][key] = [0] * (len(buckets) + 1) + [0.0, 0]
+            sample[position] += 1
+            sample[-2] += value
+            sample[-1] += 1
+
+    def register_collector(self, name, collect):
+        """collect() dipanggil sebelum setiap snapshot; nama yang sama menggantikan collector lama."""
+        self._collectors[name] = collect
+
+    def snapshot(self):
+        """Salinan semua metrik sebagai struktur yang bisa disimpan ke JSON."""
+        for collect in list(self._collectors.values()):
+            try:
+                collect()
+            except Exception as e:
+                print(f"⚠️ Collector metrik gagal: {e}")
+        with self._lock:
+            return {
+                name: {
+                    "type": family["type"],
+                    "help": family["help"],
+                    "buckets": family["buckets"],
+                    "merge": family["merge"],
+                    "samples": [
+                        [list(key), list(value) if isinstance(value, list) else value]
+                        for key, value in family["samples"].items()
+                    ],
+                }
+                for name, family in self._families.items()
+            }
+
+
+registry = Registry()
+
+registry.declare(
+    "http_request_duration_seconds", "histogram",
+    "Durasi request HTTP per route, method dan status.", LATENCY_BUCKETS,
+)
+registry.declare(
+    "http_request_phase_seconds", "histogram",
+    "Durasi fase dalam request (model_lookup, top_n, metadata_lookup, db_acquire, db_query, json_encode).",
+    LATENCY_BUCKETS,
+)
+registry.declare("recommendation_cache_hits_total", "counter", "Hit cache respons rekomendasi.")
+registry.declare("recommendation_cache_misses_total", "counter", "Miss cache respons rekomendasi.")
+registry.declare("recommendation_cache_evictions_total", "counter", "Entri cache rekomendasi yang dibuang (LRU).")
+registry.declare("recommendation_cache_entries", "gauge", "Jumlah entri di cache rekomendasi.")
+registry.declare("recommendation_cache_bytes", "gauge", "Ukuran cache rekomendasi dalam byte.")
+registry.declare("db_pool_checkouts_total", "counter", "Koneksi yang diambil dari pool.")
+registry.declare("db_pool_waits_total", "counter", "Checkout yang harus menunggu karena pool penuh.")
+registry.declare("db_pool_exhausted_total", "counter", "Checkout yang gagal karena pool penuh sampai batas waktu.")
+registry.declare("db_pool_connect_errors_total", "counter", "Kegagalan koneksi ke database.")
+registry.declare("db_pool_in_use", "gauge", "Koneksi pool yang sedang dipakai.")
+registry.declare("db_pool_size", "gauge", "Ukuran maksimum pool koneksi.")
+registry.declare("model_info", "gauge", "Versi model dan metadata yang sedang dilayani (nilai selalu 1).", merge="max")
+registry.declare("model_movies", "gauge", "Jumlah film di model yang sedang dilayani.", merge="max")
+registry.declare("metadata_movies", "gauge", "Jumlah film di store metadata di memori.", merge="max")
+
+
+def set_pool_metrics(stats):
+    """Mengisi metrik db_pool_* dari pool_stats() (db.py atau db_async.py)."""
+    registry.set("db_pool_checkouts_total", stats["checkouts"])
+    registry.set("db_pool_waits_total", stats["waits"])
+    registry.set("db_pool_exhausted_total", stats["exhausted"])
+    registry.set("db_pool_connect_errors_total", stats["connect_errors"])
+    registry.set("db_pool_in_use", stats["in_use"])
+    registry.set("db_pool_size", stats["pool_size"])
+
+
+# ========================================================================
+# PENCATATAN PER REQUEST
+# ========================================================================
+
+class RequestTiming:
+    def __init__(self, route, method):
+        self.route = route
+        self.method = method
+        self.started = time.perf_counter()
+        self.phases = {}
+
+    def add(self, phase_name, seconds):
+        self.phases[phase_name] = self.phases.get(phase_name, 0.0) + seconds
+
+
+_current_request = contextvars.ContextVar("request_timing", default=None)
+
+
+def start_request(route, method):
+    """Mulai mencatat request; kembalikan token untuk finish_request()."""
+    return _current_request.set(RequestTiming(route, method))
+
+
+def finish_request(token, status):
+    timing = _current_request.get()
+    _current_request.reset(token)
+    if timing is None:
+        return
+    duration = time.perf_counter() - timing.started
+    registry.observe(
+        "http_request_duration_seconds", duration,
+        route=timing.route, method=timing.method, status=str(status),
+    )
+    for phase_name, seconds in timing.phases.items():
+        registry.observe("http_request_phase_seconds", seconds, route=timing.route, phase=phase_name)
+
+    if SLOW_REQUEST_MS > 0 and duration * 1000 >= SLOW_REQUEST_MS:
+        print(json.dumps({
+            "event": "slow_request",
+            "route": timing.route,
+            "method": timing.method,
+            "status": status,
+            "duration_ms": round(duration * 1000, 2),
+            "phases_ms": {name: round(seconds * 1000, 2) for name, seconds in timing.phases.items()},
+        }), flush=True)
+
+
+@contextmanager
+def phase(phase_name):
+    """Menambahkan durasi blok ke fase `phase_name` pada request yang sedang berjalan."""
+    timing = _current_request.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(phase_name, time.perf_counter() - started)
+
+
+# ========================================================================
+# SNAPSHOT ANTAR WORKER & RENDER
+# ========================================================================
+
+def _snapshot_path(pid):
+    return os.path.join(METRICS_DIR, f"metrics-{pid}.json")
+
+
+def write_snapshot(snapshot=None):
+    """Menulis snapshot worker ini ke METRICS_DIR (atomic)."""
+    snapshot = snapshot if snapshot is not None else registry.snapshot()
+    path = _snapshot_path(os.getpid())
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_snapshots():
+    """Snapshot worker lain di METRICS_DIR sebagai list (pid_masih_hidup, snapshot)."""
+    snapshots = []
+    own_path = _snapshot_path(os.getpid())
+    for path in glob.glob(os.path.join(METRICS_DIR, "metrics-*.json")):
+        if path == own_path:
+            continue
+        try:
+            pid = int(os.path.basename(path)[len("metrics-"):-len(".json")])
+            with open(path, encoding="utf-8") as f:
+                snapshots.append((_pid_alive(pid), json.load(f)))
+        except (OSError, ValueError):
+            continue # File sedang ditulis atau bukan snapshot
+    return snapshots
+
+
+def merge_snapshots(snapshots):
+    """
+    Menggabungkan list (pid_masih_hidup, snapshot). Counter dan histogram
+    dijumlahkan; gauge hanya dari worker yang masih hidup, dijumlahkan atau
+    diambil nilai terbesarnya sesuai "merge" (misalnya model_info per versi).
+    """
+    merged = {}
+    for alive, snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.setdefault(name, {**family, "samples": {}})
+            if family["type"] == "gauge" and not alive:
+                continue
+            for key, value in family["samples"]:
+                key = tuple(tuple(pair) for pair in key)
+                previous = target["samples"].get(key)
+                if previous is None:
+                    target["samples"][key] = list(value) if isinstance(value, list) else value
+                elif family["merge"] == "max":
+                    target["samples"][key] = max(previous, value)
+                elif isinstance(value, list):
+                    target["samples"][key] = [a + b for a, b in zip(previous, value)]
+                else:
+                    target["samples"][key] = previous + value
+    return merged
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Teks exposition Prometheus untuk worker ini (atau semua worker jika METRICS_DIR diisi)."""
+    own = registry.snapshot()
+    snapshots = [(True, own)]
+    if METRICS_DIR:
+        write_snapshot(own)
+        snapshots.extend(_read_snapshots())
+
+    lines = []
+    for name, family in sorted(merge_snapshots(snapshots).items()):
+        if not family["samples"]:
+            continue
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for key, value in sorted(family["samples"].items()):
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_labels(key)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(list(family["buckets"]) + [float("inf")], value[:-2]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(key, [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{name}_sum{_labels(key)} {_number(value[-2])}")
+            lines.append(f"{name}_count{_labels(key)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            write_snapshot()
+        except OSError as e:
+            print(f"⚠️ Gagal menulis snapshot metrik ke {METRICS_DIR}: {e}")
+
+
+if METRICS_DIR and METRICS_FLUSH_INTERVAL > 0:
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    threading.Thread(target=_flush_periodically, daemon=True).start()
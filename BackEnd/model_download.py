@@ -0,0 +1,245 @@
+"""
+Unduhan artefak model (movies_df.pkl, similarity.pkl) saat bootstrap.
+
+- Setiap file dibagi menjadi beberapa bagian yang diunduh paralel dengan HTTP
+  Range request; beberapa file juga diunduh bersamaan.
+- Unduhan yang terputus dilanjutkan: data ditulis ke <file>.part dan bagian
+  yang sudah selesai dicatat di <file>.part.json.
+- Isi file diverifikasi dengan SHA-256 dari manifest (MODEL_MANIFEST, JSON
+  {"nama_file": "sha256"}) atau, jika tidak ada, dari header X-Linked-Etag
+  Hugging Face (SHA-256 file LFS).
+- File tujuan baru muncul lewat os.replace setelah terverifikasi, jadi tidak
+  pernah ada pickle setengah jadi.
+
+`session` bisa diganti (misalnya ke server HTTP lokal) untuk pengujian.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+PART_SIZE = 16 * 1024 * 1024
+STREAM_CHUNK_SIZE = 1024 * 1024
+MAX_PART_WORKERS = 4
+MAX_FILE_WORKERS = 2
+PART_RETRIES = 3
+TIMEOUT = (10, 60) # (connect, read) detik
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ChecksumMismatch(Exception):
+    """Isi file yang diunduh tidak cocok dengan SHA-256 yang diharapkan."""
+
+
+def make_session(pool_size=MAX_PART_WORKERS * MAX_FILE_WORKERS):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=MAX_FILE_WORKERS, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def load_manifest(location, session=None):
+    """Membaca manifest {nama_file: sha256} dari path lokal atau URL. None jika tidak diisi."""
+    if not location:
+        return None
+    if location.startswith(("http://", "https://")):
+        response = (session or requests).get(location, timeout=TIMEOUT)
+        response.raise_for_status()
+        manifest = response.json()
+    else:
+        with open(location, encoding="utf-8") as f:
+            manifest = json.load(f)
+    return {name: value.lower() for name, value in manifest.items()}
+
+
+def sha256_of(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def probe(session, url):
+    """
+    Mengembalikan (url_akhir, ukuran, mendukung_range, sha256_dari_server).
+    Hugging Face mengirim X-Linked-Etag/X-Linked-Size pada respons redirect
+    sebelum diarahkan ke CDN, jadi redirect diikuti secara manual.
+    """
+    linked_sha = None
+    linked_size = None
+    for _ in range(5):
+        response = session.head(url, allow_redirects=False, timeout=TIMEOUT)
+        etag = response.headers.get("X-Linked-Etag", "").strip('"').lower()
+        if _SHA256.match(etag):
+            linked_sha = etag
+        linked_size = linked_size or response.headers.get("X-Linked-Size")
+        if response.is_redirect:
+            url = requests.compat.urljoin(url, response.headers["Location"])
+            continue
+        response.raise_for_status()
+        size = response.headers.get("Content-Length") or linked_size
+        accepts_ranges = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+        return url, int(size) if size else None, accepts_ranges, linked_sha
+    raise requests.exceptions.TooManyRedirects(f"Terlalu banyak redirect untuk {url}")
+
+
+class _PartTracker:
+    """Mencatat bagian yang sudah selesai ke <file>.part.json agar bisa dilanjutkan."""
+
+    def __init__(self, path, url, size):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = {"url": url, "size": size, "part_size": PART_SIZE, "done": []}
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("size") == size and saved.get("part_size") == PART_SIZE:
+                self.state["done"] = saved.get("done", [])
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    @property
+    def done(self):
+        return set(self.state["done"])
+
+    def mark_done(self, part):
+        with self.lock:
+            self.state["done"].append(part)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f)
+            os.replace(tmp_path, self.path)
+
+
+def _download_part(session, url, part_path, start, end):
+    last_error = None
+    for _ in range(PART_RETRIES):
+        try:
+            with session.get(url, headers={"Range": f"bytes={start}-{end}"}, stream=True, timeout=TIMEOUT) as r:
+                r.raise_for_status()
+                if r.status_code != 206:
+                    raise requests.exceptions.HTTPError(f"Server tidak mengembalikan 206 untuk Range (status {r.status_code})")
+                written = 0
+                with open(part_path, "r+b") as f:
+                    f.seek(start)
+                    for chunk in r.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                        f.write(chunk)
+                        written += len(chunk)
+                if written != end - start + 1:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"Bagian {start}-{end} terpotong ({written} dari {end - start + 1} byte)"
+                    )
+                return
+        except requests.exceptions.RequestException as e:
+            last_error = e
+    raise last_error
+
+
+def _download_ranges(session, url, part_path, size, max_workers):
+    tracker = _PartTracker(f"{part_path}.json", url, size)
+    if not os.path.exists(part_path) or os.path.getsize(part_path) != size:
+        with open(part_path, "wb") as f:
+            f.truncate(size)
+        tracker.state["done"] = []
+
+    n_parts = (size + PART_SIZE - 1) // PART_SIZE
+    pending = [part for part in range(n_parts) if part not in tracker.done]
+    if len(pending) < n_parts:
+        print(f"↩️ Melanjutkan {os.path.basename(part_path)}: {n_parts - len(pending)}/{n_parts} bagian sudah ada.")
+
+    def fetch(part):
+        start = part * PART_SIZE
+        _download_part(session, url, part_path, start, min(start + PART_SIZE, size) - 1)
+        tracker.mark_done(part)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # list() agar exception dari bagian mana pun dilempar ke pemanggil
+        list(executor.map(fetch, pending))
+
+
+def _download_stream(session, url, part_path):
+    """Fallback untuk server tanpa dukungan Range: satu stream, tanpa resume."""
+    with session.get(url, stream=True, timeout=TIMEOUT) as r:
+        r.raise_for_status()
+        with open(part_path, "wb") as f:
+            for chunk in r.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                f.write(chunk)
+
+
+def download_file(url, destination, expected_sha256=None, session=None, max_workers=MAX_PART_WORKERS):
+    """
+    Mengunduh url ke destination dengan Range paralel + resume, memverifikasi
+    SHA-256 (dari argumen atau X-Linked-Etag), lalu rename atomik.
+    """
+    expected_sha256 = expected_sha256.lower() if expected_sha256 else None
+    # File yang sudah ada dipakai tanpa akses jaringan (diverifikasi jika manifest tersedia)
+    if os.path.exists(destination):
+        if expected_sha256 is None or sha256_of(destination) == expected_sha256:
+            print(f"File {os.path.basename(destination)} sudah ada. Melanjutkan.")
+            return destination
+        print(f"⚠️ Checksum {os.path.basename(destination)} tidak cocok, mengunduh ulang.")
+
+    session = session or make_session()
+    try:
+        final_url, size, accepts_ranges, linked_sha = probe(session, url)
+    except requests.exceptions.HTTPError as e:
+        # Sebagian CDN menolak HEAD pada URL bertanda tangan; unduh biasa lewat GET
+        print(f"⚠️ HEAD {url} gagal ({e}); mengunduh tanpa Range.")
+        final_url, size, accepts_ranges, linked_sha = url, None, False, None
+    expected_sha256 = expected_sha256 or linked_sha
+
+    part_path = f"{destination}.part"
+    print(f"Mengunduh model dari {url}...")
+    if accepts_ranges and size:
+        _download_ranges(session, final_url, part_path, size, max_workers)
+    else:
+        _download_stream(session, final_url, part_path)
+
+    if expected_sha256 is None:
+        print(f"⚠️ Tidak ada SHA-256 untuk {os.path.basename(destination)}; file tidak diverifikasi.")
+    else:
+        actual = sha256_of(part_path)
+        if actual != expected_sha256:
+            # Bagian yang rusak tidak bisa diketahui; mulai dari awal pada percobaan berikutnya
+            os.remove(part_path)
+            if os.path.exists(f"{part_path}.json"):
+                os.remove(f"{part_path}.json")
+            raise ChecksumMismatch(f"SHA-256 {os.path.basename(destination)} {actual} != {expected_sha256}")
+
+    os.replace(part_path, destination)
+    if os.path.exists(f"{part_path}.json"):
+        os.remove(f"{part_path}.json")
+    print(f"✅ Berhasil mengunduh ke {destination}")
+    return destination
+
+
+def download_artifacts(urls, dest_dir, manifest=None, session=None):
+    """
+    Mengunduh beberapa artefak ({nama_file: url}) secara bersamaan.
+    Mengembalikan True jika semua berhasil dan lolos verifikasi.
+    """
+    session = session or make_session()
+    manifest = manifest or {}
+
+    def fetch(item):
+        filename, url = item
+        download_file(url, os.path.join(dest_dir, filename), manifest.get(filename), session=session)
+
+    ok = True
+    with ThreadPoolExecutor(max_workers=MAX_FILE_WORKERS) as executor:
+        futures = {executor.submit(fetch, item): item[0] for item in urls.items()}
+        for future, filename in futures.items():
+            try:
+                future.result()
+            except (requests.exceptions.RequestException, ChecksumMismatch, OSError) as e:
+                print(f"❌ Gagal mengunduh {filename}: {e}")
+                ok = False
+    return ok
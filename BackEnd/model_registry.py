@@ -0,0 +1,157 @@
+"""
+Registry versi model di disk lokal.
+
+Struktur direktori MODEL_DIR:
+    model/
+        CURRENT               <- nama versi yang sedang aktif (satu baris)
+        versions/
+            20250101120000/   <- artefak dari save_model_artifacts (.npy + meta.json)
+            20250102093000/
+
+Versi baru selalu ditulis ke direktorinya sendiri, lalu CURRENT diganti secara
+atomik (tulis file sementara + os.replace). Worker yang sedang memakai versi
+lama tidak terganggu, dan rollback cukup dengan mengubah CURRENT. Direktori
+model format lama (meta.json langsung di MODEL_DIR) tetap bisa dibaca.
+"""
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from recommender import META_FILENAME, save_model_artifacts
+
+try:
+    import fcntl
+except ImportError:  # Windows: tidak ada worker gunicorn, lock tidak diperlukan
+    fcntl = None
+
+CURRENT_FILENAME = "CURRENT"
+VERSIONS_DIRNAME = "versions"
+LOCK_FILENAME = "build.lock"
+# Jumlah versi lama yang disimpan untuk rollback
+DEFAULT_KEEP_VERSIONS = 5
+
+
+def versions_dir(root):
+    return os.path.join(root, VERSIONS_DIRNAME)
+
+
+def version_dir(root, version):
+    return os.path.join(versions_dir(root), version)
+
+
+def _version_sort_key(version):
+    """Urutan versi: sufiks "-N" dari _new_version_name dibandingkan sebagai angka (-2 < -10)."""
+    base, _, suffix = version.partition("-")
+    return base, int(suffix) if suffix.isdigit() else 1, version
+
+
+def list_versions(root):
+    """Nama versi lengkap (punya meta.json), terurut dari yang terlama."""
+    try:
+        names = os.listdir(versions_dir(root))
+    except FileNotFoundError:
+        return []
+    return sorted(
+        (name for name in names if os.path.exists(os.path.join(version_dir(root, name), META_FILENAME))),
+        key=_version_sort_key,
+    )
+
+
+def current_version(root):
+    """Versi aktif menurut file CURRENT, atau None jika belum ada."""
+    try:
+        with open(os.path.join(root, CURRENT_FILENAME), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def current_model_dir(root):
+    """Direktori artefak versi aktif, atau None jika registry masih kosong."""
+    version = current_version(root)
+    if version and os.path.exists(os.path.join(version_dir(root, version), META_FILENAME)):
+        return version_dir(root, version)
+    if os.path.exists(os.path.join(root, META_FILENAME)):
+        return root # Format lama: artefak langsung di root
+    return None
+
+
+def set_current(root, version):
+    """Mengaktifkan versi tertentu secara atomik."""
+    if not os.path.exists(os.path.join(version_dir(root, version), META_FILENAME)):
+        raise ValueError(f"Versi model {version} tidak ditemukan di {versions_dir(root)}")
+    tmp_path = os.path.join(root, f"{CURRENT_FILENAME}.tmp-{os.getpid()}")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILENAME))
+
+
+def _new_version_name(root):
+    """
+    Memesan nama versi baru (timestamp UTC, sufiks -N jika sudah dipakai). Direktorinya
+    langsung dibuat dengan os.mkdir yang atomik, jadi dua proses yang mempublikasikan
+    pada detik yang sama tidak pernah mendapat nama yang sama.
+    """
+    base = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    version, suffix = base, 1
+    while True:
+        try:
+            os.mkdir(version_dir(root, version))
+            return version
+        except FileExistsError:
+            suffix += 1
+            version = f"{base}-{suffix}"
+
+
+def prune_versions(root, keep=DEFAULT_KEEP_VERSIONS):
+    """Menghapus versi terlama selain versi aktif sehingga tersisa `keep` versi."""
+    active = current_version(root)
+    versions = list_versions(root)
+    for version in versions[:max(0, len(versions) - keep)]:
+        if version != active:
+            # Worker yang masih memetakan file lama tetap aman; inode dilepas saat unmap
+            shutil.rmtree(version_dir(root, version), ignore_errors=True)
+
+
+@contextmanager
+def build_lock(root):
+    """
+    Lock eksklusif antarproses (file LOCK_FILENAME di root) selama versi model
+    pertama diunduh/dibangun atau selama update inkremental (model_update.py).
+    Worker gunicorn lain menunggu di sini, lalu memakai versi yang sudah
+    dipublikasikan alih-alih membangunnya lagi atau menimpanya. Tidak reentrant:
+    jangan dipanggil bertingkat di proses yang sama.
+    """
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, LOCK_FILENAME), "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def publish_model(root, movie_ids, neighbors, scores, extra_meta=None, extra_files=None, keep=DEFAULT_KEEP_VERSIONS):
+    """Menyimpan artefak sebagai versi baru, mengaktifkannya, lalu membersihkan versi lama."""
+    os.makedirs(versions_dir(root), exist_ok=True)
+    version = _new_version_name(root)
+    try:
+        meta = save_model_artifacts(
+            version_dir(root, version),
+            movie_ids,
+            neighbors,
+            scores,
+            extra_meta,
+            extra_files=extra_files,
+            version=version,
+        )
+    except BaseException:
+        # Lepaskan nama versi yang sudah dipesan
+        shutil.rmtree(version_dir(root, version), ignore_errors=True)
+        raise
+    set_current(root, version)
+    prune_versions(root, keep)
+    return meta
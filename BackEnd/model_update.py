@@ -0,0 +1,187 @@
+"""
+Update inkremental model rekomendasi untuk film yang baru ditambahkan/diubah
+(misalnya lewat scrape/spesifikscrape.py), tanpa membangun ulang seluruh model.
+
+Film baru divektorisasi dengan vocabulary vectorizer yang sudah di-fit saat
+build (build_model.py --source db/csv), top-K tetangganya dihitung terhadap
+seluruh katalog, lalu daftar tetangga film lain yang terpengaruh ditambal:
+- film yang skor terhadap film baru melebihi skor tetangga ke-K-nya
+  mendapatkan film baru di daftarnya;
+- jika film yang diubah sudah ada di model, daftar yang memuatnya dihitung
+  ulang secara eksak karena skornya bisa turun.
+Hasilnya dipublikasikan sebagai versi baru di registry model.
+
+Penggunaan:
+    python model_update.py 27205 634649
+"""
+import argparse
+import os
+import pickle
+import shutil
+
+import numpy as np
+
+from ann_index import ANN_FILENAME, LSHIndex
+from build_model import (
+    CATALOG_COLUMNS,
+    FEATURES_FILENAME,
+    VECTORIZER_FILENAME,
+    _cosine_top_k_rows,
+    build_tags,
+)
+from model_registry import build_lock, current_model_dir, publish_model
+from recommender import MODEL_DIRNAME, load_model_artifacts
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Metadata model yang ditulis ulang oleh save_model_artifacts, tidak diwarisi dari versi lama
+_GENERATED_META_KEYS = ("format_version", "version", "created_at", "n_movies", "top_k")
+
+
+def load_catalog_rows(conn, movie_ids):
+    """Membaca kolom katalog untuk movie_ids tertentu dari movies_all_data."""
+    import pandas as pd
+
+    cursor = conn.cursor()
+    try:
+        placeholders = ", ".join(["%s"] * len(movie_ids))
+        cursor.execute(
+            f"SELECT {', '.join(CATALOG_COLUMNS)} FROM movies_all_data WHERE movie_id IN ({placeholders})",
+            tuple(movie_ids),
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    return pd.DataFrame(rows, columns=list(CATALOG_COLUMNS))
+
+
+def _merge_neighbor(neighbors, scores, rows, new_row, new_scores):
+    """Menyisipkan new_row ke daftar top-K baris `rows` (skor terurut menurun)."""
+    top_k = neighbors.shape[1]
+    merged_neighbors = np.concatenate([neighbors[rows], np.full((len(rows), 1), new_row, dtype=np.int32)], axis=1)
+    merged_scores = np.concatenate([scores[rows], new_scores[:, np.newaxis].astype(np.float32)], axis=1)
+    order = np.argsort(-merged_scores, axis=1, kind="stable")[:, :top_k]
+    neighbors[rows] = np.take_along_axis(merged_neighbors, order, axis=1)
+    scores[rows] = np.take_along_axis(merged_scores, order, axis=1)
+
+
+def update_model(model_root, catalog_rows):
+    """
+    Menambahkan/memperbarui film di catalog_rows (DataFrame dengan kolom
+    CATALOG_COLUMNS) ke versi aktif registry model_root dan mempublikasikan
+    versi baru. Mengembalikan meta versi baru.
+
+    Lock registry dipegang dari membaca versi aktif sampai publikasi, sehingga
+    update dari worker/proses lain menunggu lalu memakai versi ini sebagai
+    induknya (tidak ada film yang hilang karena CURRENT saling menimpa).
+    """
+    with build_lock(model_root):
+        return _update_model(model_root, catalog_rows)
+
+
+def _update_model(model_root, catalog_rows):
+    from scipy import sparse
+    from sklearn.preprocessing import normalize
+
+    model_dir = current_model_dir(model_root)
+    if model_dir is None:
+        raise ValueError(f"Belum ada model di {model_root}; jalankan build_model.py terlebih dahulu")
+
+    vectorizer_path = os.path.join(model_dir, VECTORIZER_FILENAME)
+    features_path = os.path.join(model_dir, FEATURES_FILENAME)
+    if not (os.path.exists(vectorizer_path) and os.path.exists(features_path)):
+        raise ValueError(
+            "Model ini dibangun dari pickle dan tidak punya vectorizer/fitur; "
+            "bangun ulang dengan build_model.py --source db atau --source csv"
+        )
+
+    index = load_model_artifacts(model_dir)
+    with open(vectorizer_path, "rb") as f:
+        vectorizer = pickle.load(f)
+    features = sparse.load_npz(features_path).tocsr()
+    # Salinan di memori: file lama tetap dibaca worker lain sampai versi baru dimuat
+    movie_ids = np.array(index.movie_ids)
+    neighbors = np.array(index.neighbors)
+    scores = np.array(index.scores)
+    row_by_movie_id = dict(index.row_by_movie_id)
+    top_k = neighbors.shape[1]
+
+    if catalog_rows.empty:
+        raise ValueError("Tidak ada film yang ditemukan di movies_all_data untuk ID tersebut")
+    catalog_rows = catalog_rows.drop_duplicates("movie_id").reset_index(drop=True)
+    new_features = normalize(vectorizer.transform(build_tags(catalog_rows)).astype(np.float32), norm="l2")
+
+    added = []
+    changed = []
+    updated_rows = []
+    for movie_id, vector in zip(catalog_rows["movie_id"].astype(int).tolist(), new_features):
+        row = row_by_movie_id.get(movie_id)
+        if row is None:
+            row = features.shape[0]
+            features = sparse.vstack([features, vector], format="csr")
+            movie_ids = np.append(movie_ids, np.int64(movie_id))
+            neighbors = np.vstack([neighbors, np.zeros((1, top_k), dtype=np.int32)])
+            scores = np.vstack([scores, np.full((1, top_k), -np.inf, dtype=np.float32)])
+            row_by_movie_id[movie_id] = row
+            added.append(movie_id)
+        else:
+            features = features.tolil()
+            features[row] = vector
+            features = features.tocsr()
+            changed.append(movie_id)
+
+            # Skor film lain terhadap film ini bisa turun: hitung ulang daftar yang memuatnya
+            holders = np.flatnonzero((neighbors == row).any(axis=1))
+            holders = holders[holders != row]
+            if len(holders):
+                neighbors[holders], scores[holders] = _cosine_top_k_rows(features, holders, top_k)
+
+        updated_rows.append(row)
+        row_neighbors, row_scores = _cosine_top_k_rows(features, np.array([row]), top_k)
+        neighbors[row], scores[row] = row_neighbors[0], row_scores[0]
+
+        # Film lain yang kini lebih mirip dengan film ini daripada tetangga ke-K-nya
+        similarity = np.asarray(features @ vector.toarray().ravel()).ravel()
+        affected = np.flatnonzero(similarity > scores[:, -1])
+        affected = affected[(affected != row) & ~(neighbors[affected] == row).any(axis=1)]
+        if len(affected):
+            _merge_neighbor(neighbors, scores, affected, row, similarity[affected])
+
+    extra_files = {
+        VECTORIZER_FILENAME: lambda path: shutil.copyfile(vectorizer_path, path),
+        FEATURES_FILENAME: lambda path: sparse.save_npz(path, features),
+    }
+    ann_path = os.path.join(model_dir, ANN_FILENAME)
+    if os.path.exists(ann_path):
+        # Hyperplane yang sama; hanya film baru/diubah yang di-hash ulang
+        ann_index = LSHIndex.load(ann_path, features).update(features, updated_rows)
+        extra_files[ANN_FILENAME] = ann_index.save
+
+    extra_meta = {key: value for key, value in index.meta.items() if key not in _GENERATED_META_KEYS}
+    extra_meta.update(
+        parent_version=index.version,
+        incremental_updates=index.meta.get("incremental_updates", 0) + 1,
+    )
+    meta = publish_model(model_root, movie_ids, neighbors, scores, extra_meta, extra_files=extra_files)
+    print(
+        f"✅ Model versi {meta['version']} disimpan: {len(added)} film baru, {len(changed)} film diperbarui "
+        f"(dari versi {index.version})."
+    )
+    return meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tambahkan/perbarui film di model tanpa build ulang.")
+    parser.add_argument("movie_ids", type=int, nargs="+")
+    parser.add_argument("--model", default=os.path.join(BASE_DIR, MODEL_DIRNAME))
+    args = parser.parse_args()
+
+    import mysql.connector
+
+    from db import db_config
+
+    conn = mysql.connector.connect(**db_config)
+    try:
+        catalog_rows = load_catalog_rows(conn, args.movie_ids)
+    finally:
+        conn.close()
+    update_model(args.model, catalog_rows)
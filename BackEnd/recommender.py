@@ -0,0 +1,230 @@
+"""
+Indeks tetangga terdekat (top-K) untuk sistem rekomendasi film.
+
+Matriks similarity padat N x N tidak lagi disimpan di memori. Untuk setiap film
+hanya disimpan K film paling mirip (indeks baris int32) beserta skornya (float32),
+sehingga kebutuhan memori turun dari O(N^2) menjadi O(N*K).
+
+Artefak model disimpan sebagai direktori berisi file .npy mentah ditambah
+meta.json kecil. File .npy dibuka dengan mmap_mode='r', jadi semua worker
+gunicorn berbagi halaman page-cache yang sama dan startup hampir instan.
+"""
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Jumlah tetangga yang disimpan per film. Endpoint hanya memakai 15 teratas,
+# sisanya memberi ruang untuk filter/penyaringan di masa depan.
+DEFAULT_TOP_K = 50
+MODEL_DIRNAME = "model"
+ARTIFACT_FORMAT_VERSION = 1
+META_FILENAME = "meta.json"
+ARRAY_FILES = {
+    "movie_ids": np.int64,
+    "neighbors": np.int32,
+    "scores": np.float32,
+}
+
+
+def select_top_n_batch(score_rows, n, exclude=None):
+    """
+    Memilih n skor tertinggi untuk setiap baris dari matriks skor 2D.
+
+    Memakai argpartition (O(N)) lalu argsort kecil hanya pada n kandidat,
+    bukan pengurutan penuh O(N log N). `exclude` adalah array indeks kolom
+    (satu per baris) yang tidak boleh ikut terpilih, biasanya film itu sendiri.
+    Mengembalikan (indeks, skor) berbentuk (jumlah_baris, n), terurut menurun.
+    """
+    score_rows = np.asarray(score_rows)
+    n_rows, n_cols = score_rows.shape
+    extra = 0 if exclude is None else 1
+    n = max(0, min(n, n_cols - extra))
+    k = min(n + extra, n_cols)
+
+    if k < n_cols:
+        # Ambil k kolom terbesar tanpa peduli urutan di antara mereka
+        candidates = np.argpartition(score_rows, n_cols - k, axis=1)[:, n_cols - k:]
+    else:
+        candidates = np.broadcast_to(np.arange(n_cols), (n_rows, n_cols))
+    candidate_scores = np.take_along_axis(score_rows, candidates, axis=1).astype(np.float32)
+
+    if exclude is not None:
+        excluded = candidates == np.asarray(exclude).reshape(-1, 1)
+        candidate_scores[excluded] = -np.inf
+
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")[:, :n]
+    top_indices = np.take_along_axis(candidates, order, axis=1).astype(np.int32)
+    top_scores = np.take_along_axis(candidate_scores, order, axis=1)
+    return top_indices, top_scores
+
+
+def select_top_n(scores, n, exclude=None):
+    """Versi satu baris dari select_top_n_batch. `exclude` berupa satu indeks atau None."""
+    exclude = None if exclude is None else [exclude]
+    top_indices, top_scores = select_top_n_batch(np.asarray(scores)[np.newaxis, :], n, exclude)
+    return top_indices[0], top_scores[0]
+
+
+def build_neighbor_index(similarity, top_k=DEFAULT_TOP_K, block_size=1024):
+    """
+    Mengubah matriks similarity padat menjadi daftar top-K tetangga per film.
+    Diproses per blok baris sehingga memori sementara hanya O(block_size * N).
+    Film itu sendiri dikecualikan berdasarkan indeks, bukan posisi urutan.
+    """
+    n_movies = similarity.shape[0]
+    k = min(top_k, n_movies - 1)
+    neighbors = np.empty((n_movies, k), dtype=np.int32)
+    scores = np.empty((n_movies, k), dtype=np.float32)
+
+    for start in range(0, n_movies, block_size):
+        stop = min(start + block_size, n_movies)
+        neighbors[start:stop], scores[start:stop] = select_top_n_batch(
+            similarity[start:stop], k, exclude=np.arange(start, stop)
+        )
+
+    return neighbors, scores
+
+
+def save_model_artifacts(model_dir, movie_ids, neighbors, scores, extra_meta=None, extra_files=None, version=None):
+    """
+    Menyimpan artefak model ke direktori model_dir.
+    `extra_files` berisi {nama_file: fungsi(path)} untuk artefak tambahan
+    (misalnya vectorizer dan matriks fitur) yang ikut ditulis secara atomik.
+    `version` default-nya timestamp UTC saat penyimpanan.
+
+    Semua file ditulis dulu ke direktori sementara di sebelahnya, lalu direktori
+    tersebut di-rename menggantikan model_dir, sehingga pembaca tidak pernah
+    melihat artefak yang setengah tertulis.
+    """
+    arrays = {
+        "movie_ids": movie_ids,
+        "neighbors": neighbors,
+        "scores": scores,
+    }
+    model_dir = os.path.abspath(model_dir)
+    tmp_dir = f"{model_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    for name, dtype in ARRAY_FILES.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(arrays[name], dtype=dtype))
+    for filename, write in (extra_files or {}).items():
+        write(os.path.join(tmp_dir, filename))
+
+    meta = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "version": version or datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "n_movies": int(len(movie_ids)),
+        "top_k": int(neighbors.shape[1]),
+    }
+    meta.update(extra_meta or {})
+    with open(os.path.join(tmp_dir, META_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    old_dir = None
+    if os.path.exists(model_dir):
+        old_dir = f"{model_dir}.old-{os.getpid()}"
+        os.replace(model_dir, old_dir)
+    os.replace(tmp_dir, model_dir)
+    if old_dir:
+        # Worker yang masih memetakan file lama tetap aman; inode baru dilepas saat unmap
+        shutil.rmtree(old_dir, ignore_errors=True)
+    return meta
+
+
+def load_model_artifacts(model_dir):
+    """Membuka artefak model secara zero-copy (memory-mapped, read-only)."""
+    with open(os.path.join(model_dir, META_FILENAME), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Format artefak model tidak didukung: {meta.get('format_version')}")
+
+    arrays = {}
+    for name, dtype in ARRAY_FILES.items():
+        array = np.load(os.path.join(model_dir, f"{name}.npy"), mmap_mode="r")
+        if array.dtype != dtype:
+            raise ValueError(f"Tipe data {name}.npy tidak sesuai: {array.dtype}, seharusnya {np.dtype(dtype)}")
+        arrays[name] = array
+    return NeighborIndex(arrays["movie_ids"], arrays["neighbors"], arrays["scores"], meta=meta)
+
+
+class NeighborIndex:
+    """
+    Menyimpan movie_id per baris model dan top-K tetangga setiap baris.
+    Baris ke-i pada `neighbors` sudah terurut dari skor tertinggi.
+    """
+
+    def __init__(self, movie_ids, neighbors, scores, meta=None):
+        if neighbors.shape != scores.shape or neighbors.shape[0] != len(movie_ids):
+            raise ValueError("Bentuk array indeks tetangga tidak konsisten")
+        self.meta = meta or {}
+        self.movie_ids = movie_ids
+        self.neighbors = neighbors
+        self.scores = scores
+        # Peta movie_id -> baris model, dibangun sekali agar lookup per request O(1)
+        self.row_by_movie_id = {movie_id: row for row, movie_id in enumerate(self.movie_ids.tolist())}
+
+    def __len__(self):
+        return len(self.movie_ids)
+
+    @property
+    def version(self):
+        return self.meta.get("version", "unknown")
+
+    @property
+    def top_k(self):
+        return self.neighbors.shape[1]
+
+    def row_of(self, movie_id):
+        """Mengembalikan baris model untuk movie_id, atau None jika film tidak ada di model."""
+        return self.row_by_movie_id.get(movie_id)
+
+    def movie_ids_at(self, rows):
+        """Memetakan baris model ke movie_id (list int Python, siap untuk query/JSON)."""
+        return self.movie_ids[rows].tolist()
+
+    def top_n(self, movie_index, n):
+        """Mengembalikan (indeks_baris, skor) untuk n tetangga teratas dari satu film."""
+        n = min(n, self.top_k)
+        return self.neighbors[movie_index, :n], self.scores[movie_index, :n]
+
+    def top_n_batch(self, movie_indices, n):
+        """
+        Versi batch dari top_n: satu gather untuk banyak film sekaligus.
+        Mengembalikan dua array berbentuk (len(movie_indices), n).
+        """
+        n = min(n, self.top_k)
+        movie_indices = np.asarray(movie_indices, dtype=np.intp)
+        return self.neighbors[movie_indices, :n], self.scores[movie_indices, :n]
+
+    def aggregate_neighbors(self, seed_rows, weights, n, exclude_rows=None):
+        """
+        Rekomendasi dari banyak film sekaligus ("karena Anda menonton ...").
+
+        Skor kandidat = jumlah (bobot seed x skor kandidat di daftar top-K seed)
+        atas semua seed. Hanya daftar top-K milik seed yang dibaca, jadi biayanya
+        O(seed x K) dan tidak bergantung pada jumlah film di katalog. Seed dan
+        `exclude_rows` (misalnya film yang sudah ditonton) tidak ikut terpilih.
+        Mengembalikan (indeks_baris, skor_agregat) terurut menurun.
+        """
+        seed_rows = np.asarray(seed_rows, dtype=np.intp)
+        weights = np.asarray(weights, dtype=np.float32)
+        rows = self.neighbors[seed_rows].ravel()
+        weighted = (self.scores[seed_rows] * weights[:, np.newaxis]).ravel()
+
+        # Slot kosong dari indeks LSH (baris -1, skor -inf) diabaikan
+        valid = (rows >= 0) & np.isfinite(weighted)
+        candidates, inverse = np.unique(rows[valid], return_inverse=True)
+        totals = np.bincount(inverse, weights=weighted[valid], minlength=len(candidates))
+
+        excluded = seed_rows if exclude_rows is None else np.concatenate([seed_rows, np.asarray(exclude_rows, dtype=np.intp)])
+        keep = ~np.isin(candidates, excluded)
+        candidates, totals = candidates[keep], totals[keep]
+        if len(candidates) == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        top, top_scores = select_top_n(totals, n)
+        return candidates[top].astype(np.int32), top_scores
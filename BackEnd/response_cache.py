@@ -0,0 +1,74 @@
+"""
+Cache respons rekomendasi dalam bentuk byte JSON yang sudah diserialisasi.
+
+Respons /api/recommendations/<movie_id> hanya bergantung pada versi model dan
+versi snapshot metadata, jadi hasilnya bisa dipakai ulang sampai salah satu
+versi tersebut berubah. Memori dibatasi dengan jumlah byte maksimum dan
+entri yang paling lama tidak dipakai dibuang lebih dulu (LRU).
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def make_etag(body):
+    """ETag kuat berdasarkan isi respons."""
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Mengembalikan (body, etag) untuk key, atau None jika tidak ada di cache."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body):
+        """Menyimpan body (bytes) dan mengembalikan (body, etag)."""
+        entry = (body, make_etag(body))
+        if len(body) > self.max_bytes:
+            return entry # Terlalu besar untuk disimpan, tetap dikirim ke klien
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+            self._entries[key] = entry
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, (evicted_body, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted_body)
+                self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
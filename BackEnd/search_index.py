@@ -0,0 +1,113 @@
+"""
+Indeks pencarian judul film di memori untuk endpoint /api/movies/search.
+
+Judul dinormalisasi (huruf kecil, tanpa aksen, tanda baca menjadi spasi) lalu
+disimpan dalam dua daftar terurut untuk pencarian prefix dengan bisect
+(judul utuh dan setiap kata di judul), ditambah indeks trigram untuk query
+yang hanya cocok sebagian atau salah ketik.
+"""
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+
+# Batas kandidat per tahap agar query sangat pendek (misalnya "a") tetap murah
+MAX_PREFIX_CANDIDATES = 2000
+MIN_TRIGRAM_SCORE = 0.3
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+# Urutan peringkat: judul persis, awalan judul, awalan salah satu kata, trigram
+TIER_EXACT, TIER_PREFIX, TIER_WORD_PREFIX, TIER_TRIGRAM = range(4)
+
+
+def normalize_title(text):
+    """'Amélie (2001)' -> 'amelie 2001'."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    without_accents = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", without_accents.casefold()).strip()
+
+
+def _trigrams(normalized):
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _prefix_range(sorted_keys, prefix):
+    lo = bisect_left(sorted_keys, prefix)
+    hi = bisect_left(sorted_keys, prefix + "\uffff")
+    return lo, min(hi, lo + MAX_PREFIX_CANDIDATES)
+
+
+class TitleSearchIndex:
+    def __init__(self, titles, popularity=None):
+        self.normalized = [normalize_title(title) for title in titles]
+        self.popularity = [float(p) if p is not None else 0.0 for p in (popularity or [0.0] * len(titles))]
+
+        title_entries = sorted((norm, row) for row, norm in enumerate(self.normalized) if norm)
+        self.title_keys = [norm for norm, _ in title_entries]
+        self.title_rows = [row for _, row in title_entries]
+
+        word_entries = sorted(
+            {(word, row) for row, norm in enumerate(self.normalized) for word in norm.split()}
+        )
+        self.word_keys = [word for word, _ in word_entries]
+        self.word_rows = [row for _, row in word_entries]
+
+        postings = {}
+        for row, norm in enumerate(self.normalized):
+            for gram in _trigrams(norm):
+                postings.setdefault(gram, []).append(row)
+        self.trigram_rows = {gram: np.asarray(rows, dtype=np.int32) for gram, rows in postings.items()}
+
+    def search(self, query, limit=10):
+        """Mengembalikan baris-baris yang paling cocok, sudah diurutkan berdasarkan peringkat."""
+        query = normalize_title(query)
+        if not query or limit <= 0:
+            return []
+
+        # row -> (tier, -skor_trigram)
+        best = {}
+
+        def offer(row, tier, score=1.0):
+            rank = (tier, -score)
+            if row not in best or rank < best[row]:
+                best[row] = rank
+
+        lo, hi = _prefix_range(self.title_keys, query)
+        for i in range(lo, hi):
+            offer(self.title_rows[i], TIER_EXACT if self.title_keys[i] == query else TIER_PREFIX)
+
+        # Setiap kata query harus menjadi awalan salah satu kata di judul
+        words = query.split()
+        word_matches = None
+        for word in words:
+            lo, hi = _prefix_range(self.word_keys, word)
+            rows = set(self.word_rows[lo:hi])
+            word_matches = rows if word_matches is None else word_matches & rows
+        for row in word_matches or ():
+            offer(row, TIER_WORD_PREFIX)
+
+        if len(best) < limit and len(query) >= 3:
+            query_grams = _trigrams(query)
+            hits = [self.trigram_rows[g] for g in query_grams if g in self.trigram_rows]
+            if hits:
+                rows, counts = np.unique(np.concatenate(hits), return_counts=True)
+                scores = counts / len(query_grams)
+                keep = scores >= MIN_TRIGRAM_SCORE
+                for row, score in zip(rows[keep].tolist(), scores[keep].tolist()):
+                    offer(row, TIER_TRIGRAM, score)
+
+        ranked = sorted(
+            best,
+            key=lambda row: (
+                best[row],
+                -self.popularity[row],
+                len(self.normalized[row]),
+                self.normalized[row],
+            ),
+        )
+        return ranked[:limit]
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul backend di-import langsung (import datar), sama seperti app.py dan benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,83 @@
+"""
+Respons JSON app.py di mode debug (python app.py): Flask memformat JSON dengan
+indent, dan item rekomendasi dari metadata_store berupa Fragment.
+"""
+import importlib
+import json
+
+import pytest
+
+import json_codec
+import metadata_store
+
+N_MOVIES = 40
+PROVIDERS = [
+    {"id": 8, "name": "Netflix", "logo": "/n.png", "subscribe_url": "https://www.netflix.com"},
+    {"id": 337, "name": "Disney Plus", "logo": "/d.png", "subscribe_url": "https://www.disneyplus.com"},
+]
+
+
+def make_catalog():
+    import pandas as pd
+
+    genres = ["Action", "Drama", "Comedy", "Horror"]
+    return pd.DataFrame(
+        {
+            "movie_id": [1000 + i for i in range(N_MOVIES)],
+            "original_title": [f"Film {i}" for i in range(N_MOVIES)],
+            "poster_path": [f"https://image.tmdb.org/t/p/w500/{i}.jpg" for i in range(N_MOVIES)],
+            "watch_providers": [json.dumps(PROVIDERS[: i % 3]) for i in range(N_MOVIES)],
+            "release_date": ["2020-01-01"] * N_MOVIES,
+            "vote_average": [7.5] * N_MOVIES,
+            "genres": [f"{genres[i % 4]}, {genres[(i + 1) % 4]}" for i in range(N_MOVIES)],
+            "keywords": [f"kata{i % 5}, kata{i % 7}" for i in range(N_MOVIES)],
+            "directors": [f"Sutradara {i % 6}" for i in range(N_MOVIES)],
+            "main_actors": [f"Aktor {i % 8}, Aktor {i % 9}" for i in range(N_MOVIES)],
+            "overview": [f"cerita tentang kata{i % 5} dan kata{i % 3}" for i in range(N_MOVIES)],
+        }
+    )
+
+
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory):
+    from build_model import build_from_catalog
+
+    root = tmp_path_factory.mktemp("app")
+    catalog = make_catalog()
+    catalog.to_csv(root / "snapshot.csv", index=False)
+    build_from_catalog(catalog, str(root / "model"), n_jobs=1)
+
+    patch = pytest.MonkeyPatch()
+    patch.setenv("MODEL_DIR", str(root / "model"))
+    patch.setenv("METADATA_SNAPSHOT", str(root / "snapshot.csv"))
+    patch.setenv("MODEL_WATCH_INTERVAL", "0")
+    # Paksa item rekomendasi berupa Fragment, apa pun versi orjson yang terpasang
+    patch.setattr(metadata_store, "JSON_FRAGMENTS", True)
+    try:
+        yield importlib.import_module("app")
+    finally:
+        patch.undo()
+
+
+def test_recommendations_in_debug_mode(app_module):
+    app = app_module.app
+    assert app_module.serving.movie_store.recommendation_fragments is not None
+    app.debug = True
+    try:
+        response = app.test_client().get("/api/recommendations/1000")
+    finally:
+        app.debug = False
+
+    assert response.status_code == 200
+    assert b'\n  "dominant_platform"' in response.data  # diformat dengan indent
+    expected, _ = app_module.build_recommendations(1000)
+    assert response.get_json() == json_codec.loads(json_codec.dumps(json_codec.WithFragments(expected)))
+    assert len(expected["dominant_platform"]["movies"]) + len(expected["other_platforms"]["movies"]) == 15
+
+
+def test_dumps_with_indent_accepts_fragments(app_module):
+    fragment = json_codec.fragment({"movie_id": 1, "original_title": "Film"})
+
+    text = app_module.app.json.dumps(json_codec.WithFragments({"movies": [fragment]}), indent=2)
+
+    assert json.loads(text) == {"movies": [{"movie_id": 1, "original_title": "Film"}]}
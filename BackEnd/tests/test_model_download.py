@@ -0,0 +1,112 @@
+"""
+Pengujian model_download.py terhadap server HTTP lokal yang mendukung Range:
+unduhan per bagian, resume dari <file>.part.json, dan pembersihan saat
+checksum tidak cocok.
+"""
+import hashlib
+import http.server
+import json
+import os
+import re
+import threading
+
+import pytest
+import requests
+
+import model_download
+
+PART_SIZE = 1024
+DATA = bytes(range(256)) * 20  # 5120 byte = 5 bagian
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(DATA)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def do_GET(self):
+        match = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        if not match:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(DATA)))
+            self.end_headers()
+            self.wfile.write(DATA)
+            return
+        start, end = int(match[1]), int(match[2])
+        self.server.ranges.append((start, end))
+        if start in self.server.failing_starts:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(DATA)}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(DATA[start:end + 1])
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(model_download, "PART_SIZE", PART_SIZE)
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    httpd.ranges = []
+    httpd.failing_starts = set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/similarity.pkl"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_range_download(server, tmp_path):
+    destination = tmp_path / "similarity.pkl"
+    sha256 = hashlib.sha256(DATA).hexdigest()
+
+    model_download.download_file(server.url, str(destination), sha256, max_workers=2)
+
+    assert destination.read_bytes() == DATA
+    assert sorted(server.ranges) == [(start, min(start + PART_SIZE, len(DATA)) - 1) for start in range(0, len(DATA), PART_SIZE)]
+    assert not os.path.exists(f"{destination}.part")
+    assert not os.path.exists(f"{destination}.part.json")
+
+
+def test_resume_after_interrupted_part(server, tmp_path):
+    destination = tmp_path / "similarity.pkl"
+    sha256 = hashlib.sha256(DATA).hexdigest()
+    server.failing_starts = {2 * PART_SIZE}
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        model_download.download_file(server.url, str(destination), sha256, max_workers=1)
+
+    assert not destination.exists()
+    with open(f"{destination}.part.json", encoding="utf-8") as f:
+        done = set(json.load(f)["done"])
+    # Bagian sebelum yang gagal sudah tercatat; bagian setelahnya bisa dibatalkan executor
+    assert {0, 1} <= done and 2 not in done
+
+    server.failing_starts = set()
+    server.ranges.clear()
+    model_download.download_file(server.url, str(destination), sha256, max_workers=1)
+
+    # Hanya bagian yang belum selesai yang diunduh ulang
+    assert [start // PART_SIZE for start, _ in server.ranges] == sorted(set(range(5)) - done)
+    assert destination.read_bytes() == DATA
+    assert not os.path.exists(f"{destination}.part.json")
+
+
+def test_checksum_mismatch_removes_partial_files(server, tmp_path):
+    destination = tmp_path / "similarity.pkl"
+
+    with pytest.raises(model_download.ChecksumMismatch):
+        model_download.download_file(server.url, str(destination), "0" * 64, max_workers=2)
+
+    assert not destination.exists()
+    assert not os.path.exists(f"{destination}.part")
+    assert not os.path.exists(f"{destination}.part.json")
@@ -1,15 +1,15 @@
-import React, { useState, useEffect } from 'react';
-import Select from 'react-select';
-import { fetchAllMovies, fetchRecommendations } from '../api/apiService';
+import React, { useState, useEffect, useMemo } from 'react';
+import AsyncSelect from 'react-select/async';
+import { createMovieOptionsLoader, fetchRecommendations } from '../api/apiService';
 import MovieSlider from '../components/MovieSlider.jsx';
 
 function HomePage() {
     const [selectedMovie, setSelectedMovie] = useState(null);
-    const [allMovieOptions, setAllMovieOptions] = useState([]);
     const [recommendations, setRecommendations] = useState(null);
     const [isLoading, setIsLoading] = useState(false);
-    const [isLoadingMovies, setIsLoadingMovies] = useState(true);
     const [error, setError] = useState(null);
+    // Opsi film diambil dari /api/movies/search sesuai teks yang diketik
+    const loadMovieOptions = useMemo(() => createMovieOptionsLoader(), []);
     
     // --- PERUBAHAN BARU ---
     // State untuk mengelola timer cooldown dalam detik
@@ -29,17 +29,6 @@ function HomePage() {
         return () => clearTimeout(timerId);
     }, [cooldown]); // Hook ini akan berjalan setiap kali nilai cooldown berubah
 
-    useEffect(() => {
-        setIsLoadingMovies(true);
-        fetchAllMovies()
-            .then(data => {
-                const options = data.map(m => ({ value: m.movie_id, label: m.original_title }));
-                setAllMovieOptions(options);
-            })
-            .catch(err => setError("Gagal memuat daftar film. Coba muat ulang halaman."))
-            .finally(() => setIsLoadingMovies(false));
-    }, []);
-    
     const customStyles = {
       control: (base) => ({ ...base, backgroundColor: '#2D3748', borderColor: '#4A5568', borderRadius: '0.5rem', minHeight: '42px', boxShadow: 'none', '&:hover': { borderColor: '#4A5568' } }),
       singleValue: (base) => ({ ...base, color: '#E2E8F0' }),
@@ -98,12 +87,14 @@ function HomePage() {
                 
                 <div className="flex flex-col sm:flex-row items-center gap-4 justify-center">
                     <div className="w-full sm:w-80">
-                       <Select
-                            options={allMovieOptions}
+                       <AsyncSelect
+                            cacheOptions
+                            loadOptions={loadMovieOptions}
+                            filterOption={null} // Urutan & hasil pencarian dari server (toleran typo/aksen) ditampilkan apa adanya
                             onChange={setSelectedMovie}
                             placeholder="Pilih Film Favorit Anda"
+                            noOptionsMessage={({ inputValue }) => inputValue ? "Film tidak ditemukan" : "Ketik judul film..."}
                             styles={customStyles}
-                            isLoading={isLoadingMovies}
                             isDisabled={isLoading || cooldown > 0} // Nonaktifkan dropdown saat loading/cooldown
                         />
                     </div>
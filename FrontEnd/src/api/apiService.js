@@ -19,10 +19,42 @@ export const fetchAllMovies = () => {
     return fetchFromApi('/movies');
 };
 
+export const searchMovies = (query, limit = 20) => {
+    return fetchFromApi(`/movies/search?q=${encodeURIComponent(query)}&limit=${limit}`);
+};
+
+// Loader untuk AsyncSelect: setiap ketukan hanya mengambil beberapa judul yang cocok.
+// Permintaan ditunda (debounce) agar tidak ada request untuk setiap huruf yang diketik.
+// Promise dari ketukan yang tergantikan diselesaikan dengan [] agar tidak menggantung.
+export const createMovieOptionsLoader = (delay = 250) => {
+    let timerId;
+    let resolvePending;
+    return (inputValue) => new Promise((resolve) => {
+        clearTimeout(timerId);
+        if (resolvePending) {
+            resolvePending([]);
+            resolvePending = null;
+        }
+        if (!inputValue || !inputValue.trim()) {
+            resolve([]);
+            return;
+        }
+        resolvePending = resolve;
+        timerId = setTimeout(() => {
+            resolvePending = null;
+            searchMovies(inputValue.trim())
+                .then(data => resolve(data.map(m => ({ value: m.movie_id, label: m.original_title }))))
+                .catch(() => resolve([]));
+        }, delay);
+    });
+};
+
 export const fetchMovieDetails = (movieId) => {
     return fetchFromApi(`/movies/${movieId}`);
 };
 
+// Satu request menghasilkan kedua slider di HomePage. Tampilan dengan beberapa baris
+// rekomendasi sekaligus sebaiknya memakai POST /api/recommendations/batch (satu request).
 export const fetchRecommendations = (movieId) => {
     return fetchFromApi(`/recommendations/${movieId}`);
 };
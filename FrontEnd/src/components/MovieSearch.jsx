@@ -1,24 +1,13 @@
-import React, { useState, useEffect } from 'react';
-import Select from 'react-select';
+import React, { useState, useMemo } from 'react';
+import AsyncSelect from 'react-select/async';
 import { useNavigate } from 'react-router-dom';
-import { fetchAllMovies } from '../api/apiService';
+import { createMovieOptionsLoader } from '../api/apiService';
 
 function MovieSearch() {
     const [selected, setSelected] = useState(null);
-    const [movieOptions, setMovieOptions] = useState([]);
-    const [isLoading, setIsLoading] = useState(true);
     const navigate = useNavigate();
-
-    useEffect(() => {
-        setIsLoading(true);
-        fetchAllMovies()
-            .then(data => {
-                const options = data.map(m => ({ value: m.movie_id, label: m.original_title }));
-                setMovieOptions(options);
-            })
-            .catch(err => console.error("Gagal memuat daftar film untuk pencarian:", err))
-            .finally(() => setIsLoading(false));
-    }, []);
+    // Opsi diambil dari /api/movies/search sesuai teks yang diketik
+    const loadMovieOptions = useMemo(() => createMovieOptionsLoader(), []);
     
     const customStyles = {
       control: (base) => ({ ...base, backgroundColor: '#2D3748', borderColor: '#4A5568', borderRadius: '0.5rem', minHeight: '42px', boxShadow: 'none', '&:hover': { borderColor: '#4A5568' } }),
@@ -39,14 +28,16 @@ function MovieSearch() {
     return (
         <div className="flex items-center gap-2 w-full md:w-96">
             <div className="flex-grow">
-                <Select
+                <AsyncSelect
                     value={selected}
-                    options={movieOptions}
+                    cacheOptions
+                    loadOptions={loadMovieOptions}
+                    filterOption={null} // Hasil /api/movies/search tidak disaring ulang di klien
                     onChange={setSelected}
                     placeholder="Cari film..."
+                    noOptionsMessage={({ inputValue }) => inputValue ? "Film tidak ditemukan" : "Ketik judul film..."}
                     styles={customStyles}
                     isClearable
-                    isLoading={isLoading}
                 />
             </div>
             <button 
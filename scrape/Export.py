@@ -1,12 +1,44 @@
+"""
+Ekspor tabel movies_all_data ke file, secara bertahap (streaming).
+
+Data dibaca dengan cursor tanpa buffer (baris dialirkan dari server MySQL
+sesuai kebutuhan, tidak dimuat sekaligus ke klien) per UKURAN_CHUNK baris,
+lalu setiap chunk langsung ditulis ke file. Memori puncak hanya sebesar satu
+chunk, berapa pun ukuran tabelnya.
+
+Format ditentukan dari ekstensi file tujuan:
+- .csv      CSV biasa
+- .csv.gz   CSV terkompresi gzip
+- .parquet  Parquet (kolumnar, bertipe, kompresi zstd; butuh pyarrow).
+            Dibaca build_model.py --source csv jauh lebih cepat daripada CSV.
+
+File ditulis ke <nama>.tmp lalu di-rename, jadi tidak pernah ada file setengah jadi.
+
+Penggunaan:
+    python Export.py
+    python Export.py --output movies_data_fix.parquet --chunk-size 10000
+"""
+import argparse
+import gzip
+import os
+
 import mysql.connector
-from mysql.connector import Error
 import pandas as pd
-import os
 from dotenv import load_dotenv
+from mysql.connector import Error
 
 # Muat variabel lingkungan dari file .env
 load_dotenv()
 
+# Jumlah baris per chunk saat membaca dan menulis
+UKURAN_CHUNK = int(os.getenv("EXPORT_CHUNK_SIZE", 5000))
+
+# Tipe kolom movies_all_data (lihat CREATE TABLE di scrapingdataFIX.py).
+# Kolom lain yang tidak terdaftar disimpan sebagai teks.
+KOLOM_INTEGER = ("movie_id",)
+KOLOM_DESIMAL = ("vote_average",)
+KOLOM_TANGGAL = ("release_date", "scraped_at")
+
 
 def koneksi_db():
     """Membuka koneksi ke database MySQL menggunakan env."""
@@ -26,47 +58,117 @@ def koneksi_db():
         return None
 
 
-def ambil_data_tabel(koneksi, nama_tabel):
-    """Mengambil semua data dari tabel"""
-    try:
-        query = f"SELECT * FROM {nama_tabel}"
-        df = pd.read_sql(query, koneksi)
-        print(f"Berhasil mengambil data dari tabel: {nama_tabel}")
-        return df
-    except Error as err:
-        print(f"Error saat mengambil data dari tabel '{nama_tabel}': '{err}'")
-        return pd.DataFrame()  # Kembalikan DataFrame kosong jika ada error
+def rapikan_tipe(df):
+    """Menetapkan tipe kolom yang sama untuk setiap chunk (penting untuk Parquet)."""
+    for kolom in df.columns:
+        if kolom in KOLOM_INTEGER:
+            df[kolom] = pd.to_numeric(df[kolom]).astype("Int64")
+        elif kolom in KOLOM_DESIMAL:
+            df[kolom] = pd.to_numeric(df[kolom]).astype("float32")
+        elif kolom in KOLOM_TANGGAL:
+            df[kolom] = pd.to_datetime(df[kolom], errors="coerce").astype("datetime64[us]")
+        else:
+            # Kolom JSON bisa datang sebagai bytes dari mysql-connector
+            df[kolom] = df[kolom].map(lambda v: v.decode("utf-8") if isinstance(v, (bytes, bytearray)) else v)
+            df[kolom] = df[kolom].astype("string")
+    return df
 
 
-def ekspor_ke_csv(dataframe, nama_file):
-    """Mengekspor DataFrame ke file CSV."""
+def ambil_data_bertahap(koneksi, nama_tabel, ukuran_chunk=UKURAN_CHUNK):
+    """Generator DataFrame berisi paling banyak ukuran_chunk baris dari tabel."""
+    cursor = koneksi.cursor(buffered=False)
     try:
-        dataframe.to_csv(nama_file, index=False, encoding="utf-8")
-        print(f"Data berhasil diekspor ke '{nama_file}'")
-    except Exception as e:
-        print(f"Error saat mengekspor data ke CSV: '{e}'")
+        cursor.execute(f"SELECT * FROM {nama_tabel}")
+        kolom = list(cursor.column_names)
+        while True:
+            baris = cursor.fetchmany(ukuran_chunk)
+            if not baris:
+                break
+            yield rapikan_tipe(pd.DataFrame(baris, columns=kolom))
+    finally:
+        cursor.close()
 
 
-if __name__ == "__main__":
+def _tulis_csv(chunks, file):
+    total = 0
+    for chunk in chunks:
+        chunk.to_csv(file, index=False, header=total == 0)
+        total += len(chunk)
+    return total
 
-    # Buat koneksi database
-    koneksi_db = koneksi_db()
 
-    if koneksi_db:
-        nama_tabel = "movies_all_data"
-        nama_file_csv = "movies_data_fix.csv"
+def _tulis_parquet(chunks, path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Ekspor Parquet membutuhkan pyarrow (pip install pyarrow)") from e
+
+    writer = None
+    total = 0
+    try:
+        for chunk in chunks:
+            if writer is None:
+                # Skema diambil dari chunk pertama; rapikan_tipe menjamin chunk berikutnya sama
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(path, schema, compression="zstd")
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            total += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
 
-        # Ambil data ke dalam DataFrame
-        df_film = ambil_data_tabel(koneksi_db, nama_tabel)
 
-        if not df_film.empty:
-            # Ekspor DataFrame ke CSV
-            ekspor_ke_csv(df_film, nama_file_csv)
+def ekspor_bertahap(chunks, nama_file):
+    """
+    Menulis chunk DataFrame ke nama_file (format dari ekstensinya).
+    Mengembalikan jumlah baris yang diekspor.
+    """
+    tmp_path = f"{nama_file}.tmp"
+    try:
+        if nama_file.endswith(".parquet"):
+            total = _tulis_parquet(chunks, tmp_path)
+        elif nama_file.endswith(".gz"):
+            with gzip.open(tmp_path, "wt", encoding="utf-8", newline="") as f:
+                total = _tulis_csv(chunks, f)
         else:
-            print("Tidak ada data yang diambil untuk diekspor.")
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                total = _tulis_csv(chunks, f)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if total == 0:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return 0
+    os.replace(tmp_path, nama_file)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ekspor movies_all_data ke CSV/CSV.gz/Parquet secara bertahap.")
+    parser.add_argument("--table", default="movies_all_data")
+    parser.add_argument("--output", default="movies_data_fix.csv", help="Ekstensi .csv, .csv.gz, atau .parquet")
+    parser.add_argument("--chunk-size", type=int, default=UKURAN_CHUNK)
+    args = parser.parse_args()
+
+    # Buat koneksi database
+    koneksi = koneksi_db()
 
-        # Tutup koneksi
-        koneksi_db.close()
-        print("Koneksi MySQL ditutup.")
+    if koneksi:
+        try:
+            jumlah = ekspor_bertahap(ambil_data_bertahap(koneksi, args.table, args.chunk_size), args.output)
+            if jumlah:
+                print(f"✅ {jumlah} baris dari tabel '{args.table}' berhasil diekspor ke '{args.output}'")
+            else:
+                print("Tidak ada data yang diambil untuk diekspor.")
+        except (Error, RuntimeError, OSError) as e:
+            print(f"❌ Error saat mengekspor data: '{e}'")
+        finally:
+            # Tutup koneksi
+            koneksi.close()
+            print("Koneksi MySQL ditutup.")
     else:
-        print("Gagal membuat koneksi database. Ekspor CSV dibatalkan.")
+        print("Gagal membuat koneksi database. Ekspor dibatalkan.")
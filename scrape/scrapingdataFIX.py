@@ -1,12 +1,16 @@
+import argparse
 import requests
 import mysql.connector
 import json
 from mysql.connector import Error
 import time
-from datetime import datetime
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 
+from tmdb_client import TMDbClient
+
 # Muat variabel lingkungan dari file .env
 load_dotenv()
 
@@ -86,56 +90,61 @@ def create_tables():
             conn.close()
 
 
+# Menambahkan 'original_language' ke daftar kolom INSERT dan UPDATE
+INSERT_MOVIE_QUERY = """
+INSERT INTO movies_all_data (
+    movie_id, original_title, poster_path, overview, release_date,
+    vote_average, genres, directors, main_actors, watch_providers, keywords,
+    original_language
+) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    original_title = VALUES(original_title),
+    poster_path = VALUES(poster_path),
+    overview = VALUES(overview),
+    release_date = VALUES(release_date),
+    vote_average = VALUES(vote_average),
+    genres = VALUES(genres),
+    directors = VALUES(directors),
+    main_actors = VALUES(main_actors),
+    watch_providers = VALUES(watch_providers),
+    keywords = VALUES(keywords),
+    scraped_at = CURRENT_TIMESTAMP,
+    original_language = VALUES(original_language)
+"""
+
+
+def build_movie_values(movie_details, processed_watch_providers, movie_keywords, original_language):
+    """Menyiapkan tuple nilai untuk INSERT_MOVIE_QUERY dari detail film TMDb."""
+    # Menambahkan 'original_language' ke daftar nilai
+    return (
+        movie_details.get("id"),
+        movie_details.get("original_title"),
+        movie_details.get("poster_path"), # Ini seharusnya sudah menjadi URL lengkap
+        movie_details.get("overview"),
+        movie_details.get("release_date"), # Seharusnya string YYYY-MM-DD atau None
+        movie_details.get("vote_average"),
+        ", ".join([g["name"] for g in movie_details.get("genres", []) if g.get("name")]),
+        ", ".join(
+            [p["name"] for p in movie_details.get("credits", {}).get("crew", []) if p.get("job") == "Director"][:2]
+        ), # 2 sutradara teratas
+        ", ".join(
+            [p["name"] for p in movie_details.get("credits", {}).get("cast", []) if p.get("name")][:3]
+        ), # 3 aktor utama teratas
+        json.dumps(processed_watch_providers), # Simpan daftar konsolidasi sebagai string JSON
+        movie_keywords, # Sudah berupa string yang dipisahkan koma
+        original_language, # Nilai untuk kolom bahasa asli
+    )
+
+
 def insert_movie_data(cursor, conn, movie_details, processed_watch_providers, movie_keywords, original_language):
     """
     Memasukkan atau memperbarui data film ke dalam tabel 'movies_all_data'.
     Menggunakan ON DUPLICATE KEY UPDATE untuk menangani rekaman yang sudah ada.
+    Untuk scraping massal gunakan MovieBatchWriter.
     """
     try:
-        # Menambahkan 'original_language' ke daftar kolom INSERT dan UPDATE
-        insert_query = """
-        INSERT INTO movies_all_data (
-            movie_id, original_title, poster_path, overview, release_date,
-            vote_average, genres, directors, main_actors, watch_providers, keywords,
-            original_language
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            original_title = VALUES(original_title),
-            poster_path = VALUES(poster_path),
-            overview = VALUES(overview),
-            release_date = VALUES(release_date),
-            vote_average = VALUES(vote_average),
-            genres = VALUES(genres),
-            directors = VALUES(directors),
-            main_actors = VALUES(main_actors),
-            watch_providers = VALUES(watch_providers),
-            keywords = VALUES(keywords),
-            scraped_at = CURRENT_TIMESTAMP,
-            original_language = VALUES(original_language)
-        """
-        
-        # Siapkan tuple nilai untuk query SQL
-        # Menambahkan 'original_language' ke daftar nilai
-        values = (
-            movie_details.get("id"),
-            movie_details.get("original_title"),
-            movie_details.get("poster_path"), # Ini seharusnya sudah menjadi URL lengkap
-            movie_details.get("overview"),
-            movie_details.get("release_date"), # Seharusnya string YYYY-MM-DD atau None
-            movie_details.get("vote_average"),
-            ", ".join([g["name"] for g in movie_details.get("genres", []) if g.get("name")]),
-            ", ".join(
-                [p["name"] for p in movie_details.get("credits", {}).get("crew", []) if p.get("job") == "Director"][:2]
-            ), # 2 sutradara teratas
-            ", ".join(
-                [p["name"] for p in movie_details.get("credits", {}).get("cast", []) if p.get("name")][:3]
-            ), # 3 aktor utama teratas
-            json.dumps(processed_watch_providers), # Simpan daftar konsolidasi sebagai string JSON
-            movie_keywords, # Sudah berupa string yang dipisahkan koma
-            original_language, # Nilai untuk kolom bahasa asli
-        )
-
-        cursor.execute(insert_query, values)
+        values = build_movie_values(movie_details, processed_watch_providers, movie_keywords, original_language)
+        cursor.execute(INSERT_MOVIE_QUERY, values)
         conn.commit() # Commit setiap penyisipan/pembaruan
         return True
     except Error as e:
@@ -144,159 +153,415 @@ def insert_movie_data(cursor, conn, movie_details, processed_watch_providers, mo
         return False
 
 
-def scrape_movies(total_movies=20000):
+# Ukuran batch dan interval flush maksimum untuk penulisan ke MySQL
+SCRAPE_BATCH_SIZE = int(os.getenv("SCRAPE_BATCH_SIZE", "200"))
+SCRAPE_FLUSH_SECONDS = float(os.getenv("SCRAPE_FLUSH_SECONDS", "5"))
+
+
+class MovieBatchWriter:
+    """
+    Menampung baris film yang sudah diproses lalu menulisnya dengan satu
+    executemany (INSERT multi-baris) dalam satu transaksi, setiap
+    `batch_size` baris atau setiap `flush_interval` detik.
+    Jika satu batch gagal, batch di-rollback lalu ditulis ulang per baris
+    sehingga satu film yang bermasalah tidak menggagalkan film lainnya.
+    """
+
+    def __init__(self, conn, cursor, batch_size=SCRAPE_BATCH_SIZE, flush_interval=SCRAPE_FLUSH_SECONDS):
+        self.conn = conn
+        self.cursor = cursor
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows = [] # (values, judul)
+        self.written = 0
+        self.failed = 0
+        self.last_flush = time.monotonic()
+
+    @property
+    def total(self):
+        """Jumlah film yang sudah tersimpan ditambah yang masih menunggu di buffer."""
+        return self.written + len(self.rows)
+
+    def add(self, values, title):
+        self.rows.append((values, title))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self):
+        """Flush berbasis waktu; juga dipanggil saat menunggu fetch agar buffer tidak tertahan."""
+        if self.rows and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Menulis semua baris di buffer. Mengembalikan jumlah baris yang berhasil."""
+        rows, self.rows = self.rows, []
+        self.last_flush = time.monotonic()
+        if not rows:
+            return 0
+
+        try:
+            # mysql-connector menulis ulang executemany INSERT menjadi satu INSERT multi-baris
+            self.cursor.executemany(INSERT_MOVIE_QUERY, [values for values, _ in rows])
+            self.conn.commit()
+            written = len(rows)
+        except Error as e:
+            self.conn.rollback()
+            print(f"⚠️ Batch {len(rows)} film gagal ({e}). Mencoba ulang per film...")
+            written = 0
+            for values, title in rows:
+                try:
+                    self.cursor.execute(INSERT_MOVIE_QUERY, values)
+                    self.conn.commit()
+                    written += 1
+                except Error as row_error:
+                    print(f"❌ Gagal untuk memasukkan/memperbarui film '{title}' (ID: {values[0]}): {row_error}")
+                    self.conn.rollback()
+                    self.failed += 1
+
+        self.written += written
+        print(f"💾 {written} film ditulis ke database (total: {self.written}).")
+        return written
+
+
+# Batas laju TMDb sekitar 50 request/detik per IP; default dibuat sedikit di bawahnya
+TMDB_MAX_RPS = float(os.getenv("TMDB_MAX_RPS", "40"))
+TMDB_CONCURRENCY = int(os.getenv("TMDB_CONCURRENCY", "16"))
+# Jumlah maksimal request detail yang sedang berjalan/menunggu diproses
+MAX_INFLIGHT = TMDB_CONCURRENCY * 4
+
+# Satu klien (pool koneksi keep-alive + rate limiter + retry) untuk semua thread
+tmdb = TMDbClient(TMDB_API_KEY, base_url=TMDB_BASE_URL, max_rps=TMDB_MAX_RPS, pool_size=TMDB_CONCURRENCY)
+
+
+def fetch_discover_page(year, page, provider_ids_str):
+    """Mengambil satu halaman hasil /discover/movie untuk tahun tertentu."""
+    return tmdb.get(
+        "discover/movie",
+        params={
+            "page": page,
+            "year": year,
+            "sort_by": "popularity.desc",  # Urutkan berdasarkan popularitas menurun
+            "vote_count.gte": 100,         # Minimal 100 suara
+            "with_watch_providers": provider_ids_str, # Hanya penyedia target
+            "watch_region": "US",          # Wilayah konsisten untuk penyedia tontonan
+        },
+    )
+
+
+def fetch_movie_details(movie_id):
+    """
+    Ambil data detail film termasuk kredit, penyedia tontonan, dan kata kunci.
+    Dijalankan di thread pool; laju request dibatasi oleh rate limiter klien TMDb.
+    """
+    return tmdb.get(
+        f"movie/{movie_id}",
+        params={
+            "append_to_response": "credits,watch/providers,keywords",
+            "language": "en-US", # Pastikan bahasa yang konsisten untuk detail
+        },
+        timeout=10,
+    )
+
+
+def process_movie_details(movie_details):
+    """
+    Menyiapkan data detail film untuk disimpan. Mengubah movie_details di tempat
+    (poster_path lengkap, release_date tervalidasi) dan mengembalikan tuple
+    (processed_watch_providers, movie_keywords_str, movie_original_language).
+    """
+    movie_id = movie_details.get("id")
+
+    # Buat jalur poster lengkap
+    if movie_details.get("poster_path"):
+        movie_details["poster_path"] = f"https://image.tmdb.org/t/p/original{movie_details['poster_path']}"
+    
+    # Proses penyedia tontonan: Konsolidasi berdasarkan ID penyedia
+    US_providers_raw = (
+        movie_details.get("watch/providers", {})
+        .get("results", {})
+        .get("US", {})
+    )
+    
+    found_providers_temp = []
+    for provider_type in ["flatrate", "rent", "buy"]:
+        for provider_entry in US_providers_raw.get(provider_type, []):
+            if provider_entry["provider_id"] in TARGET_PROVIDERS:
+                provider_info = TARGET_PROVIDERS[provider_entry["provider_id"]]
+                found_providers_temp.append(
+                    {
+                        "id": provider_entry["provider_id"],
+                        "name": provider_info["name"],
+                        "logo": f"https://image.tmdb.org/t/p/original{provider_entry['logo_path']}",
+                        "subscribe_url": provider_info["subscribe_url"],
+                    }
+                )
+    
+    # Hapus duplikat HANYA berdasarkan ID penyedia
+    processed_watch_providers = []
+    seen_ids = set() # Gunakan hanya ID penyedia untuk keunikan
+    for p in found_providers_temp:
+        if p["id"] not in seen_ids:
+            processed_watch_providers.append(p)
+            seen_ids.add(p["id"])
+
+    # Ekstrak kata kunci sebagai string yang dipisahkan koma
+    keywords_list = [
+        k["name"]
+        for k in movie_details.get("keywords", {}).get("keywords", [])
+        if k.get("name")
+    ]
+    movie_keywords_str = ", ".join(keywords_list)
+
+    # Ambil bahasa asli
+    movie_original_language = movie_details.get("original_language")
+
+    # Tangani None untuk release_date jika kosong dari API atau format tidak valid
+    if not movie_details.get("release_date"):
+        movie_details["release_date"] = None
+    else: # Pastikan format tanggal adalah YYYY-MM-DD untuk tipe DATE MySQL
+        try:
+            datetime.strptime(movie_details["release_date"], '%Y-%m-%d')
+        except ValueError:
+            print(f"WARNING: Format tanggal tidak valid untuk film ID {movie_id}. Mengatur release_date ke None.")
+            movie_details["release_date"] = None
+
+    return processed_watch_providers, movie_keywords_str, movie_original_language
+
+
+def store_fetched_movies(futures, writer, total_movies):
+    """
+    Memproses hasil fetch detail yang sudah selesai dan memasukkannya ke buffer
+    penulis batch. Dijalankan di thread utama karena koneksi MySQL tidak thread-safe.
+    """
+    for future, (movie_id, year) in futures.items():
+        try:
+            movie_details = future.result()
+
+            if not movie_details:
+                print(f"⚠️ Gagal mendapatkan detail untuk film ID {movie_id}. Melanjutkan...")
+                continue # Lewati ke film berikutnya jika detail tidak ditemukan
+
+            processed_watch_providers, movie_keywords_str, movie_original_language = process_movie_details(movie_details)
+
+            # Masukkan ke buffer; ditulis ke database per batch oleh MovieBatchWriter
+            writer.add(
+                build_movie_values(
+                    movie_details,
+                    processed_watch_providers,
+                    movie_keywords_str,
+                    movie_original_language, # Teruskan bahasa asli
+                ),
+                movie_details.get("original_title"),
+            )
+            print(f"✅ [{writer.total}/{total_movies}] Memproses: {movie_details.get('original_title')} ({year})")
+
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ Kesalahan API untuk film ID {movie_id}: {str(e)}")
+        except Exception as e:
+            print(f"⚠️ Kesalahan saat memproses film ID {movie_id}: {str(e)}")
+
+
+def drain_fetches(pending, writer, total_movies, return_when):
+    """
+    Menunggu fetch detail di `pending` (future -> (movie_id, tahun)) sesuai
+    return_when lalu memasukkan hasilnya ke writer. Setiap putaran menunggu paling
+    lama writer.flush_interval, sehingga baris di buffer tetap ditulis tepat waktu
+    walau fetch tersendat (backoff rate limit, Retry-After).
+    """
+    while pending:
+        done, _ = wait(pending, timeout=writer.flush_interval, return_when=return_when)
+        store_fetched_movies({future: pending.pop(future) for future in done}, writer, total_movies)
+        writer.flush_if_due()
+        if done and return_when == FIRST_COMPLETED:
+            return
+
+
+# File checkpoint untuk melanjutkan scraping yang terhenti dan menyimpan waktu
+# sinkronisasi terakhir feed /movie/changes
+SCRAPE_STATE_FILE = os.getenv(
+    "SCRAPE_STATE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "scrape_state.json")
+)
+# Checkpoint disimpan setiap N halaman discover (setelah semua film di halaman tersebut tertulis)
+SCRAPE_CHECKPOINT_PAGES = int(os.getenv("SCRAPE_CHECKPOINT_PAGES", "5"))
+# TMDb membatasi rentang tanggal /movie/changes maksimal 14 hari per request
+TMDB_CHANGES_MAX_DAYS = 14
+
+
+def load_scrape_state():
+    """Membaca file checkpoint; mengembalikan dict kosong jika belum ada atau rusak."""
+    try:
+        with open(SCRAPE_STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"⚠️ File checkpoint {SCRAPE_STATE_FILE} tidak bisa dibaca ({e}). Mulai dari awal.")
+        return {}
+
+
+def save_scrape_state(state):
+    """Menyimpan checkpoint secara atomik (tulis file sementara lalu rename)."""
+    state = dict(state, updated_at=datetime.now().isoformat(timespec="seconds"))
+    tmp_path = f"{SCRAPE_STATE_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, SCRAPE_STATE_FILE)
+
+
+def fetch_fresh_movie_ids(cursor, ttl_hours):
+    """ID film yang di-scrape dalam `ttl_hours` jam terakhir (tidak perlu diambil ulang)."""
+    cursor.execute(
+        "SELECT movie_id FROM movies_all_data WHERE scraped_at >= NOW() - INTERVAL %s HOUR",
+        (ttl_hours,),
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def scrape_movies(total_movies=20000, resume=False, ttl_hours=None):
     """
     Mengikis data film dari TMDB dalam batch, memprosesnya, dan menyisipkan/memperbarui
     mereka ke dalam database. Iterasi melalui tahun dan halaman.
+
+    Thread utama berperan sebagai produsen: mengambil halaman discover dan
+    mengirim ID film ke thread pool yang mengambil detail secara paralel.
+    Laju total request dibatasi token bucket (TMDB_MAX_RPS), sehingga waktu
+    scraping ditentukan oleh batas request/detik, bukan latensi per request.
+
+    resume=True melanjutkan dari checkpoint terakhir (tahun, halaman) di
+    SCRAPE_STATE_FILE. ttl_hours (mode inkremental) melewati film yang
+    scraped_at-nya lebih baru dari ttl_hours jam.
     """
     conn = None
     cursor = None
+    writer = None
     try:
         conn = mysql.connector.connect(**MYSQL_CONFIG)
         cursor = conn.cursor()
+        writer = MovieBatchWriter(conn, cursor)
 
-        movies_collected = 0
         current_year = datetime.now().year
         start_year = 2024  # Mulai mengikis dari tahun ini
+        start_page = 1
+
+        skipped = 0
+        state = load_scrape_state()
+        # Checkpoint selalu di batas halaman (semua film sebelumnya sudah tertulis),
+        # jadi ID film terakhir tidak diperlukan untuk melanjutkan
+        state.pop("last_movie_id", None)
+        if resume and state.get("year") and not state.get("completed"):
+            start_year = state["year"]
+            start_page = state.get("page", 1)
+            writer.written = state.get("movies_collected", 0)
+            skipped = state.get("movies_skipped", 0)
+            print(
+                f"↩️ Melanjutkan dari checkpoint: tahun {start_year}, halaman {start_page}, "
+                f"{writer.written} film ({skipped} dilewati karena masih segar)."
+            )
+
+        fresh_ids = set()
+        if ttl_hours is not None:
+            fresh_ids = fetch_fresh_movie_ids(cursor, ttl_hours)
+            print(f"ℹ️ Mode inkremental: {len(fresh_ids)} film masih segar (< {ttl_hours} jam) dan akan dilewati.")
+
+        def collected():
+            # Film segar yang dilewati tetap dihitung sebagai bagian dari katalog
+            return writer.total + skipped
+
+        def checkpoint(year, page, completed=False):
+            state.update(
+                year=year,
+                page=page,
+                movies_collected=writer.written,
+                movies_skipped=skipped,
+                completed=completed,
+            )
+            save_scrape_state(state)
 
         # Konversi kunci TARGET_PROVIDERS ke string yang dipisahkan pipa untuk query API
         provider_ids_str = "|".join(map(str, TARGET_PROVIDERS.keys()))
+        # Diinisialisasi di sini agar checkpoint akhir valid walau rentang tahun kosong
+        year, page = start_year, start_page
+        interrupted = False
+
+        with ThreadPoolExecutor(max_workers=TMDB_CONCURRENCY) as executor:
+            pending = {} # future -> (movie_id, year)
+
+            def drain(return_when):
+                drain_fetches(pending, writer, total_movies, return_when)
+
+            for year in range(start_year, current_year + 1):
+                print(f"\n🚀 Memproses tahun: {year}")
+                page = start_page if year == start_year else 1
+                max_pages_per_year = 500 # TMDb membatasi hingga 500 halaman per query
+
+                while True:
+                    # Sebagian fetch bisa gagal, jadi tunggu yang tertunda sebelum memutuskan target tercapai
+                    while pending and collected() + len(pending) >= total_movies:
+                        drain(FIRST_COMPLETED)
+                    if collected() >= total_movies:
+                        print(f"Target {total_movies} film tercapai. Menghentikan scraping.")
+                        break  # Keluar dari loop halaman jika target total tercapai
+
+                    try:
+                        # Request discover bisa lama tertahan rate limit; tulis dulu buffer yang jatuh tempo
+                        writer.flush_if_due()
+                        data = fetch_discover_page(year, page, provider_ids_str)
+
+                        # Periksa apakah tidak ada hasil atau jika kita telah melewati halaman terakhir untuk tahun ini
+                        if not data.get("results") or page > data.get("total_pages", 1) or page > max_pages_per_year:
+                            print(f"Selesai untuk tahun {year} atau tidak ada lagi hasil. Total halaman yang diproses: {page-1}")
+                            break # Keluar dari loop dalam (loop halaman)
+
+                        for movie_summary in data["results"]:
+                            if collected() + len(pending) >= total_movies:
+                                break # Keluar dari loop dalam jika target total tercapai
 
-        for year in range(start_year, current_year + 1):
-            print(f"\n🚀 Memproses tahun: {year}")
-            page = 1
-            max_pages_per_year = 500 # TMDb membatasi hingga 500 halaman per query
-
-            while True:
-                if movies_collected >= total_movies:
-                    print(f"Target {total_movies} film tercapai. Menghentikan scraping.")
-                    break  # Keluar dari loop luar (loop tahun) jika target total tercapai
-
-                try:
-                    # Buat URL untuk endpoint penemuan TMDb
-                    discover_url = (
-                        f"{TMDB_BASE_URL}/discover/movie?api_key={TMDB_API_KEY}"
-                        f"&page={page}&year={year}"
-                        f"&sort_by=popularity.desc"  # Urutkan berdasarkan popularitas menurun
-                        f"&vote_count.gte=100"       # Minimal 100 suara
-                        f"&with_watch_providers={provider_ids_str}" # Hanya penyedia target
-                        f"&watch_region=US"          # Wilayah konsisten untuk penyedia tontonan
-                    )
-
-                    response = requests.get(discover_url, timeout=15)
-                    response.raise_for_status() # Lemparkan HTTPError untuk respons buruk
-                    data = response.json()
-
-                    # Periksa apakah tidak ada hasil atau jika kita telah melewati halaman terakhir untuk tahun ini
-                    if not data.get("results") or page > data.get("total_pages", 1) or page > max_pages_per_year:
-                        print(f"Selesai untuk tahun {year} atau tidak ada lagi hasil. Total halaman yang diproses: {page-1}")
-                        break # Keluar dari loop dalam (loop halaman)
-
-                    for movie_summary in data["results"]:
-                        if movies_collected >= total_movies:
-                            break # Keluar dari loop dalam jika target total tercapai
-
-                        try:
                             movie_id = movie_summary["id"]
-                            
-                            # Ambil data detail film termasuk kredit, penyedia tontonan, dan kata kunci
-                            details_url = (
-                                f"{TMDB_BASE_URL}/movie/{movie_id}?api_key={TMDB_API_KEY}"
-                                f"&append_to_response=credits,watch/providers,keywords"
-                                f"&language=en-US" # Pastikan bahasa yang konsisten untuk detail
-                            )
-                            movie_details = requests.get(details_url, timeout=10).json()
-
-                            if not movie_details:
-                                print(f"⚠️ Gagal mendapatkan detail untuk film ID {movie_id}. Melanjutkan...")
-                                continue # Lewati ke film berikutnya jika detail tidak ditemukan
-
-                            # Buat jalur poster lengkap
-                            if movie_details.get("poster_path"):
-                                movie_details["poster_path"] = f"https://image.tmdb.org/t/p/original{movie_details['poster_path']}"
-                            
-                            # Proses penyedia tontonan: Konsolidasi berdasarkan ID penyedia
-                            US_providers_raw = (
-                                movie_details.get("watch/providers", {})
-                                .get("results", {})
-                                .get("US", {})
-                            )
-                            
-                            found_providers_temp = []
-                            for provider_type in ["flatrate", "rent", "buy"]:
-                                for provider_entry in US_providers_raw.get(provider_type, []):
-                                    if provider_entry["provider_id"] in TARGET_PROVIDERS:
-                                        provider_info = TARGET_PROVIDERS[provider_entry["provider_id"]]
-                                        found_providers_temp.append(
-                                            {
-                                                "id": provider_entry["provider_id"],
-                                                "name": provider_info["name"],
-                                                "logo": f"https://image.tmdb.org/t/p/original{provider_entry['logo_path']}",
-                                                "subscribe_url": provider_info["subscribe_url"],
-                                            }
-                                        )
-                            
-                            # Hapus duplikat HANYA berdasarkan ID penyedia
-                            processed_watch_providers = []
-                            seen_ids = set() # Gunakan hanya ID penyedia untuk keunikan
-                            for p in found_providers_temp:
-                                if p["id"] not in seen_ids:
-                                    processed_watch_providers.append(p)
-                                    seen_ids.add(p["id"])
-
-                            # Ekstrak kata kunci sebagai string yang dipisahkan koma
-                            keywords_list = [
-                                k["name"]
-                                for k in movie_details.get("keywords", {}).get("keywords", [])
-                                if k.get("name")
-                            ]
-                            movie_keywords_str = ", ".join(keywords_list)
-
-                            # Ambil bahasa asli
-                            movie_original_language = movie_details.get("original_language")
-
-                            # Tangani None untuk release_date jika kosong dari API atau format tidak valid
-                            if not movie_details.get("release_date"):
-                                movie_details["release_date"] = None
-                            else: # Pastikan format tanggal adalah YYYY-MM-DD untuk tipe DATE MySQL
-                                try:
-                                    datetime.strptime(movie_details["release_date"], '%Y-%m-%d')
-                                except ValueError:
-                                    print(f"WARNING: Format tanggal tidak valid untuk film ID {movie_id}. Mengatur release_date ke None.")
-                                    movie_details["release_date"] = None
-
-                            # Coba untuk memasukkan atau memperbarui data film
-                            if insert_movie_data(
-                                cursor,
-                                conn,
-                                movie_details,
-                                processed_watch_providers,
-                                movie_keywords_str,
-                                movie_original_language, # Teruskan bahasa asli
-                            ):
-                                movies_collected += 1
-                                print(f"✅ [{movies_collected}/{total_movies}] Memproses: {movie_details.get('original_title')} ({year})")
-
-                        except requests.exceptions.RequestException as e:
-                            print(f"⚠️ Kesalahan API untuk film ID {movie_summary.get('id')}: {str(e)}")
-                        except Exception as e:
-                            print(f"⚠️ Kesalahan saat memproses film ID {movie_summary.get('id')}: {str(e)}")
-                        
-                        time.sleep(0.1) # Penundaan kecil untuk pengambilan film individual
-
-                    page += 1
-                    time.sleep(0.5) # Penundaan antar halaman untuk menghormati batas API
-
-                except requests.exceptions.RequestException as e:
-                    print(f"⚠️ Gagal Mengambil Batch Film untuk tahun {year}, halaman {page}: {str(e)}")
-                    time.sleep(5)  # Tunggu lebih lama sebelum mencoba lagi pada kesalahan pengambilan batch
-
-            if movies_collected >= total_movies:
-                break # Keluar dari loop tahun jika target total tercapai
+                            if movie_id in fresh_ids:
+                                skipped += 1
+                                continue
+                            pending[executor.submit(fetch_movie_details, movie_id)] = (movie_id, year)
+                            if len(pending) >= MAX_INFLIGHT:
+                                drain(FIRST_COMPLETED)
+
+                        page += 1
+
+                        if (page - 1) % SCRAPE_CHECKPOINT_PAGES == 0:
+                            # Checkpoint hanya valid jika semua film sebelum halaman ini sudah tertulis
+                            if pending:
+                                drain(ALL_COMPLETED)
+                            writer.flush()
+                            checkpoint(year, page)
+
+                    except requests.exceptions.RequestException as e:
+                        # Klien TMDb sudah mencoba ulang dengan backoff. Halaman ini tidak
+                        # dilewati: scraping dihentikan dan checkpoint tetap menunjuk ke
+                        # halaman ini, sehingga --resume mengambilnya lagi.
+                        print(f"⚠️ Gagal Mengambil Batch Film untuk tahun {year}, halaman {page}: {str(e)}")
+                        print("⏸️ Scraping dihentikan. Jalankan lagi dengan --resume untuk melanjutkan dari halaman ini.")
+                        interrupted = True
+                        break
+
+                if interrupted or collected() >= total_movies:
+                    break # Keluar dari loop tahun jika target total tercapai
+
+            if pending:
+                drain(ALL_COMPLETED)
+
+        writer.flush()
+        checkpoint(year, page, completed=not interrupted)
+        tmdb.print_stats()
+        if skipped:
+            print(f"ℹ️ {skipped} film dilewati karena masih segar.")
 
     except Error as e:
         print(f"❌ Kesalahan database utama: {e}")
     finally:
+        # Simpan film yang sudah terkumpul di buffer sebelum koneksi ditutup
+        if writer and writer.rows and conn and conn.is_connected():
+            writer.flush()
         # Pastikan kursor dan koneksi ditutup dalam fungsi scraping utama
         if cursor:
             cursor.close()
@@ -304,9 +569,97 @@ def scrape_movies(total_movies=20000):
             conn.close()
 
 
+def fetch_changed_movie_ids(start_date, end_date):
+    """Mengumpulkan ID film yang berubah di TMDb antara start_date dan end_date (date)."""
+    changed_ids = set()
+    window_start = start_date
+    while window_start < end_date:
+        window_end = min(window_start + timedelta(days=TMDB_CHANGES_MAX_DAYS), end_date)
+        page = 1
+        while True:
+            data = tmdb.get(
+                "movie/changes",
+                params={"start_date": window_start.isoformat(), "end_date": window_end.isoformat(), "page": page},
+            )
+            changed_ids.update(item["id"] for item in data.get("results", []) if not item.get("adult"))
+            if page >= data.get("total_pages", 1):
+                break
+            page += 1
+        window_start = window_end
+    return changed_ids
+
+
+def refresh_changed_movies(since=None):
+    """
+    Refresh nightly: hanya mengambil ulang film di database yang berubah di TMDb
+    sejak `since` (date). Default-nya waktu sinkronisasi terakhir di file
+    checkpoint, atau kemarin jika belum pernah dijalankan.
+    """
+    state = load_scrape_state()
+    today = datetime.now().date()
+    if since is None:
+        last_sync = state.get("last_changes_sync")
+        since = datetime.strptime(last_sync, "%Y-%m-%d").date() if last_sync else today - timedelta(days=1)
+
+    conn = None
+    cursor = None
+    writer = None
+    try:
+        conn = mysql.connector.connect(**MYSQL_CONFIG)
+        cursor = conn.cursor()
+        writer = MovieBatchWriter(conn, cursor)
+
+        cursor.execute("SELECT movie_id FROM movies_all_data")
+        known_ids = {row[0] for row in cursor.fetchall()}
+
+        changed_ids = fetch_changed_movie_ids(since, today)
+        to_refresh = sorted(changed_ids & known_ids)
+        print(f"🔄 {len(changed_ids)} film berubah di TMDb sejak {since}; {len(to_refresh)} ada di database.")
+
+        with ThreadPoolExecutor(max_workers=TMDB_CONCURRENCY) as executor:
+            pending = {executor.submit(fetch_movie_details, movie_id): (movie_id, "refresh") for movie_id in to_refresh}
+            drain_fetches(pending, writer, len(to_refresh), ALL_COMPLETED)
+
+        writer.flush()
+        state["last_changes_sync"] = today.isoformat()
+        save_scrape_state(state)
+        tmdb.print_stats()
+
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ Gagal mengambil feed perubahan TMDb: {e}")
+    except Error as e:
+        print(f"❌ Kesalahan database utama: {e}")
+    finally:
+        if writer and writer.rows and conn and conn.is_connected():
+            writer.flush()
+        if cursor:
+            cursor.close()
+        if conn and conn.is_connected():
+            conn.close()
+
+
 if __name__ == "__main__":
-    # Periksa apakah variabel lingkungan diatur
+    parser = argparse.ArgumentParser(description="Scraping data film TMDb ke MySQL.")
+    parser.add_argument("--total", type=int, default=20000, help="Target jumlah film")
+    parser.add_argument("--resume", action="store_true", help="Lanjutkan dari checkpoint terakhir")
+    parser.add_argument(
+        "--ttl-hours",
+        type=int,  # INTERVAL %s HOUR di MySQL membulatkan nilai pecahan
+        default=None,
+        help="Mode inkremental: lewati film yang di-scrape kurang dari N jam yang lalu",
+    )
+    parser.add_argument(
+        "--changes",
+        action="store_true",
+        help="Hanya refresh film yang berubah menurut feed /movie/changes TMDb",
+    )
+    parser.add_argument("--since", default=None, help="Tanggal awal feed perubahan (YYYY-MM-DD)")
+    args = parser.parse_args()
 
     create_tables()
-    scrape_movies(total_movies=20000)
+    if args.changes:
+        since = datetime.strptime(args.since, "%Y-%m-%d").date() if args.since else None
+        refresh_changed_movies(since)
+    else:
+        scrape_movies(total_movies=args.total, resume=args.resume, ttl_hours=args.ttl_hours)
     print("✅ Proses scraping selesai.")
@@ -5,6 +5,8 @@ import os
 from dotenv import load_dotenv
 from datetime import datetime
 
+from tmdb_client import TMDbClient
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -34,24 +36,28 @@ TARGET_PROVIDERS = {
     2: {"name": "Apple TV", "subscribe_url": "https://tv.apple.com/us/"},
 }
 
+# Backend that serves recommendations; new movies are pushed to its model after storing
+RECOMMENDER_URL = os.getenv("RECOMMENDER_URL")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+RECOMMENDER_TIMEOUT = float(os.getenv("RECOMMENDER_TIMEOUT", "120"))  # seconds
+
 # --- TMDb API Endpoints ---
 TMDB_BASE_URL = "https://api.themoviedb.org/3"
+TMDB_MAX_RPS = float(os.getenv("TMDB_MAX_RPS", "40"))
+TMDB_TIMEOUT = float(os.getenv("TMDB_TIMEOUT", "15"))  # seconds
+
+# Shared client: keep-alive connection pool, timeouts and retry with backoff
+tmdb = TMDbClient(TMDB_API_KEY, base_url=TMDB_BASE_URL, max_rps=TMDB_MAX_RPS, pool_size=2)
 
 
 def fetch_from_tmdb(endpoint, params=None):
     """
     Helper function to make requests to the TMDb API.
     """
-    if params is None:
-        params = {}
-    params["api_key"] = TMDB_API_KEY
-    url = f"{TMDB_BASE_URL}/{endpoint}"
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
-        return response.json()
+        return tmdb.get(endpoint, params=params, timeout=TMDB_TIMEOUT)
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching data from TMDb API ({url}): {e}")
+        print(f"Error fetching data from TMDb API ({TMDB_BASE_URL}/{endpoint}): {e}")
         return None
 
 
@@ -183,9 +189,10 @@ def store_movie_data(movie_data):
     """
     if not movie_data:
         print("DEBUG: movie_data is None. Exiting store_movie_data.")
-        return
+        return False
 
     conn = None
+    stored = False
     try:
         print("DEBUG: Attempting to connect to MySQL...")
         conn = mysql.connector.connect(
@@ -263,6 +270,7 @@ def store_movie_data(movie_data):
         print(
             f"Successfully stored/updated movie ID {movie_data['movie_id']} ('{movie_data['original_title']}') in the database."
         )
+        stored = True
 
     except mysql.connector.Error as error:
         print(f"ERROR: MySQL connection or insertion error: {error}")
@@ -273,6 +281,31 @@ def store_movie_data(movie_data):
             cur.close()
             conn.close()
             print("DEBUG: MySQL connection closed.")
+    return stored
+
+
+def notify_recommender(movie_id):
+    """
+    Asks the running backend to add the movie to the recommendation model
+    incrementally (POST /api/admin/models/add), so it can be recommended
+    without a full model rebuild. Skipped when RECOMMENDER_URL is not set.
+    """
+    if not RECOMMENDER_URL:
+        print("RECOMMENDER_URL is not set; run BackEnd/model_update.py to add the movie to the model.")
+        return False
+    try:
+        response = requests.post(
+            f"{RECOMMENDER_URL.rstrip('/')}/api/admin/models/add",
+            json={"movie_ids": [movie_id]},
+            headers={"X-Admin-Token": ADMIN_TOKEN or ""},
+            timeout=RECOMMENDER_TIMEOUT,
+        )
+        response.raise_for_status()
+        print(f"Recommendation model updated to version {response.json()['model']['version']}.")
+        return True
+    except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+        print(f"WARNING: Could not update the recommendation model for movie ID {movie_id}: {e}")
+        return False
 
 
 # --- Main execution block ---
@@ -297,6 +330,7 @@ if __name__ == "__main__":
 
     scraped_movie = scrape_movie_data(movie_id_to_scrape)
     if scraped_movie:
-        store_movie_data(scraped_movie)
+        if store_movie_data(scraped_movie):
+            notify_recommender(scraped_movie["movie_id"])
     else:
         print(f"Failed to scrape data for movie ID {movie_id_to_scrape}.")
@@ -0,0 +1,176 @@
+"""
+Klien HTTP bersama untuk API TMDb, dipakai oleh scrapingdataFIX.py dan spesifikscrape.py.
+
+- Satu requests.Session dengan pool koneksi keep-alive, sehingga puluhan ribu
+  request tidak lagi membayar handshake TCP/TLS masing-masing.
+- Respons dikompresi gzip.
+- Laju request dibatasi token bucket yang aman dipakai banyak thread.
+- Retry dengan exponential backoff + jitter untuk 429/5xx dan error jaringan;
+  header Retry-After dari TMDb dihormati pada respons 429.
+- Penghitung latensi per endpoint (jumlah request, error, retry, total/maks detik).
+"""
+import random
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+TMDB_BASE_URL = "https://api.themoviedb.org/3"
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+DEFAULT_TIMEOUT = 15
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+class TokenBucket:
+    """
+    Pembatas laju (token bucket) yang aman dipakai banyak thread.
+    Setiap request TMDb mengambil satu token; token terisi ulang sebanyak
+    `rate` per detik dengan kapasitas maksimal `capacity` (burst).
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def endpoint_label(path):
+    """'movie/27205/credits' -> 'movie/{id}/credits', agar statistik tidak terpecah per film."""
+    return _NUMERIC_SEGMENT.sub("/{id}", "/" + path.strip("/"))[1:]
+
+
+def _retry_after_seconds(response):
+    """Nilai header Retry-After (detik), atau None jika tidak ada/tidak valid."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class TMDbClient:
+    def __init__(
+        self,
+        api_key,
+        base_url=TMDB_BASE_URL,
+        max_rps=40,
+        pool_size=16,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries=DEFAULT_MAX_RETRIES,
+        session=None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter = TokenBucket(max_rps)
+
+        if session is None:
+            session = requests.Session()
+            # Retry ditangani sendiri di get() agar Retry-After dan statistik tercatat
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        session.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip"})
+        self.session = session
+
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, label, elapsed=0.0, requests_made=0, errors=0, retries=0):
+        with self._stats_lock:
+            stats = self._stats.setdefault(
+                label,
+                {"requests": 0, "errors": 0, "retries": 0, "seconds_total": 0.0, "seconds_max": 0.0},
+            )
+            stats["requests"] += requests_made
+            stats["errors"] += errors
+            stats["retries"] += retries
+            stats["seconds_total"] += elapsed
+            stats["seconds_max"] = max(stats["seconds_max"], elapsed)
+
+    def _backoff(self, attempt, response=None):
+        """Lama menunggu sebelum percobaan ke-(attempt + 1): Retry-After atau full jitter."""
+        if response is not None and response.status_code == 429:
+            retry_after = _retry_after_seconds(response)
+            if retry_after is not None:
+                return min(retry_after, BACKOFF_MAX) + random.uniform(0, BACKOFF_BASE)
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def get(self, path, params=None, timeout=None):
+        """
+        GET {base_url}/{path} dan mengembalikan body JSON.
+        Melempar requests.exceptions.RequestException (termasuk HTTPError untuk
+        4xx/5xx) jika semua percobaan gagal.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        query = dict(params or {}, api_key=self.api_key)
+        label = endpoint_label(path)
+
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            started = time.perf_counter()
+            response = None
+            try:
+                response = self.session.get(url, params=query, timeout=timeout or self.timeout)
+                error = None
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            elapsed = time.perf_counter() - started
+
+            retryable = error is not None or response.status_code in RETRY_STATUS_CODES
+            if not retryable or attempt >= self.max_retries:
+                failed = error is not None or not response.ok
+                self._record(label, elapsed, requests_made=1, errors=int(failed))
+                if error is not None:
+                    raise error
+                response.raise_for_status()
+                return response.json()
+
+            self._record(label, elapsed, requests_made=1, retries=1)
+            delay = self._backoff(attempt, response)
+            if response is not None:
+                response.close() # Kembalikan koneksi ke pool sebelum menunggu
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self):
+        """Snapshot statistik per endpoint, ditambah rata-rata latensi."""
+        with self._stats_lock:
+            snapshot = {label: dict(stats) for label, stats in self._stats.items()}
+        for stats in snapshot.values():
+            stats["seconds_avg"] = stats["seconds_total"] / stats["requests"] if stats["requests"] else 0.0
+        return snapshot
+
+    def print_stats(self):
+        for label, stats in sorted(self.stats().items()):
+            print(
+                f"📊 {label}: {stats['requests']} request, {stats['retries']} retry, {stats['errors']} error, "
+                f"rata-rata {stats['seconds_avg'] * 1000:.0f} ms, maks {stats['seconds_max'] * 1000:.0f} ms"
+            )
+
+    def close(self):
+        self.session.close()